@@ -0,0 +1,188 @@
+# app/core/batch.py
+"""Пакетная генерация выкроек по таблице мерок — без виджетов и дисплея.
+
+Каждая строка CSV — один заказчик. Для каждого выбранного шаблона
+PatternLibrary вызывается generate_path() с мерками из строки, детали
+раскладываются в ряд с подписями и экспортируются в SVG/PDF через
+vector_export. Строки распределяются по пулу процессов; в каждом процессе
+создаётся только QGuiApplication на платформе offscreen (шрифты для
+подписей), ни одного QWidget.
+
+Колонки CSV — имена параметров шаблонов (width, length, ...). Если у
+разных шаблонов параметры называются одинаково, значение для конкретного
+шаблона задаётся колонкой "<имя шаблона>.<параметр>" ("Sleeve.width") —
+она важнее общей. Пустая ячейка или отсутствующая колонка — значение
+по умолчанию из get_parameters().
+"""
+import csv
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPen, QBrush, QColor, QFont, QGuiApplication
+
+from . import serialization
+from .pattern_templates import PatternLibrary, PX_PER_CM
+from .project_manager import ProjectManager, FORMAT_VERSION
+
+ID_COLUMN = "customer"
+FORMATS = ("svg", "pdf")
+_MARGIN = 2 * PX_PER_CM      # поля листа
+_GAP = 3 * PX_PER_CM         # расстояние между деталями
+_LABEL_HEIGHT = 1.5 * PX_PER_CM
+_LABEL_POINT_SIZE = 12
+
+_app = None
+
+
+def _ensure_gui():
+    """QGuiApplication без окон — нужен только для шрифтов подписей."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if QGuiApplication.instance() is None:
+        _app = QGuiApplication(["clothing-designer-batch"])
+
+
+def resolve_templates(names, library=None):
+    """Шаблоны по именам ("Sleeve") или категориям ("Skirts")."""
+    library = library or PatternLibrary()
+    categories = {c.lower(): c for c in library.get_categories()}
+    templates = []
+    for name in names:
+        template = library.get_template(name)
+        if template is not None:
+            templates.append(template)
+        elif name.strip().lower() in categories:
+            templates.extend(library.get_templates_by_category(categories[name.strip().lower()]))
+        else:
+            raise ValueError(f"Unknown template: {name}")
+    return templates
+
+
+def row_params(template, row):
+    """Параметры generate_path() для шаблона из строки CSV (ключи строки —
+    в нижнем регистре)."""
+    params = {}
+    prefix = template.name.lower() + "."
+    for parameter in template.get_parameters():
+        name = parameter["name"]
+        for column in (prefix + name.lower(), name.lower()):
+            value = (row.get(column) or "").strip()
+            if value:
+                try:
+                    params[name] = float(value.replace(",", "."))
+                except ValueError:
+                    raise ValueError(f"Column '{column}': not a number: {value!r}") from None
+                break
+    return params
+
+
+def file_stem(customer):
+    return re.sub(r"[^\w.-]+", "_", customer).strip("._") or "customer"
+
+
+def customer_name(number, row, id_column=ID_COLUMN):
+    """Имя заказчика строки number или "row<number>", если ячейка пуста."""
+    for key, value in row.items():
+        if (key or "").strip().lower() == id_column.lower():
+            return (value or "").strip() or f"row{number}"
+    return f"row{number}"
+
+
+def unique_stems(rows, id_column=ID_COLUMN):
+    """Имена файлов строк без совпадений: строки пишутся параллельно, и
+    одинаковое имя ("Anna K" и "Anna/K" -> "Anna_K") значило бы два
+    процесса над одним файлом. Совпавшему имени добавляется номер строки;
+    регистр не различается — как в файловых системах Windows и macOS."""
+    stems, taken = [], set()
+    for number, row in enumerate(rows, start=1):
+        stem = file_stem(customer_name(number, row, id_column))
+        while stem.lower() in taken:
+            stem = f"{stem}_{number}"
+        taken.add(stem.lower())
+        stems.append(stem)
+    return stems
+
+
+def build_project(customer, templates, row):
+    """ProjectManager с деталями заказчика, разложенными в ряд."""
+    writer = serialization.GeometryWriter()
+    pen = QPen(QColor(0, 0, 0), 0)  # линия реза — волосяная
+    brush = QBrush(Qt.BrushStyle.NoBrush)
+    font = QFont()
+    font.setPointSize(_LABEL_POINT_SIZE)
+
+    objects = []
+    x, height = _MARGIN, 0.0
+    for template in templates:
+        path = template.cached_path(**row_params(template, row))
+        rect = path.boundingRect()
+        top = _MARGIN + _LABEL_HEIGHT
+        objects.append({
+            "type": "text",
+            "pos": [x, _MARGIN],
+            "text": f"{customer} — {template.name}",
+            "font": font.toString(),
+            "color": QColor(0, 0, 0).name(QColor.NameFormat.HexArgb),
+        })
+        objects.append({
+            "type": "piece",
+            "pos": [x - rect.left(), top - rect.top()],
+            "bounds": [rect.x(), rect.y(), rect.width(), rect.height()],
+            "pen": serialization.encode_pen(pen),
+            "brush": serialization.encode_brush(brush),
+            "path": writer.add_path(path),
+        })
+        x += rect.width() + _GAP
+        height = max(height, top + rect.height())
+
+    manager = ProjectManager()
+    manager.new_project(round(x - _GAP + _MARGIN), round(height + _MARGIN))
+    manager.current_project["version"] = FORMAT_VERSION
+    manager.current_project["objects"] = objects
+    manager.current_project["geometry"] = writer
+    return manager
+
+
+def generate_customer(job):
+    """Одна строка таблицы → файлы заказчика. Выполняется в процессе пула;
+    ошибки возвращаются, а не выбрасываются, чтобы не останавливать пакет."""
+    number, row, template_names, out_dir, formats, unit, id_column, stem = job
+    _ensure_gui()
+    customer = customer_name(number, row, id_column)
+    row = {(k or "").strip().lower(): v for k, v in row.items()}
+    result = {"row": number, "customer": customer, "files": [], "error": ""}
+    try:
+        manager = build_project(customer, resolve_templates(template_names), row)
+        stem = os.path.join(out_dir, stem)
+        for format in formats:
+            file_path = f"{stem}.{format.lower()}"
+            manager.export_vector(file_path, format.upper(), unit=unit)
+            result["files"].append(file_path)
+    except (ValueError, TypeError, OSError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def read_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def run_batch(csv_path, template_names, out_dir, formats=("svg",), unit="cm",
+              workers=None, id_column=ID_COLUMN):
+    """Генерирует файлы для всех строк CSV. Возвращает итератор результатов
+    generate_customer() в порядке строк."""
+    resolve_templates(template_names)  # неизвестное имя — ошибка до запуска пула
+    os.makedirs(out_dir, exist_ok=True)
+    rows = read_rows(csv_path)
+    jobs = [(number, row, list(template_names), out_dir, tuple(formats), unit, id_column, stem)
+            for number, (row, stem) in enumerate(zip(rows, unique_stems(rows, id_column)),
+                                                 start=1)]
+    # spawn, а не fork: дочерний процесс не должен наследовать состояние Qt
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        chunk = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        yield from pool.map(generate_customer, jobs, chunksize=chunk)
@@ -1,6 +1,24 @@
 from PyQt6.QtGui import QUndoCommand
 
 
+def _add(scene, item):
+    # Припуск, привязанный к детали (SeamAllowanceItem), возвращается к ней:
+    # scene.removeItem() отвязал его от родителя, а деталь за это время
+    # могла измениться
+    source = getattr(item, 'source', None)
+    if source is not None:
+        item.setParentItem(source)
+        item.follow()
+    else:
+        scene.addItem(item)
+
+
+def _remove(scene, item):
+    # Припуск уходит со сцены вместе с деталью — второй раз его не убираем
+    if item.scene() is scene:
+        scene.removeItem(item)
+
+
 class AddItemCommand(QUndoCommand):
     def __init__(self, scene, item, description="Add item"):
         super().__init__(description)
@@ -8,10 +26,28 @@ class AddItemCommand(QUndoCommand):
         self.item = item
 
     def redo(self):
-        self.scene.addItem(self.item)
+        _add(self.scene, self.item)
 
     def undo(self):
-        self.scene.removeItem(self.item)
+        _remove(self.scene, self.item)
+
+
+class AddItemsCommand(QUndoCommand):
+    """Добавление нескольких объектов одним шагом отмены (градированный
+    комплект и т.п.) — без отдельной команды на каждый объект."""
+
+    def __init__(self, scene, items, description="Add items"):
+        super().__init__(description)
+        self.scene = scene
+        self.items = list(items)
+
+    def redo(self):
+        for item in self.items:
+            _add(self.scene, item)
+
+    def undo(self):
+        for item in self.items:
+            _remove(self.scene, item)
 
 
 class RemoveItemsCommand(QUndoCommand):
@@ -22,11 +58,11 @@ class RemoveItemsCommand(QUndoCommand):
 
     def redo(self):
         for item in self.items:
-            self.scene.removeItem(item)
+            _remove(self.scene, item)
 
     def undo(self):
         for item in self.items:
-            self.scene.addItem(item)
+            _add(self.scene, item)
 
 
 class ChangePenCommand(QUndoCommand):
@@ -57,6 +93,22 @@ class TransformCommand(QUndoCommand):
         self.item.setTransform(self.old)
 
 
+class ChangeParamsCommand(QUndoCommand):
+    """Новые параметры шаблона параметрической детали (PatternPieceItem)."""
+
+    def __init__(self, item, old_params, new_params, description="Change parameters"):
+        super().__init__(description)
+        self.item = item
+        self.old_params = dict(old_params)
+        self.new_params = dict(new_params)
+
+    def redo(self):
+        self.item.set_params(self.new_params)
+
+    def undo(self):
+        self.item.set_params(self.old_params)
+
+
 class EdgeCurveCommand(QUndoCommand):
     """Выгибание/выпрямление одного ребра PatternPieceItem (control=None — прямое ребро)."""
 
@@ -0,0 +1,117 @@
+# app/core/flattening.py
+"""Адаптивная аппроксимация кривых пути ломаными.
+
+Qt раскладывает кривые QPainterPath на отрезки при каждой отрисовке и при
+каждом построении shape(), на любом масштабе. flatten_path() делает это
+один раз с допуском tolerance (в единицах пути): кубический сегмент
+делится пополам (де Кастельжо), пока его контрольные точки отстоят от
+хорды больше допуска, — пологие участки дают мало отрезков, крутые — много.
+
+Допуск задаётся в экранных пикселях и переводится в единицы пути через
+масштаб вида: zoom_bucket() округляет масштаб вверх до ступени
+(BUCKETS_PER_OCTAVE ступеней на удвоение), так что ломаная, построенная
+для ступени, годится на всём её диапазоне масштабов и перестраивается
+только при переходе на другую ступень.
+"""
+import math
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainterPath, QPolygonF
+
+TOLERANCE_PX = 0.25
+BUCKETS_PER_OCTAVE = 2
+_MAX_DEPTH = 16
+
+_MOVE = QPainterPath.ElementType.MoveToElement
+_CURVE = QPainterPath.ElementType.CurveToElement
+
+
+def zoom_bucket(scale):
+    """Номер ступени масштаба: наименьшее k, при котором bucket_scale(k) >= scale."""
+    if scale <= 0:
+        return 0
+    return math.ceil(math.log2(scale) * BUCKETS_PER_OCTAVE - 1e-9)
+
+
+def bucket_scale(bucket):
+    return 2.0 ** (bucket / BUCKETS_PER_OCTAVE)
+
+
+def bucket_tolerance(bucket, tolerance_px=TOLERANCE_PX):
+    """Допуск в единицах пути для ступени масштаба."""
+    return tolerance_px / bucket_scale(bucket)
+
+
+def _flatten_cubic(points, x0, y0, x1, y1, x2, y2, x3, y3, tolerance):
+    # Обход в глубину слева направо: точки добавляются по порядку вдоль кривой
+    tol2 = tolerance * tolerance
+    stack = [(x0, y0, x1, y1, x2, y2, x3, y3, 0)]
+    while stack:
+        x0, y0, x1, y1, x2, y2, x3, y3, depth = stack.pop()
+        dx, dy = x3 - x0, y3 - y0
+        chord2 = dx * dx + dy * dy
+        if chord2 > 1e-12:
+            # Квадраты расстояний контрольных точек до хорды
+            d1 = (dx * (y1 - y0) - dy * (x1 - x0)) ** 2 / chord2
+            d2 = (dx * (y2 - y0) - dy * (x2 - x0)) ** 2 / chord2
+        else:
+            d1 = (x1 - x0) ** 2 + (y1 - y0) ** 2
+            d2 = (x2 - x0) ** 2 + (y2 - y0) ** 2
+        if max(d1, d2) <= tol2 or depth >= _MAX_DEPTH:
+            points.append(QPointF(x3, y3))
+            continue
+        ax, ay = (x0 + x1) / 2, (y0 + y1) / 2
+        bx, by = (x1 + x2) / 2, (y1 + y2) / 2
+        cx, cy = (x2 + x3) / 2, (y2 + y3) / 2
+        abx, aby = (ax + bx) / 2, (ay + by) / 2
+        bcx, bcy = (bx + cx) / 2, (by + cy) / 2
+        mx, my = (abx + bcx) / 2, (aby + bcy) / 2
+        # Правая половина кладётся первой — левая снимается со стека раньше
+        stack.append((mx, my, bcx, bcy, cx, cy, x3, y3, depth + 1))
+        stack.append((x0, y0, ax, ay, abx, aby, mx, my, depth + 1))
+
+
+def flatten_polygons(path, tolerance):
+    """Подпути path как список QPolygonF с кривыми, разложенными на отрезки."""
+    polygons = []
+    points = None
+    count = path.elementCount()
+    i = 0
+    while i < count:
+        e = path.elementAt(i)
+        if e.type == _MOVE:
+            if points:
+                polygons.append(QPolygonF(points))
+            points = [QPointF(e.x, e.y)]
+            i += 1
+        elif e.type == _CURVE:
+            # CurveToElement + два CurveToDataElement: c1, c2, конечная точка
+            c2 = path.elementAt(i + 1)
+            end = path.elementAt(i + 2)
+            last = points[-1]
+            _flatten_cubic(points, last.x(), last.y(), e.x, e.y,
+                           c2.x, c2.y, end.x, end.y, tolerance)
+            i += 3
+        else:
+            points.append(QPointF(e.x, e.y))
+            i += 1
+    if points:
+        polygons.append(QPolygonF(points))
+    return polygons
+
+
+def polygons_path(polygons, fill_rule):
+    """QPainterPath из полигонов flatten_polygons(); замкнутые подпути
+    остаются замкнутыми."""
+    result = QPainterPath()
+    result.setFillRule(fill_rule)
+    for polygon in polygons:
+        result.addPolygon(polygon)
+        if polygon.isClosed():
+            result.closeSubpath()
+    return result
+
+
+def flatten_path(path, tolerance):
+    """QPainterPath из одних отрезков, повторяющий path с точностью tolerance."""
+    return polygons_path(flatten_polygons(path, tolerance), path.fillRule())
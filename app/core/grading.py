@@ -0,0 +1,141 @@
+# app/core/grading.py
+"""Градация выкроек: полный комплект размеров шаблона за один проход.
+
+Таблица размеров (SizeTable) — упорядоченный ряд XS…4XL с базовым
+размером. Правило градации (GradeRule) задаёт для одного параметра
+шаблона прирост в сантиметрах на шаг размера; прирост может отличаться
+для отдельных шагов (например, крупнее после XL). Значения параметров
+для всех размеров считаются от базовых, и весь ряд строится одним
+вызовом generate_batch() — геометрия у размеров общая по структуре.
+
+GradedNest хранит координаты базового размера и для остальных только
+разницу с ними (deltas). Путь любого размера — база + его дельта; так
+деталь базового размера и все градированные варианты остаются связаны
+одной геометрией.
+"""
+from .serialization import path_from_arrays
+
+SIZES = ("XS", "S", "M", "L", "XL", "XXL", "3XL", "4XL")
+BASE_SIZE = "M"
+
+
+class SizeTable:
+    """Упорядоченный ряд размеров и базовый размер в нём."""
+
+    def __init__(self, sizes=SIZES, base=BASE_SIZE):
+        self.sizes = tuple(sizes)
+        if not self.sizes:
+            raise ValueError("Size table is empty")
+        if len(set(self.sizes)) != len(self.sizes):
+            raise ValueError("Size table has duplicate sizes")
+        if base not in self.sizes:
+            raise ValueError(f"Base size {base!r} is not in the size table")
+        self.base = base
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def __iter__(self):
+        return iter(self.sizes)
+
+    def index(self, size):
+        return self.sizes.index(size)
+
+    def steps(self, size):
+        """Число шагов от базового размера (отрицательное — меньше базы)."""
+        return self.index(size) - self.index(self.base)
+
+    def subset(self, first, last):
+        """Таблица от first до last включительно с той же базой."""
+        i, j = sorted((self.index(first), self.index(last)))
+        return SizeTable(self.sizes[i:j + 1], self.base)
+
+
+class GradeRule:
+    """Прирост одного параметра (см) на шаг размера.
+
+    increment — прирост на каждый шаг; steps — необязательные исключения
+    {размер: прирост}: шаг к этому размеру от соседнего, ближнего к базе
+    (steps={"XXL": 6} — от XL к XXL прибавляется 6 см, а не increment).
+    """
+
+    def __init__(self, increment=0.0, steps=None):
+        self.increment = float(increment)
+        self.steps = {k: float(v) for k, v in (steps or {}).items()}
+
+    def offset(self, table, size):
+        """Суммарная разница значения для size относительно базы."""
+        i, base = table.index(size), table.index(table.base)
+        if i == base:
+            return 0.0
+        if i > base:
+            return sum(self.steps.get(s, self.increment) for s in table.sizes[base + 1:i + 1])
+        # Вниз от базы: шаг к размеру s — тот же прирост со знаком минус
+        return -sum(self.steps.get(s, self.increment) for s in table.sizes[i:base])
+
+
+def graded_params(template, table, rules, base_params=None):
+    """{параметр: [значение для каждого размера таблицы]} в см."""
+    values = {p["name"]: p["default"] for p in template.get_parameters()}
+    values.update(base_params or {})
+    unknown = set(rules) - set(values)
+    if unknown:
+        raise ValueError(f"{template.name} has no parameters: {', '.join(sorted(unknown))}")
+    graded = {}
+    for name, value in values.items():
+        rule = rules.get(name)
+        column = [float(value) + (rule.offset(table, s) if rule else 0.0) for s in table]
+        bad = [s for s, v in zip(table, column) if v <= 0]
+        if bad:
+            raise ValueError(f"Grade rule for '{name}' gives a non-positive value "
+                             f"for size {bad[0]}")
+        graded[name] = column
+    return graded
+
+
+class GradedNest:
+    """Градированный комплект: базовая геометрия и дельты размеров.
+
+    types  — (M,) общие типы элементов пути;
+    base   — (M, 2) координаты базового размера, px сцены;
+    deltas — (N, M, 2) разница с базой для каждого размера таблицы
+             (у базового размера — нули).
+    """
+
+    def __init__(self, template, table, params, types, base, deltas):
+        self.template = template
+        self.table = table
+        self.params = params
+        self.types = types
+        self.base = base
+        self.deltas = deltas
+
+    @property
+    def sizes(self):
+        return self.table.sizes
+
+    def size_params(self, size):
+        i = self.table.index(size)
+        return {name: column[i] for name, column in self.params.items()}
+
+    def coords(self, size):
+        """(M, 2) координаты размера."""
+        return self.base + self.deltas[self.table.index(size)]
+
+    def path(self, size):
+        """QPainterPath размера."""
+        return path_from_arrays(self.types, self.coords(size).ravel().tolist(),
+                                0, len(self.types))
+
+
+def grade(template, rules, table=None, base_params=None):
+    """Градированный комплект шаблона по правилам {параметр: GradeRule}.
+
+    base_params — параметры базового размера (недостающие — по умолчанию
+    из get_parameters()). Все размеры строятся одним generate_batch().
+    """
+    table = table or SizeTable()
+    params = graded_params(template, table, rules, base_params)
+    batch = template.generate_batch(**params)
+    base = batch.coords[table.index(table.base)].copy()
+    return GradedNest(template, table, params, batch.types, base, batch.coords - base)
@@ -0,0 +1,346 @@
+# app/core/journal.py
+"""Журнал автосохранения: дописываемый файл изменений рядом с .cld.
+
+Каждая команда, выполненная или отменённая через Canvas.undo_stack,
+превращается в одну-две маленькие JSON-строки (добавить/удалить объект,
+новый трансформ, новая контрольная точка ребра, новое перо) в файле
+`<project>.cld.journal`. Стоимость автосохранения пропорциональна размеру
+правки, а не размеру проекта.
+
+После падения проект восстанавливается так: берётся последний полный
+снимок (`<project>.cld.recovery`, если журнал уже сжимался, иначе сам
+.cld) и поверх него воспроизводятся записи журнала. Когда журнал
+перерастает порог, снимок сцены снимается в GUI-потоке, а запись снимка
+на диск и обрезка журнала идут в фоновом потоке. Каждая запись несёт
+порядковый номер `seq`, а снимок — номер последней вошедшей в него
+записи, поэтому падение посреди сжатия не применит правку дважды.
+"""
+import json
+import os
+import threading
+
+from PyQt6 import sip
+from PyQt6.QtCore import QPointF
+
+from . import serialization
+from .commands import (AddItemCommand, AddItemsCommand, RemoveItemsCommand,
+                       TransformCommand, EdgeCurveCommand, ChangePenCommand,
+                       ChangeParamsCommand)
+from .project_manager import ProjectManager
+
+JOURNAL_SUFFIX = ".journal"
+RECOVERY_SUFFIX = ".recovery"
+COMPACT_THRESHOLD = 4 * 1024 * 1024  # байт
+
+
+def journal_path(project_path):
+    return project_path + JOURNAL_SUFFIX
+
+
+def recovery_path(project_path):
+    return project_path + RECOVERY_SUFFIX
+
+
+def has_recovery(project_path):
+    """Остались ли от прошлой сессии несохранённые изменения."""
+    path = journal_path(project_path)
+    return (os.path.exists(recovery_path(project_path))
+            or (os.path.exists(path) and os.path.getsize(path) > 0))
+
+
+def _remove_recovery(project_path):
+    path = recovery_path(project_path)
+    if os.path.exists(path):
+        os.remove(path)
+    serialization.remove_sidecars(path)
+
+
+def _point(p):
+    return None if p is None else [p.x(), p.y()]
+
+
+def _add_record(item):
+    writer = serialization.GeometryWriter()
+    record = serialization.encode_item(item, writer)
+    if record is None:
+        return None
+    return {"op": "add", "item": record, "geometry": writer.to_dict()}
+
+
+def _remove_record(item):
+    if serialization.item_kind(item) is None:
+        return None
+    return {"op": "remove", "id": serialization.item_id(item)}
+
+
+def command_records(command, undo=False):
+    """Записи журнала для выполнения (или отмены) одной команды."""
+    if command.childCount():
+        # Макрокоманда (beginMacro/endMacro): дочерние команды
+        # выполняются по порядку, отменяются в обратном
+        indices = range(command.childCount())
+        if undo:
+            indices = reversed(indices)
+        records = []
+        for i in indices:
+            records.extend(command_records(command.child(i), undo))
+        return records
+
+    if isinstance(command, AddItemCommand):
+        record = _remove_record(command.item) if undo else _add_record(command.item)
+        return [record] if record else []
+    if isinstance(command, AddItemsCommand):
+        make = _remove_record if undo else _add_record
+        return [r for r in (make(item) for item in command.items) if r]
+    if isinstance(command, RemoveItemsCommand):
+        make = _add_record if undo else _remove_record
+        return [r for r in (make(item) for item in command.items) if r]
+    if isinstance(command, TransformCommand):
+        transform = command.old if undo else command.new
+        return [{"op": "transform", "id": serialization.item_id(command.item),
+                 "transform": serialization.encode_transform(transform)}]
+    if isinstance(command, EdgeCurveCommand):
+        control = command.old_control if undo else command.new_control
+        return [{"op": "edge", "id": serialization.item_id(command.item),
+                 "index": command.edge_index, "control": _point(control)}]
+    if isinstance(command, ChangePenCommand):
+        pen = command.old_pen if undo else command.new_pen
+        return [{"op": "pen", "id": serialization.item_id(command.item),
+                 "pen": serialization.encode_pen(pen)}]
+    if isinstance(command, ChangeParamsCommand):
+        params = command.old_params if undo else command.new_params
+        return [{"op": "params", "id": serialization.item_id(command.item),
+                 "params": params}]
+    return []
+
+
+def apply_record(scene, items_by_id, record):
+    """Применяет одну запись журнала к сцене при восстановлении."""
+    op = record.get("op")
+    if op == "add":
+        reader = serialization.GeometryReader(record["geometry"])
+        item = serialization.decode_item(record["item"], reader)
+        if item is not None:
+            scene.addItem(item)
+            items_by_id[serialization.item_id(item)] = item
+            # Припуск — к своей детали; вернувшаяся деталь — к припускам,
+            # удалённым вместе с ней
+            orphans = [i for i in items_by_id.values()
+                       if i.scene() is None and serialization.is_seam(i)]
+            serialization.attach_seams([item] + orphans, items_by_id)
+        return
+
+    item = items_by_id.get(record.get("id"))
+    if item is None:
+        return
+    if op == "remove":
+        if item.scene() is scene:
+            # Припуски снимаются отдельно: удалённая деталь освобождается
+            # вместе с дочерними объектами, а припуск ждёт её возврата
+            for child in item.childItems():
+                scene.removeItem(child)
+            scene.removeItem(item)
+        del items_by_id[record["id"]]
+    elif op == "transform":
+        item.setTransform(serialization.decode_transform(record["transform"]))
+    elif op == "edge":
+        control = record["control"]
+        item.set_edge_control(record["index"],
+                              None if control is None else QPointF(*control))
+    elif op == "pen":
+        item.setPen(serialization.decode_pen(record["pen"]))
+    elif op == "params":
+        item.set_params(record["params"], immediate=True)
+
+
+def read_records(path):
+    """Записи журнала по порядку. Недописанная при падении последняя
+    строка отбрасывается."""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+def recovery_base(project_path):
+    """Последний полный снимок, поверх которого воспроизводится журнал."""
+    path = recovery_path(project_path)
+    return path if os.path.exists(path) else project_path
+
+
+def replay_journal(project_path, scene, data):
+    """Воспроизводит журнал поверх сцены, уже восстановленной из снимка
+    recovery_base(project_path) (data — данные этого снимка)."""
+    items_by_id = {}
+    for item in scene.items():
+        value = item.data(serialization.ITEM_ID_KEY)
+        if value is not None:
+            items_by_id[value] = item
+    last_seq = data.get("journal_seq", 0)
+    for record in read_records(journal_path(project_path)):
+        if record.get("seq", 0) > last_seq:
+            apply_record(scene, items_by_id, record)
+
+
+class ProjectJournal:
+    """Пишет изменения из undo_stack в журнал открытого проекта."""
+
+    def __init__(self, scene, undo_stack, threshold=COMPACT_THRESHOLD):
+        self.scene = scene
+        self.undo_stack = undo_stack
+        self.threshold = threshold
+        self.project_path = None
+        self._file = None
+        self._size = 0
+        self._seq = 0
+        self._index = 0
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._checkpoint_pending = False
+        undo_stack.indexChanged.connect(self._on_index_changed)
+
+    @property
+    def is_open(self):
+        return self._file is not None
+
+    def open(self, project_path, seq=0):
+        """Начинает новый журнал поверх только что сохранённого/открытого
+        файла project_path — предыдущие записи больше не нужны. seq —
+        "journal_seq" открытого файла: новые записи нумеруются после него,
+        иначе replay_journal() принял бы их за уже вошедшие в снимок."""
+        self.close()
+        self.project_path = project_path
+        _remove_recovery(project_path)
+        self._file = open(journal_path(project_path), 'wb')
+        self._size = 0
+        self._seq = seq
+        self._index = self.undo_stack.index()
+
+    def close(self):
+        """Закрывает журнал и удаляет его файлы (штатное завершение —
+        восстанавливать нечего)."""
+        self.wait()
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.close()
+            self._file = None
+        self._checkpoint_pending = False
+        if os.path.exists(journal_path(self.project_path)):
+            os.remove(journal_path(self.project_path))
+        _remove_recovery(self.project_path)
+        self.project_path = None
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _on_index_changed(self, index):
+        old, self._index = self._index, index
+        # QUndoStack при удалении сам себя очищает и шлёт indexChanged — это
+        # не отмена правок, журнал остаётся как есть
+        if self._file is None or sip.isdeleted(self.undo_stack):
+            return
+        records = []
+        if index > old:
+            for i in range(old, index):
+                records.extend(command_records(self.undo_stack.command(i)))
+        else:
+            for i in range(old - 1, index - 1, -1):
+                command = self.undo_stack.command(i)
+                if command is not None:
+                    records.extend(command_records(command, undo=True))
+        if records:
+            self._append(records)
+
+    def _append(self, records):
+        with self._lock:
+            chunk = bytearray()
+            for record in records:
+                self._seq += 1
+                record["seq"] = self._seq
+                chunk += json.dumps(record, separators=(',', ':')).encode('utf-8')
+                chunk += b"\n"
+            self._file.write(chunk)
+            # flush без fsync: от падения приложения это защищает, а fsync на
+            # каждую правку заметно тормозил бы перетаскивание
+            self._file.flush()
+            self._size += len(chunk)
+            size = self._size
+        compacting = self._compactor is not None and self._compactor.is_alive()
+        if size > self.threshold and not compacting and not self._checkpoint_pending:
+            self.compact()
+
+    def mark_checkpoint(self):
+        """Вызывается в момент снимка сцены для сохранения в project_path.
+        Возвращает (seq, cut): seq записывается в сохраняемый проект как
+        "journal_seq", cut передаётся в finish_checkpoint() после записи.
+        Пока сохранение идёт, журнал продолжает писаться, но не сжимается."""
+        self.wait()
+        with self._lock:
+            self._checkpoint_pending = True
+            return self._seq, self._size
+
+    def finish_checkpoint(self, cut):
+        """Снимок записан: всё, что было в журнале до cut, в нём уже есть."""
+        self._checkpoint_pending = False
+        if self._file is None:
+            return
+        _remove_recovery(self.project_path)
+        self._drop_head(cut)
+
+    def abort_checkpoint(self):
+        self._checkpoint_pending = False
+
+    def compact(self, wait=False):
+        """Снимает полный снимок сцены и в фоне заменяет им журнал."""
+        if self._file is None:
+            return
+        self.wait()
+        rect = self.scene.sceneRect()
+        manager = ProjectManager()
+        manager.new_project(int(rect.width()), int(rect.height()))
+        manager.capture_scene(self.scene)
+        with self._lock:
+            manager.current_project["journal_seq"] = self._seq
+            cut = self._size
+        self._compactor = threading.Thread(
+            target=self._write_snapshot, args=(manager, cut), daemon=True
+        )
+        self._compactor.start()
+        if wait:
+            self.wait()
+
+    def _write_snapshot(self, manager, cut):
+        # Голову журнала режем, только если снимок записан: иначе правки до
+        # cut не остались бы нигде. При ошибке журнал остаётся целиком
+        try:
+            saved = manager.save_project(recovery_path(self.project_path))
+        except OSError:
+            saved = False
+        if saved:
+            self._drop_head(cut)
+
+    def _drop_head(self, cut):
+        # Всё до cut уже в снимке — в журнале оставляем только хвост,
+        # дописанный, пока снимок сохранялся
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            jpath = journal_path(self.project_path)
+            with open(jpath, 'rb') as f:
+                f.seek(cut)
+                tail = f.read()
+            with open(jpath + ".tmp", 'wb') as f:
+                f.write(tail)
+            os.replace(jpath + ".tmp", jpath)
+            self._file = open(jpath, 'ab')
+            self._size = len(tail)
@@ -38,6 +38,12 @@ class MeasurementSystem:
             return f"{int(round(value))} px"
         return f"{value:.1f} {self._unit}"
 
+    def format_area(self, px2):
+        value = self.px_to_unit(self.px_to_unit(px2))
+        if self._unit == "px":
+            return f"{int(round(value))} px²"
+        return f"{value:.1f} {self._unit}²"
+
     def format_coord(self, x_px, y_px):
         return f"X: {self.format(x_px)}   Y: {self.format(y_px)}"
 
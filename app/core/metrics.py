@@ -0,0 +1,225 @@
+# app/core/metrics.py
+"""Метрики контура детали: площадь, периметр, длины рёбер, центр масс.
+
+Считаются по сегментам QPainterPath аналитически, а не семплированием
+QPainterPath.length(): отрезок — по точным формулам, кубическая кривая
+(квадратичные Qt хранит как кубические) — квадратурой Гаусса–Лежандра.
+Площадь и центр масс — по формуле Грина: для кривой Безье подынтегральные
+выражения — многочлены степени не выше 8, и квадратура на _ORDER узлах
+для них точна; длина дуги (корень из многочлена) — с точностью до 1e-6
+и лучше для кривых деталей.
+
+Все величины — в px сцены после transform() детали; перевод в единицы
+пользователя — PathMetrics.to_units() через MeasurementSystem.
+"""
+import math
+
+import numpy as np
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainterPath
+
+_ORDER = 16
+# Узлы и веса на отрезке [0, 1]
+_NODES = [(0.5 * (x + 1), 0.5 * w)
+          for x, w in zip(*np.polynomial.legendre.leggauss(_ORDER))]
+
+# Синус угла, ниже которого стык двух кривых считается гладким
+_SMOOTH_SIN = 1e-6
+
+_MOVE = QPainterPath.ElementType.MoveToElement
+_CURVE = QPainterPath.ElementType.CurveToElement
+
+
+def line_terms(x0, y0, x1, y1):
+    """(длина, ∮x dy − y dx, ∮x² dy, ∮y² dx) отрезка."""
+    dx, dy = x1 - x0, y1 - y0
+    return (math.hypot(dx, dy),
+            x0 * y1 - x1 * y0,
+            dy * (x0 * x0 + x0 * dx + dx * dx / 3),
+            dx * (y0 * y0 + y0 * dy + dy * dy / 3))
+
+
+def cubic_terms(x0, y0, x1, y1, x2, y2, x3, y3):
+    """То же для кубической кривой Безье — квадратурой Гаусса–Лежандра."""
+    length = green = mx = my = 0.0
+    for t, w in _NODES:
+        s = 1 - t
+        b0, b1, b2, b3 = s * s * s, 3 * s * s * t, 3 * s * t * t, t * t * t
+        x = b0 * x0 + b1 * x1 + b2 * x2 + b3 * x3
+        y = b0 * y0 + b1 * y1 + b2 * y2 + b3 * y3
+        d0, d1, d2 = 3 * s * s, 6 * s * t, 3 * t * t
+        vx = d0 * (x1 - x0) + d1 * (x2 - x1) + d2 * (x3 - x2)
+        vy = d0 * (y1 - y0) + d1 * (y2 - y1) + d2 * (y3 - y2)
+        length += w * math.hypot(vx, vy)
+        green += w * (x * vy - y * vx)
+        mx += w * x * x * vy
+        my += w * y * y * vx
+    return length, green, mx, my
+
+
+def path_segments(path, transform=None):
+    """Сегменты пути после transform: ("line", x0, y0, x1, y1) или
+    ("cubic", x0, y0, ..., x3, y3). Замкнутый подпуть Qt уже заканчивает
+    явным отрезком к началу, так что рёбра — это все сегменты по порядку."""
+    return [segment for segments in path_subpaths(path, transform) for segment in segments]
+
+
+def path_subpaths(path, transform=None):
+    """Сегменты path_segments(), разбитые по подпутям: [[сегмент, ...], ...]."""
+    if transform is None:
+        def m(x, y):
+            return x, y
+    else:
+        a, b, c, d = transform.m11(), transform.m12(), transform.m21(), transform.m22()
+        tx, ty = transform.dx(), transform.dy()
+
+        def m(x, y):
+            return a * x + c * y + tx, b * x + d * y + ty
+
+    subpaths = []
+    segments = None
+    count = path.elementCount()
+    last = None
+    i = 0
+    while i < count:
+        e = path.elementAt(i)
+        if e.type == _MOVE:
+            last = m(e.x, e.y)
+            segments = []
+            subpaths.append(segments)
+            i += 1
+        elif e.type == _CURVE:
+            c1 = m(e.x, e.y)
+            e2, e3 = path.elementAt(i + 1), path.elementAt(i + 2)
+            c2, end = m(e2.x, e2.y), m(e3.x, e3.y)
+            segments.append(("cubic",) + last + c1 + c2 + end)
+            last = end
+            i += 3
+        else:
+            end = m(e.x, e.y)
+            if end != last:
+                segments.append(("line",) + last + end)
+            last = end
+            i += 1
+    return subpaths
+
+
+def _cubic_tangents(segment):
+    # Направления в начале и в конце кривой: у вырожденной кривой
+    # контрольная точка совпадает с концом — берём следующую
+    points = [segment[i:i + 2] for i in (1, 3, 5, 7)]
+    start = next(((x - points[0][0], y - points[0][1]) for x, y in points[1:]
+                  if (x, y) != points[0]), (0.0, 0.0))
+    end = next(((points[3][0] - x, points[3][1] - y) for x, y in reversed(points[:3])
+                if (x, y) != points[3]), (0.0, 0.0))
+    return start, end
+
+
+def _smooth_joint(first, second):
+    """Кривая second продолжает кривую first без излома."""
+    if first[0] != "cubic" or second[0] != "cubic" or first[-2:] != second[1:3]:
+        return False
+    (ax, ay), (bx, by) = _cubic_tangents(first)[1], _cubic_tangents(second)[0]
+    norm = math.hypot(ax, ay) * math.hypot(bx, by)
+    return norm > 0 and ax * bx + ay * by > 0 and abs(ax * by - ay * bx) <= _SMOOTH_SIN * norm
+
+
+def edge_groups(subpaths):
+    """Рёбра выкройки по сегментам path_subpaths(): списки номеров сегментов
+    (сквозных, как в path_segments()). Кривые, гладко переходящие одна в
+    другую, — одно ребро: дугу шаблона больше 90° (arcTo) Qt раскладывает
+    на несколько кубических кривых. Отрезки и изломы — границы рёбер."""
+    groups = []
+    offset = 0
+    for segments in subpaths:
+        own = []
+        for k, segment in enumerate(segments):
+            if own and _smooth_joint(segments[k - 1], segment):
+                own[-1].append(offset + k)
+            else:
+                own.append([offset + k])
+        # Замкнутый подпуть: ребро может проходить через его начало
+        if len(own) > 1 and _smooth_joint(segments[-1], segments[0]):
+            own[0] = own.pop() + own[0]
+        groups.extend(own)
+        offset += len(segments)
+    return groups
+
+
+def segment_terms(segment):
+    if segment[0] == "line":
+        return line_terms(*segment[1:])
+    return cubic_terms(*segment[1:])
+
+
+class PathMetrics:
+    """Площадь (px²), периметр и длины рёбер (px), центр масс (QPointF).
+
+    Собирается из слагаемых по сегментам (segment_terms), поэтому при
+    изменении одного ребра пересчитывается только оно — with_edge() или
+    from_path(..., previous=) с метриками прежней геометрии. Ребро — группа
+    сегментов из groups (см. edge_groups()), по умолчанию — один сегмент.
+    """
+
+    def __init__(self, terms, segments=None, groups=None):
+        self.terms = list(terms)
+        self.segments = segments
+        self.groups = groups or [[i] for i in range(len(self.terms))]
+        self.edges = [sum(self.terms[i][0] for i in group) for group in self.groups]
+        self.perimeter = sum(self.edges)
+        signed = 0.5 * sum(t[1] for t in self.terms)
+        self.area = abs(signed)
+        if abs(signed) > 1e-12:
+            self.centroid = QPointF(sum(t[2] for t in self.terms) / (2 * signed),
+                                    -sum(t[3] for t in self.terms) / (2 * signed))
+        else:
+            self.centroid = QPointF()
+
+    @classmethod
+    def from_path(cls, path, transform=None, previous=None, join_smooth=True):
+        """Метрики пути; сегменты, совпавшие с сегментами previous (например,
+        все рёбра, кроме перетаскиваемого), не интегрируются заново.
+        join_smooth=False — каждый сегмент отдельное ребро (деталь по
+        вершинам, где ребро — сегмент между соседними вершинами)."""
+        subpaths = path_subpaths(path, transform)
+        segments = [segment for own in subpaths for segment in own]
+        known = {}
+        if previous is not None and previous.segments is not None:
+            known = dict(zip(previous.segments, previous.terms))
+        terms = [known.get(s) or segment_terms(s) for s in segments]
+        return cls(terms, segments, edge_groups(subpaths) if join_smooth else None)
+
+    def with_edge(self, index, segment):
+        """Метрики с заменённым сегментом index — без пересчёта остальных;
+        разбиение на рёбра прежнее."""
+        terms = list(self.terms)
+        terms[index] = segment_terms(segment)
+        segments = None
+        if self.segments is not None:
+            segments = list(self.segments)
+            segments[index] = segment
+        return PathMetrics(terms, segments, self.groups)
+
+    def to_units(self, measurements):
+        """Словарь метрик в единицах measurements (площадь — в квадрате единицы)."""
+        to_unit = measurements.px_to_unit
+        return {
+            "area": to_unit(to_unit(self.area)),
+            "perimeter": to_unit(self.perimeter),
+            "edges": [to_unit(length) for length in self.edges],
+            "centroid": (to_unit(self.centroid.x()), to_unit(self.centroid.y())),
+        }
+
+
+def seam_match(length_a, length_b, notches=0):
+    """Сравнение длин двух сшиваемых рёбер (например, пройма — A, окат
+    рукава — B): разница B − A, посадка в процентах от A и положения
+    notches надсечек — пары расстояний от начала ребра A и ребра B, между
+    которыми посадка распределяется поровну."""
+    positions = [(length_a * k / (notches + 1), length_b * k / (notches + 1))
+                 for k in range(1, notches + 1)]
+    return {
+        "difference": length_b - length_a,
+        "ease": (length_b - length_a) / length_a * 100 if length_a > 0 else 0.0,
+        "notches": positions,
+    }
@@ -0,0 +1,294 @@
+# app/core/offset.py
+"""Внешний эквидистантный контур детали — линия раскроя с припуском.
+
+Контур детали раскладывается на ломаную (core/flattening.py), каждый её
+отрезок сдвигается наружу на ширину припуска своего ребра, и соседние
+сдвинутые отрезки соединяются:
+
+- внутри ребра и на гладких стыках рёбер одной ширины — пересечением
+  сдвинутых прямых (излом ломаной мал, точка пересечения рядом);
+- на выпуклом углу — стилем угла: MITRE (продолжение до пересечения, при
+  слишком остром угле — BEVEL), SQUARE (срез поперёк биссектрисы на
+  ширине припуска от вершины) или BEVEL (срез);
+- на вогнутом углу — через вершину исходного контура.
+
+Вогнутые углы и участки кривой с радиусом меньше припуска дают на сыром
+контуре петли; их убирает один проход QPainterPath.simplified() по
+ломаной (заливка Winding), так что время — линейный проход плюс
+объединение многоугольника, без булевых операций над кривыми, которые
+делал QPainterPathStroker + united().
+
+Рёбра нумеруются как сегменты metrics.path_segments(): ширину можно
+задать числом или списком по рёбрам (подгибка низа шире боковых швов).
+Ширины по рёбрам панели метрик (metrics.edge_groups()) раскладывает на
+сегменты панель припусков (seam_panel.segment_widths()).
+Сдвинутые точки считаются по кускам на сегмент, и OffsetCache хранит их
+между вызовами — припуск, привязанный к детали, после выгибания ребра
+пересчитывает только его.
+"""
+import math
+
+import numpy as np
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QPainterPath, QPolygonF
+
+from . import flattening
+from .metrics import path_subpaths
+
+MITRE = "mitre"
+SQUARE = "square"
+BEVEL = "bevel"
+JOINS = (MITRE, SQUARE, BEVEL)
+MITRE_LIMIT = 4.0       # острее — срез; в ширинах припуска от вершины
+# Излом ломаной меньше этого угла (рад) — гладкий стык, а не угол детали
+_SMOOTH_TURN = math.radians(8)
+
+
+def _segment_points(segment, tolerance):
+    """Ломаная сегмента metrics.path_segments() без начальной точки —
+    последняя точка совпадает с концом сегмента."""
+    if segment[0] == "line":
+        return [segment[3:5]]
+    curve = []
+    flattening._flatten_cubic(curve, *segment[1:], tolerance)
+    return [(p.x(), p.y()) for p in curve]
+
+
+def _intersect(p, d, q, e):
+    """Точка пересечения прямых p + t·d и q + s·e или None (параллельны)."""
+    cross = d[0] * e[1] - d[1] * e[0]
+    if abs(cross) < 1e-12:
+        return None
+    t = ((q[0] - p[0]) * e[1] - (q[1] - p[1]) * e[0]) / cross
+    return p[0] + t * d[0], p[1] + t * d[1]
+
+
+def _behind(point, a, d, length):
+    """point лежит на сдвинутом отрезке, заканчивающемся в a (длина length)."""
+    t = (a[0] - point[0]) * d[0] + (a[1] - point[1]) * d[1]
+    return 0 <= t <= length
+
+
+def _ahead(point, b, d, length):
+    """point лежит на сдвинутом отрезке, начинающемся в b (длина length)."""
+    t = (point[0] - b[0]) * d[0] + (point[1] - b[1]) * d[1]
+    return 0 <= t <= length
+
+
+def _remove_local_loops(points, suspect):
+    """Вырезает петли сырого контура в окрестности подозрительных точек.
+
+    Петля («ласточкин хвост») появляется там, где сдвинутый контур идёт
+    против своего ребра — на вогнутом углу или на кривой с радиусом меньше
+    припуска. Обратный участок длины R замыкается в петлю, пересекая
+    контур не дальше ~R до себя и ~R после, поэтому после него следующие
+    отрезки (на длине 2R) проверяются на пересечение с контуром в окне 3R
+    назад — векторно по массивам, — и петля до найденного пересечения
+    вырезается. Работа — O(n) проверок с окнами по размеру петель, а не
+    O(n²), и simplified() достаются лишь дальние самопересечения.
+    """
+    n = len(points)
+    xs, ys, cum = np.empty(n), np.empty(n), np.empty(n)
+    xs[0], ys[0], cum[0] = points[0][0], points[0][1], 0.0
+    m = 1
+    run = budget = 0.0
+    for (px, py), flagged in zip(points[1:], suspect[1:]):
+        qx, qy = xs[m - 1], ys[m - 1]
+        step = math.hypot(px - qx, py - qy)
+        if flagged:
+            run += step
+            budget = 2 * run
+        elif budget <= 0:
+            run = 0.0
+        if budget > 0 and m >= 3:
+            budget -= step
+            j0 = int(np.searchsorted(cum[:m - 2], cum[m - 1] - 3 * run))
+            ax, ay = xs[j0:m - 2], ys[j0:m - 2]
+            rx, ry = xs[j0 + 1:m - 1] - ax, ys[j0 + 1:m - 1] - ay
+            sx, sy = px - qx, py - qy
+            denom = rx * sy - ry * sx
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = ((qx - ax) * sy - (qy - ay) * sx) / denom
+                u = ((qx - ax) * ry - (qy - ay) * rx) / denom
+            hits = np.flatnonzero((t > 0) & (t < 1) & (u > 0) & (u < 1))
+            if hits.size:
+                j = hits[-1]    # ближайшее пересечение
+                cx, cy = ax[j] + t[j] * rx[j], ay[j] + t[j] * ry[j]
+                m = j0 + j + 1
+                cum[m] = cum[m - 1] + math.hypot(cx - xs[m - 1], cy - ys[m - 1])
+                xs[m], ys[m] = cx, cy
+                m += 1
+                step = math.hypot(px - cx, py - cy)
+                run = budget = 0.0
+        xs[m], ys[m], cum[m] = px, py, cum[m - 1] + step
+        m += 1
+    return list(zip(xs[:m].tolist(), ys[:m].tolist()))
+
+
+def _square_cap(v, a, d0, b, d1, width, sign):
+    """Концы квадратного угла у выпуклой вершины v: срез перпендикулярно
+    биссектрисе угла на расстоянии width от вершины. Он всегда ближе точки
+    пересечения сдвинутых прямых (та на width / cos(угол / 2)), поэтому
+    концы лежат на самих сдвинутых отрезках, и контур не перекрещивается,
+    как при продлении каждого ребра на width. None — угол почти прямой
+    (рёбра разной ширины): срез ушёл бы в бесконечность."""
+    nx, ny = sign * (d0[1] + d1[1]), -sign * (d0[0] + d1[0])
+    length = math.hypot(nx, ny)
+    if length < 1e-9:
+        return None
+    nx, ny = nx / length, ny / length
+    along0 = d0[0] * nx + d0[1] * ny
+    along1 = d1[0] * nx + d1[1] * ny
+    if along0 < 1e-6 or along1 > -1e-6:
+        return None
+    t0 = (width - (a[0] - v[0]) * nx - (a[1] - v[1]) * ny) / along0
+    t1 = (width - (b[0] - v[0]) * nx - (b[1] - v[1]) * ny) / along1
+    if t0 < 0 or t1 > 0:
+        return None
+    return (a[0] + d0[0] * t0, a[1] + d0[1] * t0), (b[0] + d1[0] * t1, b[1] + d1[1] * t1)
+
+
+def _join(p, v, q, w0, w1, sign, join, mitre_limit):
+    """Точки сдвинутого контура у вершины v между рёбрами p → v (припуск w0)
+    и v → q (w1): [(x, y, dx, dy, петля)], где (dx, dy) — направление ребра,
+    против которого не должен идти отрезок к точке (NaN — не проверять), а
+    «петля» — точка заведомо на петле."""
+    vx, vy = v
+    l0 = math.hypot(vx - p[0], vy - p[1])
+    l1 = math.hypot(q[0] - vx, q[1] - vy)
+    d0 = ((vx - p[0]) / l0, (vy - p[1]) / l0)
+    d1 = ((q[0] - vx) / l1, (q[1] - vy) / l1)
+    a = (vx + sign * d0[1] * w0, vy - sign * d0[0] * w0)   # конец предыдущего сдвинутого
+    b = (vx + sign * d1[1] * w1, vy - sign * d1[0] * w1)   # начало следующего
+    cross = d0[0] * d1[1] - d0[1] * d1[0]
+    dot = d0[0] * d1[0] + d0[1] * d1[1]
+    turn = math.atan2(abs(cross), dot)
+    nan = math.nan
+    if turn < _SMOOTH_TURN and w0 == w1:
+        point = _intersect(a, d0, b, d1) or a
+        return [point + d0 + (False,)]
+    if cross * sign > 0:
+        # Выпуклый угол
+        point = _intersect(a, d0, b, d1) if join == MITRE else None
+        if point is not None and math.hypot(point[0] - vx, point[1] - vy) <= mitre_limit * max(w0, w1):
+            return [point + d0 + (False,)]
+        if join == SQUARE:
+            cap = _square_cap(v, a, d0, b, d1, max(w0, w1), sign)
+            if cap is not None:
+                return [cap[0] + d0 + (False,), cap[1] + (nan, nan, False)]
+        return [a + d0 + (False,), b + (nan, nan, False)]
+    if abs(cross) < 1e-9 and dot > 0:
+        # Прямой стык рёбер разной ширины — ступенька
+        return [a + d0 + (False,), b + (nan, nan, False)]
+    # Вогнутый угол: сдвинутые отрезки обычно пересекаются — берём точку
+    # пересечения, если рёбра короче припуска — через вершину
+    point = _intersect(a, d0, b, d1)
+    if point is not None and _behind(point, a, d0, l0) and _ahead(point, b, d1, l1):
+        return [point + d0 + (False,)]
+    return [a + d0 + (False,), (vx, vy, nan, nan, True), b + (nan, nan, True)]
+
+
+class OffsetCache:
+    """Эквидистанта, собираемая из кусков по сегментам пути.
+
+    Кусок сегмента — сдвинутые точки у его вершин (начало и внутренние
+    точки ломаной). Он зависит только от самого сегмента, его припуска и
+    последнего отрезка предыдущего сегмента, поэтому, когда у детали
+    выгнули одно ребро, заново раскладываются и сдвигаются лишь это ребро
+    и следующее за ним (его первый угол), а остальные куски берутся из
+    кэша прошлого вызова. Каждый вызов заново делает только сборку,
+    вырезание петель и simplified().
+
+    computed — сколько кусков пришлось посчитать в последнем вызове.
+    """
+
+    def __init__(self, tolerance=flattening.TOLERANCE_PX):
+        self.tolerance = tolerance
+        self.computed = 0
+        self._flat = {}     # сегмент -> (вершины, конец, удвоенная площадь)
+        self._chunks = {}   # (сегмент, стык, ширины, ...) -> точки куска
+
+    def _flatten(self, segment, flat):
+        entry = self._flat.get(segment)
+        if entry is None:
+            points = [segment[1:3]]
+            for p in _segment_points(segment, self.tolerance):
+                if p != points[-1]:
+                    points.append(p)
+            area2 = sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:]))
+            entry = (points[:-1], points[-1], area2)
+        flat[segment] = entry
+        return entry
+
+    def _contour(self, segments, join, mitre_limit, flat, chunks):
+        """Сдвинутый контур одного замкнутого подпути ([(сегмент, припуск)])."""
+        parts = []
+        for segment, width in segments:
+            vertices, end, area2 = self._flatten(segment, flat)
+            if vertices:
+                parts.append((segment, width, vertices, end, area2))
+        if sum(len(part[2]) for part in parts) < 3:
+            return None
+        sign = 1.0 if sum(part[4] for part in parts) > 0 else -1.0
+        rows = []
+        _, prev_width, prev_vertices, _, _ = parts[-1]
+        for segment, width, vertices, end, _ in parts:
+            key = (segment, prev_vertices[-1], prev_width, width, sign, join, mitre_limit)
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                self.computed += 1
+                chunk = []
+                p, w0 = prev_vertices[-1], prev_width
+                for k, v in enumerate(vertices):
+                    q = vertices[k + 1] if k + 1 < len(vertices) else end
+                    chunk += _join(p, v, q, w0, width, sign, join, mitre_limit)
+                    p, w0 = v, width
+            chunks[key] = chunk
+            rows += chunk
+            prev_vertices, prev_width = vertices, width
+        # Начинаем с крайней правой точки — она на внешнем контуре, и петли
+        # не переходят через начало обхода
+        rows = np.array(rows)
+        rows = np.roll(rows, -int(np.argmax(rows[:, 0])), axis=0)
+        # Отрезок к точке идёт против своего ребра — признак петли
+        step = rows[:, :2] - np.roll(rows[:, :2], 1, axis=0)
+        with np.errstate(invalid="ignore"):
+            suspect = (rows[:, 4] != 0) | (step[:, 0] * rows[:, 2] + step[:, 1] * rows[:, 3] < 0)
+        suspect[0] = rows[0, 4] != 0
+        return _remove_local_loops(rows[:, :2].tolist(), suspect.tolist())
+
+    def offset_path(self, path, widths, join=MITRE, mitre_limit=MITRE_LIMIT):
+        """Внешний контур path с припуском widths (число или список по
+        рёбрам, нумерация — metrics.path_segments())."""
+        self.computed = 0
+        flat, chunks = {}, {}
+        result = QPainterPath()
+        result.setFillRule(Qt.FillRule.WindingFill)
+        index = 0
+        for segments in path_subpaths(path):
+            if isinstance(widths, (int, float)):
+                edge_widths = [float(widths)] * len(segments)
+            else:
+                edge_widths = [float(widths[min(e, len(widths) - 1)])
+                               for e in range(index, index + len(segments))]
+            index += len(segments)
+            if not segments:
+                continue
+            pairs = list(zip(segments, edge_widths))
+            # Незамкнутый подпуть замыкается отрезком с припуском последнего ребра
+            if segments[-1][-2:] != segments[0][1:3]:
+                pairs.append((("line",) + segments[-1][-2:] + segments[0][1:3], edge_widths[-1]))
+            contour = self._contour(pairs, join, mitre_limit, flat, chunks)
+            if contour is None:
+                continue
+            result.addPolygon(QPolygonF([QPointF(x, y) for x, y in contour]))
+            result.closeSubpath()
+        # В кэше остаётся только использованное — память по размеру контура
+        self._flat, self._chunks = flat, chunks
+        return result.simplified()
+
+
+def offset_path(path, widths, join=MITRE, mitre_limit=MITRE_LIMIT,
+                tolerance=flattening.TOLERANCE_PX):
+    """Внешний контур path с припуском widths (число или список по рёбрам)."""
+    return OffsetCache(tolerance).offset_path(path, widths, join, mitre_limit)
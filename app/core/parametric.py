@@ -0,0 +1,108 @@
+# app/core/parametric.py
+"""Параметрические детали: перестроение геометрии по шаблону и параметрам.
+
+PatternPieceItem, поставленный из шаблона, хранит template и params.
+Изменение параметров (set_params) не пересобирает путь сразу, а ставит
+деталь в очередь: все изменения за COALESCE_MS сливаются в одно
+перестроение с последними значениями — при перетаскивании слайдера
+шаблон строится не на каждое событие, а не чаще раза в интервал.
+
+В том же проходе перестраиваются зависимые оверлеи — припуски и отметки
+строчек, привязанные к детали через seams.LINK_KEY, и оверлеи, привязанные
+к этим оверлеям (строчка по линии припуска). Припуск — дочерний объект
+детали (SeamAllowanceItem) следует за её setPath() сам. Отметке строчки
+(StitchMarkItem) передаётся сам путь источника — стежки она строит при
+отрисовке.
+"""
+from PyQt6.QtCore import QObject, QTimer
+
+from . import serialization
+from .seams import LINK_KEY, overlay_path
+from ..tools.stitch_item import StitchMarkItem
+
+COALESCE_MS = 30
+
+_regenerator = None
+
+
+def _rebuild(overlay, link, source):
+    if isinstance(overlay, StitchMarkItem):
+        overlay.setPath(source.path())
+    else:
+        overlay.setPath(overlay_path(link, source.path()))
+
+
+def update_dependents(scene, sources):
+    """Перестраивает оверлеи сцены, привязанные к sources (цепочкой)."""
+    overlays = [i for i in scene.items() if isinstance(i.data(LINK_KEY), dict)]
+    changed = {serialization.item_id(i): i for i in sources}
+    done = set(changed)
+    while changed:
+        updated = {}
+        for overlay in overlays:
+            link = overlay.data(LINK_KEY)
+            source = changed.get(link.get("source"))
+            if source is None:
+                continue
+            if isinstance(overlay, serialization.PlaceholderItem):
+                overlay = serialization.replace_placeholder(overlay)
+                _rebuild(overlay, link, source)
+            elif overlay.parentItem() is not source:
+                # Привязанный припуск деталь уже перестроила в setPath()
+                _rebuild(overlay, link, source)
+            overlay_id = serialization.item_id(overlay)
+            if overlay_id not in done:
+                done.add(overlay_id)
+                updated[overlay_id] = overlay
+        changed = updated
+
+
+def regenerate(items):
+    """Сразу перестраивает детали и их зависимые оверлеи."""
+    by_scene = {}
+    for item in items:
+        if item.template is None:
+            continue
+        item.setPath(item.template.cached_path(**item.params))
+        scene = item.scene()
+        if scene is not None:
+            by_scene.setdefault(id(scene), (scene, []))[1].append(item)
+    for scene, sources in by_scene.values():
+        update_dependents(scene, sources)
+
+
+class Regenerator(QObject):
+    """Очередь деталей, ждущих перестроения; одна деталь — одно
+    перестроение за интервал, сколько бы раз ни менялись параметры."""
+
+    def __init__(self, interval=COALESCE_MS, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    def schedule(self, item):
+        self._pending[id(item)] = item
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        items, self._pending = list(self._pending.values()), {}
+        regenerate(items)
+
+
+def schedule(item):
+    """Ставит деталь в очередь перестроения."""
+    global _regenerator
+    if _regenerator is None:
+        _regenerator = Regenerator()
+    _regenerator.schedule(item)
+
+
+def flush():
+    """Выполняет отложенные перестроения (перед сохранением, экспортом)."""
+    if _regenerator is not None:
+        _regenerator.flush()
@@ -0,0 +1,140 @@
+# app/core/project_file.py
+"""Доступ к файлу .cld только на чтение — без QApplication и без сцены.
+
+Для утилит, которым не нужен редактор: миниатюры, экспорт, статистика.
+Объекты не создаются: записи остаются словарями из JSON, а геометрия
+читается по ссылкам [offset, count] прямо из секции (у больших проектов —
+из отображённого в память файла-спутника) и только для тех деталей, к
+которым обратились.
+"""
+import json
+import os
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QImage, QPainter, QPen, QBrush, QColor, QTransform, QFont, QTextDocument
+
+from .seams import LINK_KEY, stitch_path
+from .serialization import GeometryReader, decode_transform, decode_pen, decode_brush
+from ..tools.pattern_item import build_polygon_path
+
+
+def text_document(record):
+    """QTextDocument текстовой записи — раскладка как у QGraphicsTextItem
+    (нужен QGuiApplication со шрифтами)."""
+    font = QFont()
+    font.fromString(record["font"])
+    document = QTextDocument()
+    document.setDefaultFont(font)
+    document.setPlainText(record["text"])
+    return document
+
+
+class ProjectFile:
+    def __init__(self, file_path):
+        with open(file_path, 'r') as f:
+            self.data = json.load(f)
+        self.reader = GeometryReader(self.data.get("geometry"), os.path.dirname(file_path))
+
+    @classmethod
+    def from_data(cls, data, reader):
+        """Обёртка над уже загруженным проектом (ProjectManager.current_project)."""
+        project = cls.__new__(cls)
+        project.data = data
+        project.reader = reader
+        return project
+
+    @property
+    def objects(self):
+        return self.data.get("objects", [])
+
+    def __len__(self):
+        return len(self.objects)
+
+    def records(self, kind=None):
+        """Записи объектов, при желании — только заданного типа ("piece",
+        "path", "text", "annotation")."""
+        for record in self.objects:
+            if kind is None or record.get("type") == kind:
+                yield record
+
+    def local_path(self, record):
+        """Контур объекта в его локальных координатах (None для текста).
+        У отметки строчки — со всеми стежками вдоль сохранённой линии шва."""
+        if "vertices" in record:
+            return build_polygon_path(self.reader.points(record["vertices"]),
+                                      self.reader.points(record["edge_controls"]))
+        if "path" in record:
+            path = self.reader.path(record["path"])
+            if record.get("procedural"):
+                link = record["tags"][str(LINK_KEY)]
+                path = stitch_path(link["kind"], path, link["size"])
+            return path
+        return None
+
+    def scene_transform(self, record):
+        """Локальные координаты → координаты сцены (трансформ, затем pos)."""
+        t = decode_transform(record["transform"]) if "transform" in record else QTransform()
+        x, y = record["pos"]
+        return t * QTransform.fromTranslate(x, y)
+
+    def scene_path(self, record):
+        path = self.local_path(record)
+        if path is None:
+            return None
+        return self.scene_transform(record).map(path)
+
+    def scene_bounds(self, record):
+        """Прямоугольник объекта на сцене по индексу — без чтения геометрии."""
+        if "bounds" not in record:
+            path = self.scene_path(record)
+            return path.boundingRect() if path is not None else QRectF()
+        return self.scene_transform(record).mapRect(QRectF(*record["bounds"]))
+
+    def bounds(self):
+        rect = QRectF()
+        for record in self.objects:
+            rect = rect.united(self.scene_bounds(record))
+        return rect
+
+    def statistics(self):
+        counts = {}
+        for record in self.objects:
+            kind = record.get("type", "?")
+            counts[kind] = counts.get(kind, 0) + 1
+        rect = self.bounds()
+        return {
+            "width": self.data.get("width"),
+            "height": self.data.get("height"),
+            "objects": len(self.objects),
+            "by_type": counts,
+            "geometry_elements": len(self.reader.types),
+            "bounds": [rect.x(), rect.y(), rect.width(), rect.height()],
+        }
+
+    def render_thumbnail(self, max_size=256, background=QColor(255, 255, 255)):
+        """Миниатюра контуров всех деталей и линий (текст пропускается —
+        для него нужен QApplication со шрифтами)."""
+        rect = self.bounds()
+        if rect.isEmpty():
+            rect = QRectF(0, 0, self.data.get("width", 1), self.data.get("height", 1))
+        scale = max_size / max(rect.width(), rect.height())
+        image = QImage(max(1, round(rect.width() * scale)), max(1, round(rect.height() * scale)),
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(background)
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.scale(scale, scale)
+        painter.translate(-rect.x(), -rect.y())
+        for record in self.objects:
+            if record.get("type") not in ("piece", "path"):
+                continue
+            path = self.scene_path(record)
+            pen = decode_pen(record["pen"]) if "pen" in record else QPen(QColor(0, 0, 0))
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.setBrush(decode_brush(record["brush"]) if "brush" in record
+                             else QBrush(Qt.BrushStyle.NoBrush))
+            painter.drawPath(path)
+        painter.end()
+        return image
@@ -1,11 +1,44 @@
 import json
-from PyQt6.QtGui import QImage
+import os
+import threading
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from . import serialization, raster_export, vector_export, parametric
+
+# Версия формата .cld: 1 — только размеры холста ("objects" всегда пуст),
+# 2 — объекты сцены + бинарная секция геометрии (см. serialization.py),
+# 3 — отметки строчек хранят линию шва ("procedural"), а не стежки
+FORMAT_VERSION = 3
+# Сколько записей объектов кодировать между отчётами о прогрессе
+_PROGRESS_CHUNK = 500
+
+
+def _write_json(f, project, progress):
+    """json.dump(project, f), но список "objects" пишется порциями — с
+    отчётом о доле записанного (0..1) после каждой."""
+    project = dict(project)
+    objects = project.pop("objects", [])
+    head = json.dumps(project, separators=(',', ':'))
+    f.write(head[:-1])
+    f.write(',"objects":[' if project else '"objects":[')
+    total = len(objects)
+    for start in range(0, total, _PROGRESS_CHUNK):
+        chunk = objects[start:start + _PROGRESS_CHUNK]
+        if start:
+            f.write(',')
+        f.write(','.join(json.dumps(r, separators=(',', ':')) for r in chunk))
+        progress((start + len(chunk)) / total)
+    f.write(']}')
+    if not total:
+        progress(1.0)
+
 
 class ProjectManager:
     def __init__(self):
         self.current_project = None
+        self.geometry_reader = None
         
     def new_project(self, width, height, background="#FFFFFF"):
+        self.geometry_reader = None
         self.current_project = {
             "width": width,
             "height": height,
@@ -14,22 +47,207 @@ class ProjectManager:
             "objects": []
         }
         return self.current_project
+
+    def capture_scene(self, scene):
+        """Сериализует все сохраняемые объекты сцены в current_project.
+        Геометрия остаётся GeometryWriter до save_project — там решается,
+        встроить её в JSON или вынести в файл-спутник."""
+        if self.current_project is None:
+            rect = scene.sceneRect()
+            self.new_project(int(rect.width()), int(rect.height()))
+        # Отложенные перестроения параметрических деталей — до записи путей
+        parametric.flush()
+        # Порядок по возрастанию — при загрузке объекты добавляются в том же
+        # порядке и сохраняют взаимное перекрытие. Из дочерних объектов
+        # сохраняются только припуски — их снова привязывает restore_scene
+        items = [i for i in scene.items(Qt.SortOrder.AscendingOrder)
+                 if i.parentItem() is None or serialization.is_seam(i)]
+        objects, geometry = serialization.encode_items(items)
+        self.current_project["version"] = FORMAT_VERSION
+        self.current_project["objects"] = objects
+        self.current_project["geometry"] = geometry
+        return self.current_project
+
+    def _reader(self):
+        """Читатель геометрии текущего проекта — загруженного или только
+        что снятого со сцены."""
+        if self.geometry_reader is not None:
+            return self.geometry_reader
+        geometry = self.current_project.get("geometry")
+        if isinstance(geometry, serialization.GeometryWriter):
+            geometry = geometry.to_dict()
+        return serialization.GeometryReader(geometry)
+
+    def restore_scene(self, scene, lazy=False):
+        """Создаёт объекты текущего проекта и добавляет их на сцену.
+        Возвращает список добавленных объектов. С lazy=True вместо объектов
+        добавляются лёгкие заглушки (serialization.PlaceholderItem)."""
+        if not self.current_project:
+            return []
+        items = serialization.decode_items(
+            self.current_project.get("objects", []), self._reader(), lazy=lazy,
+        )
+        for item in items:
+            scene.addItem(item)
+        serialization.attach_seams(items)
+        return items
         
-    def save_project(self, file_path):
-        if self.current_project:
-            with open(file_path, 'w') as f:
-                json.dump(self.current_project, f)
-            return True
-        return False
+    def save_project(self, file_path, progress=None):
+        """Кодирует current_project и атомарно записывает его в file_path.
+        Не трогает сцену и Qt-объекты, поэтому может выполняться в рабочем
+        потоке (см. SaveTask). progress(percent) вызывается по ходу записи."""
+        if not self.current_project:
+            return False
+        report = progress or (lambda percent: None)
+        project = dict(self.current_project)
+        geometry = project.get("geometry")
+        if isinstance(geometry, serialization.GeometryWriter):
+            if len(geometry) >= serialization.SIDECAR_MIN_ELEMENTS:
+                project["geometry"] = geometry.write_sidecar(file_path)
+            else:
+                project["geometry"] = geometry.to_dict()
+        report(20)
+
+        # Пишем во временный файл и подменяем атомарно — падение посреди
+        # записи не оставит полусохранённый проект
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            _write_json(f, project, lambda done: report(20 + int(70 * done)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+
+        sidecar = project.get("geometry") or {}
+        serialization.remove_sidecars(file_path, keep=sidecar.get("file"))
+        report(100)
+        return True
         
     def load_project(self, file_path):
         try:
             with open(file_path, 'r') as f:
                 self.current_project = json.load(f)
+            self.geometry_reader = serialization.GeometryReader(
+                self.current_project.get("geometry"), os.path.dirname(file_path)
+            )
             return self.current_project
         except:
             return None
             
-    def export_image(self, file_path, format="PNG"):
-        # Здесь будет логика экспорта изображения
-        pass
\ No newline at end of file
+    def export_image(self, file_path, format="PNG", dpi=300,
+                     memory_limit=raster_export.DEFAULT_MEMORY_LIMIT, workers=None,
+                     progress=None, cancelled=None):
+        """Экспортирует холст в PNG/TIFF с разрешением dpi. Изображение
+        рисуется плитками в пуле потоков и сразу пишется на диск; пиксельные
+        буферы в работе не превышают memory_limit байт. Сцену не трогает —
+        рисуются записи current_project (см. raster_export.py)."""
+        if not self.current_project:
+            return False
+        return raster_export.export_raster(
+            self.current_project, self._reader(), file_path, format=format, dpi=dpi,
+            memory_limit=memory_limit, workers=workers,
+            progress=progress, cancelled=cancelled,
+        )
+
+    def export_vector(self, file_path, format=None, unit="mm", progress=None, cancelled=None):
+        """Экспортирует объекты проекта в SVG/PDF в натуральную величину
+        (SVG — в единицах unit). Файл пишется потоково, по объекту за раз."""
+        if not self.current_project:
+            return False
+        return vector_export.export_vector(
+            self.current_project, self._reader(), file_path, format=format, unit=unit,
+            progress=progress, cancelled=cancelled,
+        )
+
+
+class _BackgroundTask(QObject):
+    """Работа с уже снятым снимком проекта в отдельном потоке.
+
+    Сигналы доставляются в поток, где создана задача; ok и error
+    заполняются до отправки finished.
+    """
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)  # успех, текст ошибки
+
+    def __init__(self, manager, file_path, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.file_path = file_path
+        self.ok = None      # результат — после завершения потока
+        self.error = ""
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def _work(self):
+        raise NotImplementedError
+
+    def _run(self):
+        try:
+            ok, error = self._work()
+        except (OSError, ValueError) as e:
+            ok, error = False, str(e)
+        self.ok, self.error = ok, error
+        self.finished.emit(ok, error)
+
+
+class SaveTask(_BackgroundTask):
+    """Сохранение проекта в рабочем потоке.
+
+    manager должен содержать уже снятый снимок сцены (capture_scene — в
+    GUI-потоке); дальше кодирование, сжатие, fsync и атомарная подмена
+    файла идут в отдельном потоке, а редактор продолжает работать.
+    """
+
+    def _work(self):
+        ok = self.manager.save_project(self.file_path, progress=self.progress.emit)
+        return ok, "" if ok else "Nothing to save"
+
+
+class ExportImageTask(_BackgroundTask):
+    """Растровый экспорт (ProjectManager.export_image) в рабочем потоке."""
+
+    def __init__(self, manager, file_path, format=None, dpi=300,
+                 memory_limit=raster_export.DEFAULT_MEMORY_LIMIT, parent=None):
+        super().__init__(manager, file_path, parent)
+        self.format = format
+        self.dpi = dpi
+        self.memory_limit = memory_limit
+
+    def _work(self):
+        ok = self.manager.export_image(
+            self.file_path, self.format, dpi=self.dpi, memory_limit=self.memory_limit,
+            progress=self.progress.emit, cancelled=self.is_cancelled,
+        )
+        return ok, "" if ok else "Export cancelled"
+
+
+class ExportVectorTask(_BackgroundTask):
+    """Векторный экспорт (ProjectManager.export_vector) в рабочем потоке."""
+
+    def __init__(self, manager, file_path, format=None, unit="mm", parent=None):
+        super().__init__(manager, file_path, parent)
+        self.format = format
+        self.unit = unit
+
+    def _work(self):
+        ok = self.manager.export_vector(
+            self.file_path, self.format, unit=self.unit,
+            progress=self.progress.emit, cancelled=self.is_cancelled,
+        )
+        return ok, "" if ok else "Export cancelled"
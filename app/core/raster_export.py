@@ -0,0 +1,335 @@
+# app/core/raster_export.py
+"""Растровый экспорт проекта (PNG/TIFF) плитками с ограничением памяти.
+
+Полоса холста высотой в одну плитку делится на плитки фиксированного
+размера, которые рисуются в пуле потоков, каждая в свой маленький QImage.
+Готовые полосы построчно уходят в потоковый кодировщик и сразу пишутся на
+диск, поэтому раскладка 1,5 × 10 м при 300 DPI (≈ 17700 × 118000 пикселей)
+не требует одного многогигабайтного QImage. Сколько полос может быть в
+работе одновременно, определяет лимит памяти, заданный пользователем:
+из него вычитаются контуры объектов (они нужны до конца экспорта), остаток
+делится на полосы. Меньше одной полосы высотой в строку в работе быть не
+может — лимит меньше контуров плюс одной такой строки превышается.
+
+Рисуется не сцена, а записи проекта (ProjectManager.current_project):
+QGraphicsItem нельзя трогать из рабочих потоков, а QPainterPath, QPen и
+QImage — можно.
+"""
+import math
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import (QImage, QPainter, QPen, QBrush, QColor, QPalette,
+                         QAbstractTextDocumentLayout)
+
+from .serialization import decode_pen, decode_brush
+from .project_file import ProjectFile, text_document
+
+# Экранные пиксели сцены — 96 на дюйм (см. MeasurementSystem)
+SCENE_DPI = 96
+TILE_SIZE = 512
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024  # байт
+# Байт на пиксель полосы в работе: плитка RGB32 (4), её копия RGB888 (3)
+# и строки полосы, собранные для кодировщика (3)
+_BYTES_PER_PIXEL = 10
+# Элемент QPainterPath: x, y (double) и тип — как в seams.GeometryCache
+_ELEMENT_BYTES = 24
+# Отступ вокруг объекта при отсечении — сглаживание выходит за контур
+_CULL_MARGIN = 2.0
+
+FORMATS = ("PNG", "TIFF")
+
+
+def image_format(file_path, format=None):
+    """Формат по явному значению или по расширению файла."""
+    if format:
+        format = format.upper()
+        return "TIFF" if format == "TIF" else format
+    ext = os.path.splitext(file_path)[1].lower()
+    return "TIFF" if ext in (".tif", ".tiff") else "PNG"
+
+
+class PngStreamWriter:
+    """PNG RGB 8 бит, который принимает изображение по строкам сверху вниз."""
+
+    IDAT_SIZE = 256 * 1024
+
+    def __init__(self, f, width, height, dpi):
+        self.f = f
+        f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        ppm = round(dpi / 0.0254)  # pHYs — пиксели на метр
+        self._chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+        self._compressor = zlib.compressobj(6)
+        self._pending = bytearray()
+
+    def _chunk(self, kind, data):
+        self.f.write(struct.pack(">I", len(data)))
+        self.f.write(kind)
+        self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, rows):
+        for row in rows:
+            # Байт фильтра 0 (None) перед каждой строкой
+            self._pending += self._compressor.compress(b"\x00")
+            self._pending += self._compressor.compress(row)
+            if len(self._pending) >= self.IDAT_SIZE:
+                self._chunk(b"IDAT", bytes(self._pending))
+                self._pending.clear()
+
+    def close(self):
+        self._pending += self._compressor.flush()
+        self._chunk(b"IDAT", bytes(self._pending))
+        self._chunk(b"IEND", b"")
+
+
+class TiffStreamWriter:
+    """TIFF RGB 8 бит, полосы сжаты deflate. Каждый вызов write_rows() —
+    одна полоса (strip); каталог (IFD) пишется в конце файла. Если без
+    сжатия изображение не помещается в 4 ГБ, пишется BigTIFF."""
+
+    SHORT, LONG, RATIONAL, LONG8 = 3, 4, 5, 16
+    _CODES = {SHORT: "H", LONG: "I", RATIONAL: "I", LONG8: "Q"}
+
+    def __init__(self, f, width, height, dpi):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.big = width * height * 3 > 0xF0000000
+        if self.big:
+            f.write(b"II+\x00" + struct.pack("<HHQ", 8, 0, 0))
+        else:
+            f.write(b"II*\x00" + struct.pack("<I", 0))
+        self.offsets = []
+        self.counts = []
+        self.rows_per_strip = 0
+
+    def write_rows(self, rows):
+        rows = list(rows)
+        self.rows_per_strip = max(self.rows_per_strip, len(rows))
+        data = zlib.compress(b"".join(rows), 6)
+        self.offsets.append(self.f.tell())
+        self.counts.append(len(data))
+        self.f.write(data)
+
+    def _align(self):
+        if self.f.tell() % 2:
+            self.f.write(b"\x00")
+
+    def close(self):
+        f = self.f
+        offset_type = self.LONG8 if self.big else self.LONG
+        dpi = (round(self.dpi * 100), 100)
+        entries = [
+            (256, self.LONG, [self.width]),
+            (257, self.LONG, [self.height]),
+            (258, self.SHORT, [8, 8, 8]),
+            (259, self.SHORT, [8]),           # Adobe deflate
+            (262, self.SHORT, [2]),           # RGB
+            (273, offset_type, self.offsets),
+            (277, self.SHORT, [3]),
+            (278, self.LONG, [self.rows_per_strip]),
+            (279, offset_type, self.counts),
+            (282, self.RATIONAL, dpi),
+            (283, self.RATIONAL, dpi),
+            (284, self.SHORT, [1]),
+            (296, self.SHORT, [2]),           # дюймы
+        ]
+        inline = 8 if self.big else 4
+        pointer = "<Q" if self.big else "<I"
+        packed = []
+        for tag, kind, values in entries:
+            data = struct.pack(f"<{len(values)}{self._CODES[kind]}", *values)
+            count = len(values) // 2 if kind == self.RATIONAL else len(values)
+            if len(data) <= inline:
+                field = data.ljust(inline, b"\x00")
+            else:
+                self._align()
+                field = struct.pack(pointer, f.tell())
+                f.write(data)
+            head = "<HHQ" if self.big else "<HHI"
+            packed.append(struct.pack(head, tag, kind, count) + field)
+
+        self._align()
+        ifd = f.tell()
+        f.write(struct.pack("<Q" if self.big else "<H", len(packed)))
+        f.write(b"".join(packed))
+        f.write(b"\x00" * inline)  # следующего IFD нет
+        f.seek(8 if self.big else 4)
+        f.write(struct.pack(pointer, ifd))
+
+
+_WRITERS = {"PNG": PngStreamWriter, "TIFF": TiffStreamWriter}
+
+
+class RasterExporter:
+    """Рисует записи проекта плитками и пишет их в PNG/TIFF."""
+
+    def __init__(self, project, reader, dpi=300, memory_limit=DEFAULT_MEMORY_LIMIT,
+                 workers=None, tile_size=TILE_SIZE):
+        self.project = ProjectFile.from_data(project, reader)
+        self.rect = QRectF(0, 0, project.get("width", 0), project.get("height", 0))
+        self.background = QColor(project.get("background", "#FFFFFF"))
+        self.scale = dpi / SCENE_DPI
+        self.dpi = dpi
+        self.width = max(1, round(self.rect.width() * self.scale))
+        self.height = max(1, round(self.rect.height() * self.scale))
+        self.workers = workers or min(8, os.cpu_count() or 1)
+
+        # Плитки фиксированного размера; если лимит не вмещает даже одну
+        # полосу такой высоты, полоса (и плитки) становятся ниже — вплоть
+        # до одной строки
+        self.memory_limit = memory_limit
+        self.tile_width = min(tile_size, self.width)
+        self.tile_height = max(1, min(tile_size, memory_limit // (_BYTES_PER_PIXEL * self.width)))
+        self.band_count = math.ceil(self.height / self.tile_height)
+        self.geometry_bytes = 0
+        self.bands_in_flight = self._bands_for_budget()
+        self._drawables = []
+        self._bands = [[] for _ in range(self.band_count)]
+
+    def _bands_for_budget(self):
+        band_bytes = self.width * self.tile_height * _BYTES_PER_PIXEL
+        return max(1, min(self.workers * 2,
+                          (self.memory_limit - self.geometry_bytes) // band_bytes))
+
+    def prepare(self):
+        """Строит контуры объектов в координатах сцены и раскладывает их по
+        полосам. Память контуров вычитается из лимита — полос в работе
+        становится меньше. Только чтение записей — вызывать можно из
+        любого потока."""
+        for record in self.project.records():
+            kind = record.get("type")
+            bounds = self.project.scene_bounds(record).adjusted(
+                -_CULL_MARGIN, -_CULL_MARGIN, _CULL_MARGIN, _CULL_MARGIN)
+            if kind in ("piece", "path"):
+                pen = decode_pen(record["pen"]) if "pen" in record else QPen(QColor(0, 0, 0))
+                brush = (decode_brush(record["brush"]) if "brush" in record
+                         else QBrush(Qt.BrushStyle.NoBrush))
+                path = self.project.scene_path(record)
+                self.geometry_bytes += path.elementCount() * _ELEMENT_BYTES
+                drawable = (kind, bounds, path, pen, brush)
+            elif kind in ("text", "annotation"):
+                drawable = (kind, bounds, record, self.project.scene_transform(record), None)
+            else:
+                continue
+            index = len(self._drawables)
+            self._drawables.append(drawable)
+            top = (bounds.top() - self.rect.y()) * self.scale
+            bottom = (bounds.bottom() - self.rect.y()) * self.scale
+            first = max(0, int(top // self.tile_height))
+            last = min(self.band_count - 1, int(bottom // self.tile_height))
+            for band in range(first, last + 1):
+                self._bands[band].append(index)
+        self.bands_in_flight = self._bands_for_budget()
+
+    def _tile_scene_rect(self, x, y, w, h):
+        s = self.scale
+        return QRectF(self.rect.x() + x / s, self.rect.y() + y / s, w / s, h / s)
+
+    def render_tile(self, band, x, y, w, h):
+        """Плитка (x, y, w, h) в пикселях результата → (байты RGB888,
+        bytesPerLine)."""
+        image = QImage(w, h, QImage.Format.Format_RGB32)
+        image.fill(self.background)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.translate(-x, -y)
+        painter.scale(self.scale, self.scale)
+        painter.translate(-self.rect.x(), -self.rect.y())
+
+        area = self._tile_scene_rect(x, y, w, h)
+        for index in self._bands[band]:
+            kind, bounds, shape, style, brush = self._drawables[index]
+            if not bounds.intersects(area):
+                continue
+            if kind in ("piece", "path"):
+                painter.setPen(style)
+                painter.setBrush(brush)
+                painter.drawPath(shape)
+            else:
+                # Как QGraphicsTextItem: документ в локальных координатах
+                document = text_document(shape)
+                context = QAbstractTextDocumentLayout.PaintContext()
+                palette = QPalette()
+                palette.setColor(QPalette.ColorRole.Text, QColor(shape["color"]))
+                context.palette = palette
+                painter.save()
+                painter.setTransform(style, True)
+                document.documentLayout().draw(painter, context)
+                painter.restore()
+        painter.end()
+
+        image = image.convertToFormat(QImage.Format.Format_RGB888)
+        return image.constBits().asstring(image.sizeInBytes()), image.bytesPerLine()
+
+    def _render_band(self, pool, band):
+        y = band * self.tile_height
+        h = min(self.tile_height, self.height - y)
+        futures = []
+        for x in range(0, self.width, self.tile_width):
+            w = min(self.tile_width, self.width - x)
+            futures.append((w, pool.submit(self.render_tile, band, x, y, w, h)))
+        return h, futures
+
+    @staticmethod
+    def _band_rows(h, futures):
+        tiles = [(w * 3, future.result()) for w, future in futures]
+        for row in range(h):
+            yield b"".join(data[row * stride:row * stride + width]
+                           for width, (data, stride) in tiles)
+
+    def write(self, f, format="PNG", progress=None, cancelled=None):
+        """Рисует и кодирует всё изображение в файл f. Возвращает False,
+        если cancelled() вернул True (файл тогда недописан)."""
+        report = progress or (lambda percent: None)
+        is_cancelled = cancelled or (lambda: False)
+        writer = _WRITERS[format](f, self.width, self.height, self.dpi)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            next_band = 0
+            for done in range(self.band_count):
+                while next_band < self.band_count and len(pending) < self.bands_in_flight:
+                    pending.append(self._render_band(pool, next_band))
+                    next_band += 1
+                if is_cancelled():
+                    for _, futures in pending:
+                        for _, future in futures:
+                            future.cancel()
+                    return False
+                writer.write_rows(self._band_rows(*pending.popleft()))
+                report(int(100 * (done + 1) / self.band_count))
+        writer.close()
+        return True
+
+
+def export_raster(project, reader, file_path, format=None, dpi=300,
+                  memory_limit=DEFAULT_MEMORY_LIMIT, workers=None,
+                  progress=None, cancelled=None):
+    """Экспортирует проект в PNG/TIFF. Запись идёт во временный файл и
+    подменяет file_path только после успешного завершения."""
+    format = image_format(file_path, format)
+    if format not in _WRITERS:
+        raise ValueError(f"Unsupported image format: {format}")
+    exporter = RasterExporter(project, reader, dpi=dpi, memory_limit=memory_limit,
+                              workers=workers)
+    exporter.prepare()
+    tmp_path = file_path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            ok = exporter.write(f, format, progress, cancelled)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if not ok:
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, file_path)
+    return True
@@ -0,0 +1,277 @@
+# app/core/seams.py
+"""Геометрия припусков на швы и условных обозначений строчек.
+
+Функции строят контур по пути детали в её локальных координатах — их
+вызывают панели при создании оверлеев и parametric при перестроении
+оверлеев, привязанных к параметрической детали.
+
+Построенные контуры кэшируются в GEOMETRY_CACHE по содержимому пути:
+у детали и её зеркальной пары (тот же путь, другой трансформ) или у
+одинаковых деталей раскладки припуск и строчка считаются один раз.
+
+Отметка строчки на сцене (tools/stitch_item.py) хранит только линию шва:
+видимые стежки она строит при отрисовке (stitch_segments()), а полный
+контур stitch_path() нужен экспорту (ProjectFile.local_path()).
+
+Привязка оверлея к исходному объекту — словарь в item.data(LINK_KEY):
+{"source": id исходного объекта, "kind": "seam" | "zigzag" | "overlock",
+ "width": ширина припуска, px} или {..., "size": размер отметки, px}.
+У припуска могут быть ещё "join" (стиль углов, см. core/offset.py) и
+"widths" (ширины по рёбрам, px).
+"""
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from PyQt6.QtCore import QByteArray, QDataStream, QIODevice, QPointF
+from PyQt6.QtGui import QPainterPath, QPolygonF
+
+from . import flattening
+from .offset import MITRE, OffsetCache
+
+# Ключ item.setData() с привязкой оверлея к исходному объекту
+LINK_KEY = 5
+# Допуск ломаной, по которой расставляются стежки, px: касательная на
+# кривой отличается от точной на доли градуса
+_SAMPLE_TOLERANCE = 0.05
+_SIN_60 = math.sqrt(3) / 2
+# Шаг стежков отметки строчки — в размерах отметки
+STITCH_STEP = 1.5
+# Прежний обход ограничивал число стежков тысячей на путь; теперь длинный
+# шов размечается с заданным шагом, ограничен только сам шаг
+_MIN_STEP = 0.5
+
+
+def path_digest(path):
+    """Хэш геометрии пути: элементы и правило заливки (сериализация Qt)."""
+    data = QByteArray()
+    stream = QDataStream(data, QIODevice.OpenModeFlag.WriteOnly)
+    stream << path
+    return hashlib.blake2b(bytes(data), digest_size=16).digest()
+
+
+class GeometryCache:
+    """Ограниченный потокобезопасный LRU-кэш контуров, построенных по пути.
+
+    Ключ — (path_digest() исходного пути, параметры операции), так что
+    попадание не зависит от того, какой объект сцены этот путь несёт.
+    Размер ограничен памятью, а не числом записей: контур строчки вдоль
+    длинного шва в тысячи раз больше припуска кармана. Память считается
+    по числу элементов хранимых путей; как и в PathCache, наружу отдаётся
+    копия (неявно разделяемая).
+    """
+
+    ELEMENT_BYTES = 24  # элемент QPainterPath: x, y (double) и тип
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._paths = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, params, build):
+        """Контур build(path) для параметров params (хэшируемый кортеж)."""
+        key = (path_digest(path), params)
+        with self._lock:
+            result = self._paths.get(key)
+            if result is not None:
+                self._paths.move_to_end(key)
+                self.hits += 1
+                return QPainterPath(result)
+            self.misses += 1
+        # Строим вне блокировки — см. PathCache.get()
+        result = build(path)
+        size = result.elementCount() * self.ELEMENT_BYTES
+        if size <= self.max_bytes:
+            with self._lock:
+                old = self._paths.pop(key, None)
+                if old is not None:
+                    self.bytes -= old.elementCount() * self.ELEMENT_BYTES
+                self._paths[key] = result
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, evicted = self._paths.popitem(last=False)
+                    self.bytes -= evicted.elementCount() * self.ELEMENT_BYTES
+        return QPainterPath(result)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._paths),
+                    "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._paths.clear()
+            self.hits = self.misses = self.bytes = 0
+
+
+# Общий кэш для панелей припусков и строчек, parametric и экспорта
+GEOMETRY_CACHE = GeometryCache()
+
+
+def compute_seam_path(original_path, allowance_px, join=MITRE, widths=None):
+    """Внешний контур (cutting line) пути с припуском allowance_px или
+    своим припуском на каждое ребро (widths), углы — по join."""
+    link = {"width": allowance_px, "join": join}
+    if widths:
+        link["widths"] = widths
+    return seam_contour(original_path, link)
+
+
+def seam_contour(source_path, link, cache=None):
+    """Контур припуска по привязке link — из GEOMETRY_CACHE или заново;
+    с cache (OffsetCache) сдвигаются только рёбра, изменившиеся с прошлого
+    вызова с тем же cache."""
+    widths = link.get("widths") or link["width"]
+    join = link.get("join", MITRE)
+    params = ("seam", tuple(widths) if isinstance(widths, list) else float(widths), join)
+    offset = cache or OffsetCache()
+    return GEOMETRY_CACHE.get(source_path, params,
+                              lambda path: offset.offset_path(path, widths, join))
+
+
+def compute_seam_paths(jobs, workers=None, progress=None, cancelled=None):
+    """Контуры припусков для jobs — [(путь детали, привязка)] — в пуле
+    потоков. Возвращает [(контур, OffsetCache)] в порядке jobs или None,
+    если cancelled() вернул True. progress(done, total) — после каждого.
+
+    Пути в jobs должны быть копиями: объекты сцены из рабочих потоков не
+    трогаются. OffsetCache каждого контура потом отдаётся припуску
+    (SeamAllowanceItem): если контур посчитан здесь, первая же правка ребра
+    детали считается по рёбрам. Контур, взятый из GEOMETRY_CACHE (такая же
+    деталь уже встречалась), приходит с пустым OffsetCache — у такого
+    припуска первая правка сдвигает все рёбра, дальше — по рёбрам.
+    """
+    report = progress or (lambda done, total: None)
+    is_cancelled = cancelled or (lambda: False)
+
+    def run(path, link):
+        cache = OffsetCache()
+        return seam_contour(path, link, cache), cache
+
+    results = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(run, path, link): index
+                   for index, (path, link) in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            if is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+                return None
+            results[futures[future]] = future.result()
+            report(done, len(jobs))
+    return results
+
+
+def sample_path(source_path, step):
+    """Точки вдоль пути через каждые step px длины, начиная с начала пути,
+    и единичные касательные в них: массивы x, y, dx, dy.
+
+    Путь один раз раскладывается в ломаную (core/flattening.py), по ней
+    строится таблица накопленных длин, и все точки находятся разом —
+    searchsorted по таблице и интерполяция на отрезке. pointAtPercent() и
+    angleAtPercent() на каждый стежок заново проходили бы весь путь.
+    Шаг — по длине дуги, в том числе на кривых (pointAtPercent() на
+    кривых идёт по параметру Безье, и стежки там сгущались). Путь короче
+    1 px — пустые массивы.
+    """
+    starts, vectors = [], []
+    for polygon in flattening.flatten_polygons(source_path, _SAMPLE_TOLERANCE):
+        points = np.array([(p.x(), p.y()) for p in polygon])
+        if len(points) > 1:
+            starts.append(points[:-1])
+            vectors.append(np.diff(points, axis=0))
+    empty = np.empty(0)
+    if not starts:
+        return empty, empty, empty, empty
+    starts, vectors = np.concatenate(starts), np.concatenate(vectors)
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    keep = lengths > 0
+    starts, vectors, lengths = starts[keep], vectors[keep], lengths[keep]
+    cumulative = np.concatenate(([0.0], np.cumsum(lengths)))
+    total = cumulative[-1]
+    if total < 1:
+        return empty, empty, empty, empty
+
+    step = max(step, _MIN_STEP)
+    # Как и прежний обход по процентам: конец пути попадает в выборку, если
+    # до него не больше 1/10000 длины после последнего шага
+    distances = np.minimum(np.arange(int(total * 1.0001 / step) + 1) * step, total)
+    index = np.clip(np.searchsorted(cumulative, distances, side="right") - 1,
+                    0, len(lengths) - 1)
+    dx, dy = vectors[index, 0] / lengths[index], vectors[index, 1] / lengths[index]
+    along = distances - cumulative[index]
+    return starts[index, 0] + dx * along, starts[index, 1] + dy * along, dx, dy
+
+
+def _zigzag_vertices(x, y, dx, dy, amplitude):
+    # Точки поочерёдно смещены по нормали (dy, -dx) на ±amplitude
+    flip = np.where(np.arange(len(x)) % 2 == 0, amplitude, -amplitude)
+    return x + dy * flip, y - dx * flip
+
+
+def _overlock_ends(x, y, dx, dy, size):
+    # Касательная, повёрнутая на 60° в сторону нормали (dy, -dx)
+    return x + size * (dx * 0.5 + dy * _SIN_60), y + size * (dy * 0.5 - dx * _SIN_60)
+
+
+def make_zigzag_path(source_path, amplitude, step):
+    """Зигзаг вдоль исходного пути: точки через step, поочерёдно смещённые
+    по нормали на ±amplitude."""
+    x, y, dx, dy = sample_path(source_path, step)
+    if not len(x):
+        return QPainterPath(source_path)
+    zx, zy = _zigzag_vertices(x, y, dx, dy, amplitude)
+    result = QPainterPath()
+    result.addPolygon(QPolygonF([QPointF(px, py) for px, py in zip(zx.tolist(), zy.tolist())]))
+    return result
+
+
+def make_overlock_path(source_path, size, step):
+    """Оверлок: короткие штрихи под 60° к линии шва (классическая нотация)."""
+    x, y, dx, dy = sample_path(source_path, step)
+    if not len(x):
+        return QPainterPath(source_path)
+    ex, ey = _overlock_ends(x, y, dx, dy, size)
+    result = QPainterPath()
+    for px, py, qx, qy in zip(x.tolist(), y.tolist(), ex.tolist(), ey.tolist()):
+        result.moveTo(px, py)
+        result.lineTo(qx, qy)
+    return result
+
+
+def stitch_segments(style, source_path, size):
+    """Стежки отметки style размера size вдоль пути — отрезками в массивах
+    x0, y0, x1, y1: звенья зигзага или штрихи оверлока, те же, что в
+    stitch_path(). По ним StitchMarkItem рисует только видимые стежки."""
+    step = size * STITCH_STEP
+    x, y, dx, dy = sample_path(source_path, step)
+    if style.lower() == "zigzag":
+        zx, zy = _zigzag_vertices(x, y, dx, dy, size)
+        return zx[:-1], zy[:-1], zx[1:], zy[1:]
+    ex, ey = _overlock_ends(x, y, dx, dy, size)
+    return x, y, ex, ey
+
+
+def stitch_path(style, source_path, size):
+    """Отметка строчки style ("Zigzag"/"Overlock") размера size вдоль пути
+    (через GEOMETRY_CACHE)."""
+    def build(path):
+        if style.lower() == "zigzag":
+            return make_zigzag_path(path, amplitude=size, step=size * STITCH_STEP)
+        return make_overlock_path(path, size=size, step=size * STITCH_STEP)
+
+    return GEOMETRY_CACHE.get(source_path, (style.lower(), float(size)), build)
+
+
+def overlay_path(link, source_path):
+    """Путь оверлея по привязке (см. описание модуля) и пути источника."""
+    if link["kind"] == "seam":
+        return seam_contour(source_path, link)
+    return stitch_path(link["kind"], source_path, link["size"])
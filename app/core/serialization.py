@@ -0,0 +1,603 @@
+# app/core/serialization.py
+"""Сериализация объектов сцены в проект .cld.
+
+Каждый объект — небольшая JSON-запись (тип, позиция, трансформ, перо,
+кисть, теги item.data()), а вся геометрия (элементы QPainterPath, вершины
+и контрольные точки рёбер PatternPieceItem) складывается в общую бинарную
+секцию: массив типов элементов (uint8) и параллельный массив координат
+(float64, по две на элемент). Запись объекта ссылается на геометрию парой
+[offset, count] в единицах элементов. Секция сжимается zlib и кладётся в
+JSON как base64 — так маркер на тысячи деталей сохраняется и читается за
+доли секунды, а не тратит по JSON-объекту на каждую точку.
+
+Запись объекта заодно служит лёгким индексом: id (тег ITEM_ID_KEY),
+тип, слой (z) и локальный bounding rect ("bounds"). По ним при открытии
+большого проекта создаются PlaceholderItem, а полная геометрия
+декодируется, только когда объект попадает в видимую область холста.
+
+У больших проектов (от SIDECAR_MIN_ELEMENTS элементов) секция геометрии
+пишется не в JSON, а в отдельный файл фиксированной раскладки рядом с
+.cld (см. GeometryWriter.write_sidecar). Такой файл отображается в память
+через mmap, и координаты читаются прямо из отображения — без распаковки и
+копирования в списки Python.
+"""
+import base64
+import glob
+import math
+import mmap
+import os
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainterPath, QPen, QBrush, QColor, QTransform, QFont
+from PyQt6.QtWidgets import QGraphicsItem
+
+from ..tools.pattern_item import PatternPieceItem
+from .seams import LINK_KEY
+from ..tools.graphics_items import SnappablePathItem, SnappableTextItem
+from ..tools.seam_item import SeamAllowanceItem
+from ..tools.stitch_item import StitchMarkItem
+from ..tools.text_tool import AnnotationTextItem
+
+# Ключи item.setData(), под которыми панели хранят свои теги:
+# _SEAM_KEY (seam_panel), _STYLE_KEY (seam_style_panel), _NUMBER_KEY
+# (annotations_panel), _SIZE_KEY (pattern_tool — размер градированной
+# детали), seams.LINK_KEY (привязка оверлея к исходному объекту).
+# Сохраняем значения как есть, не разбирая их.
+# ITEM_ID_KEY — постоянный id объекта, по которому журнал автосохранения
+# (journal.py) находит объект при воспроизведении изменений.
+ITEM_ID_KEY = 3
+TAG_KEYS = (0, 1, 2, ITEM_ID_KEY, 4, 5)
+
+# Типы элементов в секции геометрии: 0..3 совпадают с
+# QPainterPath.ElementType, POINT — отдельная точка (вершина/контрольная
+# точка), NaN-координаты у POINT означают None (прямое ребро).
+MOVE_TO = 0
+LINE_TO = 1
+CURVE_TO = 2
+CURVE_DATA = 3
+POINT = 255
+
+# Раскладка файла-спутника геометрии (все числа little-endian):
+#   0  magic  b"CLDGEOM1"
+#   8  token  16 байт — тот же token записан в .cld, защищает от пары
+#             файлов из разных сохранений
+#   24 count  uint64 — число элементов
+#   32 types  uint8[count], дополнено нулями до границы 8 байт
+#   .. coords float64[2 * count]
+SIDECAR_MAGIC = b"CLDGEOM1"
+SIDECAR_HEADER = struct.Struct("<8s16sQ")
+SIDECAR_MIN_ELEMENTS = 50_000
+
+
+class GeometryWriter:
+    """Накапливает геометрию всех объектов в два плоских массива."""
+
+    def __init__(self):
+        self.types = array('B')
+        self.coords = array('d')
+
+    def add_path(self, path):
+        offset = len(self.types)
+        types = self.types
+        coords = self.coords
+        for i in range(path.elementCount()):
+            e = path.elementAt(i)
+            types.append(e.type.value)
+            coords.append(e.x)
+            coords.append(e.y)
+        return [offset, len(self.types) - offset]
+
+    def add_points(self, points):
+        offset = len(self.types)
+        for p in points:
+            self.types.append(POINT)
+            if p is None:
+                self.coords.append(math.nan)
+                self.coords.append(math.nan)
+            else:
+                self.coords.append(p.x())
+                self.coords.append(p.y())
+        return [offset, len(points)]
+
+    def __len__(self):
+        return len(self.types)
+
+    def copy_from(self, reader, ref):
+        """Переносит элементы [offset, offset + count) из другой секции."""
+        offset, count = ref
+        new_offset = len(self.types)
+        self.types.frombytes(reader.types[offset:offset + count].tobytes())
+        coords = reader.coords[2 * offset:2 * (offset + count)].tobytes()
+        if sys.byteorder != 'little' and isinstance(reader.coords, memoryview):
+            chunk = array('d', coords)
+            chunk.byteswap()
+            coords = chunk.tobytes()
+        self.coords.frombytes(coords)
+        return [new_offset, count]
+
+    def write_sidecar(self, project_path):
+        """Пишет секцию в файл-спутник рядом с project_path и возвращает
+        ссылку на него для JSON проекта. Имя файла уникально для каждого
+        сохранения: старый файл может быть ещё отображён в память открытым
+        проектом, поэтому новый его не перезаписывает."""
+        token = uuid.uuid4()
+        path = sidecar_path(project_path, token.hex[:12])
+        types = self.types
+        coords = self.coords
+        if sys.byteorder != 'little':
+            coords = array('d', coords)
+            coords.byteswap()
+        count = len(types)
+        with open(path, 'wb') as f:
+            f.write(SIDECAR_HEADER.pack(SIDECAR_MAGIC, token.bytes, count))
+            f.write(types.tobytes())
+            f.write(b"\0" * (-count % 8))
+            f.write(coords.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        return {
+            "encoding": "sidecar",
+            "file": os.path.basename(path),
+            "token": token.hex,
+            "count": count,
+        }
+
+    def to_dict(self):
+        return {
+            "encoding": "zlib+base64",
+            "count": len(self.types),
+            "types": _pack(self.types),
+            "coords": _pack(self.coords),
+        }
+
+
+def sidecar_path(project_path, tag):
+    return f"{project_path}.{tag}.geom"
+
+
+def remove_sidecars(project_path, keep=None):
+    """Удаляет файлы-спутники прошлых сохранений project_path (кроме keep).
+    Файл, который ещё отображён в память, на Windows удалить нельзя — он
+    останется до следующего сохранения."""
+    pattern = glob.escape(project_path) + "." + "[0-9a-f]" * 12 + ".geom"
+    for path in glob.glob(pattern):
+        if keep and os.path.basename(path) == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class GeometryReader:
+    """Читает секцию, записанную GeometryWriter. Встроенная в JSON секция
+    распаковывается при первом обращении к геометрии, файл-спутник сразу
+    отображается в память (base_dir — каталог файла проекта)."""
+
+    def __init__(self, section, base_dir=""):
+        self._section = section
+        self._types = None
+        self._coords = None
+        if section and section.get("encoding") == "sidecar":
+            self._map_sidecar(os.path.join(base_dir, section["file"]), section)
+
+    def _map_sidecar(self, path, section):
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, token, count = SIDECAR_HEADER.unpack_from(mapping)
+        if magic != SIDECAR_MAGIC or token.hex() != section["token"]:
+            mapping.close()
+            raise ValueError(f"Geometry file does not match the project: {path}")
+        view = memoryview(mapping)
+        start = SIDECAR_HEADER.size
+        coords_start = start + count + (-count % 8)
+        self._types = view[start:start + count]
+        coords = view[coords_start:coords_start + 16 * count].cast('d')
+        if sys.byteorder != 'little':
+            coords = array('d', coords.tobytes())
+            coords.byteswap()
+        self._coords = coords
+        self._section = None
+
+    def _unpack_section(self):
+        self._types = array('B')
+        self._coords = array('d')
+        if self._section:
+            self._types = _unpack(self._section["types"], 'B')
+            self._coords = _unpack(self._section["coords"], 'd')
+        self._section = None
+
+    @property
+    def types(self):
+        if self._types is None:
+            self._unpack_section()
+        return self._types
+
+    @property
+    def coords(self):
+        if self._coords is None:
+            self._unpack_section()
+        return self._coords
+
+    def path(self, ref):
+        return path_from_arrays(self.types, self.coords, ref[0], ref[1])
+
+    def points(self, ref):
+        offset, count = ref
+        coords = self.coords
+        points = []
+        for i in range(offset, offset + count):
+            x, y = coords[2 * i], coords[2 * i + 1]
+            points.append(None if math.isnan(x) else QPointF(x, y))
+        return points
+
+
+def path_from_arrays(types, coords, offset, count):
+    """Собирает QPainterPath из элементов [offset, offset + count)."""
+    path = QPainterPath()
+    i = offset
+    end = offset + count
+    while i < end:
+        kind = types[i]
+        x, y = coords[2 * i], coords[2 * i + 1]
+        if kind == MOVE_TO:
+            path.moveTo(x, y)
+            i += 1
+        elif kind == LINE_TO:
+            path.lineTo(x, y)
+            i += 1
+        elif kind == CURVE_TO:
+            # CurveTo хранит первую контрольную точку, за ней идут два
+            # CurveToData — вторая контрольная и конечная точка
+            path.cubicTo(x, y,
+                         coords[2 * i + 2], coords[2 * i + 3],
+                         coords[2 * i + 4], coords[2 * i + 5])
+            i += 3
+        else:
+            i += 1
+    return path
+
+
+def _pack(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(zlib.compress(values.tobytes(), 6)).decode('ascii')
+
+
+def _unpack(text, typecode):
+    values = array(typecode)
+    values.frombytes(zlib.decompress(base64.b64decode(text)))
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+# --- Перо, кисть, трансформ ---
+
+def _color_to_str(color):
+    return color.name(QColor.NameFormat.HexArgb)
+
+
+def encode_pen(pen):
+    return {
+        "color": _color_to_str(pen.color()),
+        "width": pen.widthF(),
+        "style": pen.style().value,
+        "cap": pen.capStyle().value,
+        "join": pen.joinStyle().value,
+        "cosmetic": pen.isCosmetic(),
+    }
+
+
+def decode_pen(data):
+    pen = QPen(QColor(data["color"]), data["width"], Qt.PenStyle(data["style"]))
+    pen.setCapStyle(Qt.PenCapStyle(data["cap"]))
+    pen.setJoinStyle(Qt.PenJoinStyle(data["join"]))
+    pen.setCosmetic(data["cosmetic"])
+    return pen
+
+
+def encode_brush(brush):
+    return {"color": _color_to_str(brush.color()), "style": brush.style().value}
+
+
+def decode_brush(data):
+    return QBrush(QColor(data["color"]), Qt.BrushStyle(data["style"]))
+
+
+def encode_transform(t):
+    return [t.m11(), t.m12(), t.m13(), t.m21(), t.m22(), t.m23(),
+            t.m31(), t.m32(), t.m33()]
+
+
+def decode_transform(values):
+    return QTransform(*values)
+
+
+# --- Объекты сцены ---
+
+_KINDS = ("piece", "path", "text", "annotation")
+_MOVABLE = ('ItemIsSelectable', 'ItemIsMovable')
+_EDITABLE_TEXT = ('ItemIsSelectable', 'ItemIsMovable', 'ItemIsFocusable')
+
+
+def _set_flags(item, names):
+    flags = item.GraphicsItemFlag(0)
+    for name in names:
+        flags |= getattr(item.GraphicsItemFlag, name)
+    item.setFlags(flags)
+
+
+def item_id(item):
+    """Постоянный id объекта; выдаётся при первом обращении."""
+    value = item.data(ITEM_ID_KEY)
+    if value is None:
+        value = uuid.uuid4().hex
+        item.setData(ITEM_ID_KEY, value)
+    return value
+
+
+class PlaceholderItem(QGraphicsItem):
+    """Лёгкая заглушка объекта, ещё не декодированного из проекта.
+
+    Знает только запись-индекс (тип, позиция, трансформ, bounds, теги) и
+    ссылку на секцию геометрии; занимает на сцене тот же прямоугольник, что
+    и настоящий объект. Canvas заменяет заглушку объектом из materialize(),
+    когда она попадает в видимую область или под курсор.
+    """
+
+    def __init__(self, record, reader):
+        super().__init__()
+        self.record = record
+        self.reader = reader
+        self._rect = QRectF(*record["bounds"])
+        self.setPos(*record["pos"])
+        if "transform" in record:
+            self.setTransform(decode_transform(record["transform"]))
+        if "z" in record:
+            self.setZValue(record["z"])
+        for key, value in record.get("tags", {}).items():
+            self.setData(int(key), value)
+
+    def boundingRect(self):
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        # Обычно не вызывается — Canvas декодирует объект раньше, чем он
+        # станет видим. Остаётся на случай рендера сцены в обход Canvas.
+        pen = QPen(QColor(150, 150, 150), 0, Qt.PenStyle.DotLine)
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRect(self._rect)
+
+    def materialize(self):
+        """Декодирует настоящий объект с текущими позицией/трансформом."""
+        item = decode_item(self.record, self.reader)
+        item.setPos(self.pos())
+        item.setTransform(self.transform())
+        item.setZValue(self.zValue())
+        for key in TAG_KEYS:
+            item.setData(key, self.data(key))
+        return item
+
+
+def replace_placeholder(placeholder):
+    """Подменяет заглушку на сцене настоящим объектом, сохраняя его место
+    в порядке наложения и привязанные припуски. Возвращает новый объект."""
+    scene = placeholder.scene()
+    item = placeholder.materialize()
+    parent = placeholder.parentItem()
+    if parent is not None:
+        _attach(item, parent)
+    else:
+        scene.addItem(item)
+    item.stackBefore(placeholder)
+    for child in placeholder.childItems():
+        _attach(child, item)
+    scene.removeItem(placeholder)
+    # Canvas помнит ещё не декодированные заглушки (ленивая загрузка) —
+    # заменённая заглушка кем бы то ни было из этого списка уходит
+    for view in scene.views():
+        forget = getattr(view, "forget_placeholder", None)
+        if forget is not None:
+            forget(placeholder)
+    return item
+
+
+def is_seam(item):
+    """Объект (или заглушка) — припуск, привязанный к детали."""
+    link = item.data(LINK_KEY)
+    return isinstance(link, dict) and link.get("kind") == "seam"
+
+
+def _attach(item, source):
+    if isinstance(item, SeamAllowanceItem):
+        item.attach(source)
+    else:
+        item.setParentItem(source)
+        item.setPos(0, 0)
+        item.setTransform(QTransform())
+
+
+def attach_seams(items, sources=None):
+    """Делает припуски из items дочерними объектами их деталей. Детали
+    ищутся по id в sources ({id: объект}), по умолчанию — среди items.
+    Припуск без детали остаётся самостоятельным объектом."""
+    if sources is None:
+        sources = {i.data(ITEM_ID_KEY): i for i in items}
+    for item in items:
+        if is_seam(item):
+            source = sources.get(item.data(LINK_KEY).get("source"))
+            if source is not None and source is not item.parentItem():
+                _attach(item, source)
+
+
+def _frame(item):
+    # Привязанный припуск лежит в координатах детали — в записи у него
+    # позиция и трансформ детали, как у самостоятельного объекта
+    parent = item.parentItem()
+    return parent if parent is not None else item
+
+
+def item_kind(item):
+    """Тип записи для объекта сцены или None, если объект не сохраняется
+    (превью инструментов, временные элементы)."""
+    if isinstance(item, PlaceholderItem):
+        return item.record["type"]
+    if isinstance(item, PatternPieceItem):
+        return "piece"
+    if isinstance(item, (SnappablePathItem, SeamAllowanceItem)):
+        return "path"
+    if isinstance(item, AnnotationTextItem):
+        return "annotation"
+    if isinstance(item, SnappableTextItem):
+        return "text"
+    return None
+
+
+def _encode_placeholder(item, writer):
+    # Объект так и не декодировали — переписываем его запись и геометрию
+    # как есть, обновив только то, что могло поменяться у заглушки
+    record = dict(item.record)
+    frame = _frame(item)
+    record["pos"] = [frame.pos().x(), frame.pos().y()]
+    record.pop("transform", None)
+    if not frame.transform().isIdentity():
+        record["transform"] = encode_transform(frame.transform())
+    for key in ("path", "vertices", "edge_controls"):
+        if key in record:
+            record[key] = writer.copy_from(item.reader, record[key])
+    return record
+
+
+def encode_item(item, writer):
+    kind = item_kind(item)
+    if kind is None:
+        return None
+    if isinstance(item, PlaceholderItem):
+        return _encode_placeholder(item, writer)
+
+    frame = _frame(item)
+    record = {
+        "type": kind,
+        "pos": [frame.pos().x(), frame.pos().y()],
+    }
+    if not frame.transform().isIdentity():
+        record["transform"] = encode_transform(frame.transform())
+    if item.zValue():
+        record["z"] = item.zValue()
+    item_id(item)
+    tags = {str(k): item.data(k) for k in TAG_KEYS if item.data(k) is not None}
+    if tags:
+        record["tags"] = tags
+    rect = item.boundingRect()
+    record["bounds"] = [rect.x(), rect.y(), rect.width(), rect.height()]
+
+    if kind in ("piece", "path"):
+        record["pen"] = encode_pen(item.pen())
+        record["brush"] = encode_brush(item.brush())
+        if kind == "piece" and item._vertices:
+            # Путь детали с вершинами однозначно восстанавливается по
+            # вершинам и контрольным точкам рёбер — сам путь не пишем
+            record["vertices"] = writer.add_points(item._vertices)
+            record["edge_controls"] = writer.add_points(item._edge_controls)
+        else:
+            record["path"] = writer.add_path(item.path())
+        if isinstance(item, StitchMarkItem):
+            # Путь — линия шва, стежки по привязке строит отрисовка и
+            # экспорт (ProjectFile.local_path)
+            record["procedural"] = True
+        if kind == "piece" and item.template is not None:
+            # Путь пишется всё равно — файл откроется и без этого шаблона
+            record["template"] = item.template.name
+            record["params"] = {k: float(v) for k, v in item.params.items()}
+    else:
+        record["text"] = item.toPlainText()
+        record["font"] = item.font().toString()
+        record["color"] = _color_to_str(item.defaultTextColor())
+    return record
+
+
+def decode_item(record, reader):
+    kind = record.get("type")
+    if kind == "piece":
+        if "vertices" in record:
+            vertices = reader.points(record["vertices"])
+            item = PatternPieceItem(QPainterPath(), vertices=vertices)
+            item._edge_controls = reader.points(record["edge_controls"])
+            item._rebuild_path()
+        else:
+            item = PatternPieceItem(reader.path(record["path"]))
+        if "template" in record:
+            from .pattern_templates import find_template
+            item.template = find_template(record["template"])
+            if item.template is not None:
+                item.params = dict(record["params"])
+    elif kind == "path":
+        link = record.get("tags", {}).get(str(LINK_KEY))
+        if isinstance(link, dict) and link.get("kind") == "seam":
+            # До attach_seams() стоит самостоятельно в рамке своей детали
+            item = SeamAllowanceItem(reader.path(record["path"]))
+        elif record.get("procedural"):
+            item = StitchMarkItem(reader.path(record["path"]))
+            _set_flags(item, _MOVABLE)
+        else:
+            item = SnappablePathItem(reader.path(record["path"]))
+            _set_flags(item, _MOVABLE)
+    elif kind in ("text", "annotation"):
+        if kind == "text":
+            item = SnappableTextItem(record["text"])
+            _set_flags(item, _MOVABLE)
+        else:
+            item = AnnotationTextItem(record["text"])
+            _set_flags(item, _EDITABLE_TEXT)
+        font = QFont()
+        font.fromString(record["font"])
+        item.setFont(font)
+        item.setDefaultTextColor(QColor(record["color"]))
+    else:
+        return None
+
+    if kind in ("piece", "path"):
+        item.setPen(decode_pen(record["pen"]))
+        item.setBrush(decode_brush(record["brush"]))
+    item.setPos(*record["pos"])
+    if "transform" in record:
+        item.setTransform(decode_transform(record["transform"]))
+    if "z" in record:
+        item.setZValue(record["z"])
+    for key, value in record.get("tags", {}).items():
+        item.setData(int(key), value)
+    return item
+
+
+def encode_items(items):
+    """Возвращает (objects, writer) для списка объектов сцены; секцию из
+    writer кодирует ProjectManager.save_project."""
+    writer = GeometryWriter()
+    objects = []
+    for item in items:
+        record = encode_item(item, writer)
+        if record is not None:
+            objects.append(record)
+    return objects, writer
+
+
+def decode_items(objects, reader, lazy=False):
+    """Объекты проекта. С lazy=True вместо объектов с индексом (bounds)
+    возвращаются PlaceholderItem — геометрия не декодируется вовсе."""
+    items = []
+    for record in objects:
+        if lazy and "bounds" in record and record.get("type") in _KINDS:
+            item = PlaceholderItem(record, reader)
+        else:
+            item = decode_item(record, reader)
+        if item is not None:
+            items.append(item)
+    return items
@@ -0,0 +1,274 @@
+# app/core/template_batch.py
+"""Векторизованное построение выкроек: N наборов параметров за один проход.
+
+BatchPath повторяет ту часть API QPainterPath, которой пользуются шаблоны
+(moveTo, lineTo, cubicTo, quadTo, arcTo с координатами-числами), но
+координаты — массивы NumPy длины N. Шаблон рисует себя в BatchPath тем же
+кодом draw(), что и в обычный QPainterPath, и за один проход получается N
+вариантов выкройки одинаковой структуры — для градации и анализа посадки.
+
+Порядок элементов совпадает с QPainterPath: квадратичная кривая хранится
+как кубическая, дуга — как линия к её началу и кубические сегменты,
+разрезанные, как в Qt (qt_curves_for_arc), по границам четвертей эллипса. Вырожденная линия (в ту же точку) пропускается, как в Qt,
+только если она вырождена во всех N вариантах — структура должна быть
+общей.
+"""
+import math
+
+import numpy as np
+
+from .serialization import MOVE_TO, LINE_TO, CURVE_TO, CURVE_DATA, path_from_arrays
+
+# Допуск совпадения точек — как qFuzzyCompare на координатах сцены
+_SAME_POINT = 1e-9
+# Длина касательных кубической четверти эллипса (QT_PATH_KAPPA)
+_KAPPA = 0.5522847498
+
+
+def _fuzzy_null(value):
+    return abs(value) <= 1e-12
+
+
+def _t_for_arc_angle(angle):
+    """Параметр t на кубической четверти окружности для угла angle (0..90°),
+    два шага Ньютона по x и по y, как qt_t_for_arc_angle."""
+    if _fuzzy_null(angle):
+        return 0.0
+    if abs(angle - 90) * 1e12 <= 90:
+        return 1.0
+    cos_angle, sin_angle = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    tc = angle / 90
+    for _ in range(2):
+        tc -= (((((2 - 3 * _KAPPA) * tc + 3 * (_KAPPA - 1)) * tc) * tc + 1 - cos_angle)
+               / (((6 - 9 * _KAPPA) * tc + 6 * (_KAPPA - 1)) * tc))
+    ts = tc
+    for _ in range(2):
+        ts -= ((((3 * _KAPPA - 2) * ts - 6 * _KAPPA + 3) * ts + 3 * _KAPPA) * ts - sin_angle) \
+            / (((9 * _KAPPA - 6) * ts + 12 * _KAPPA - 6) * ts + 3 * _KAPPA)
+    return 0.5 * (tc + ts)
+
+
+def _ellipse_point(cx, cy, rx, ry, angle):
+    """Точка эллипса на угле angle — на кубических четвертях, как
+    qt_find_ellipse_coords (а не на точном эллипсе)."""
+    theta = angle - 360 * math.floor(angle / 360)
+    quadrant = int(theta / 90)
+    t = _t_for_arc_angle(90 * (theta / 90 - quadrant))
+    if quadrant & 1:
+        t = 1 - t
+    m = 1 - t
+    a, b, c, d = m * m * m, 3 * t * m * m, 3 * t * t * m, t * t * t
+    px, py = a + b + c * _KAPPA, d + c + b * _KAPPA
+    if quadrant in (1, 2):
+        px = -px
+    if quadrant in (0, 1):
+        py = -py
+    return cx + rx * px, cy + ry * py
+
+
+def _split(curve, t):
+    """Кривая Безье (4 точки) делится в t: левая и правая части."""
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = curve
+
+    def mid(p, q):
+        return p[0] + (q[0] - p[0]) * t, p[1] + (q[1] - p[1]) * t
+
+    p01, p12, p23 = mid((x0, y0), (x1, y1)), mid((x1, y1), (x2, y2)), mid((x2, y2), (x3, y3))
+    p012, p123 = mid(p01, p12), mid(p12, p23)
+    p = mid(p012, p123)
+    return [(x0, y0), p01, p012, p], [p, p123, p23, (x3, y3)]
+
+
+def _on_interval(curve, t0, t1):
+    """Часть кривой на [t0, t1] (QBezier::bezierOnInterval)."""
+    if t1 < 1:
+        curve = _split(curve, t1)[0]
+    if t0 > 0:
+        curve = _split(curve, t0 / t1)[1]
+    return curve
+
+
+class PathBatch:
+    """Результат BatchPath: общая структура и координаты N вариантов.
+
+    types  — (M,) типы элементов (коды serialization / QPainterPath);
+    coords — (N, M, 2) координаты элементов в px сцены.
+    """
+
+    def __init__(self, types, coords):
+        self.types = types
+        self.coords = coords
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    @property
+    def vertices(self):
+        """(N, V, 2) — точки на контуре (начала, концы линий и кривых)."""
+        mask = np.ones(len(self.types), dtype=bool)
+        curves = np.flatnonzero(self.types == CURVE_TO)
+        mask[curves] = False        # первая контрольная точка
+        mask[curves + 1] = False    # вторая контрольная точка
+        return self.coords[:, mask]
+
+    @property
+    def controls(self):
+        """(N, 2·K, 2) — контрольные точки K кубических сегментов."""
+        curves = np.flatnonzero(self.types == CURVE_TO)
+        index = np.stack([curves, curves + 1], axis=1).ravel()
+        return self.coords[:, index]
+
+    def path(self, i):
+        """QPainterPath i-го варианта."""
+        return path_from_arrays(self.types, self.coords[i].ravel().tolist(),
+                                0, len(self.types))
+
+
+class BatchPath:
+    """QPainterPath для N вариантов сразу (см. описание модуля)."""
+
+    def __init__(self, n):
+        self.n = n
+        self._types = []
+        self._xs = []
+        self._ys = []
+        self._start = None      # начало текущего подпути
+        self._current = None
+
+    def _column(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.n,))
+
+    def _add(self, kind, x, y):
+        x, y = self._column(x), self._column(y)
+        self._types.append(kind)
+        self._xs.append(x)
+        self._ys.append(y)
+        return x, y
+
+    def _is_current(self, x, y):
+        cx, cy = self._current
+        return (np.all(np.abs(self._column(x) - cx) <= _SAME_POINT)
+                and np.all(np.abs(self._column(y) - cy) <= _SAME_POINT))
+
+    def moveTo(self, x, y):
+        if self._types and self._types[-1] == MOVE_TO:
+            # Как в Qt: moveTo подряд заменяет предыдущий
+            self._types.pop()
+            self._xs.pop()
+            self._ys.pop()
+        self._current = self._start = self._add(MOVE_TO, x, y)
+
+    def lineTo(self, x, y):
+        if self._current is None:
+            self.moveTo(0, 0)
+        if self._is_current(x, y):
+            return
+        self._current = self._add(LINE_TO, x, y)
+
+    def cubicTo(self, c1x, c1y, c2x, c2y, ex, ey):
+        if self._current is None:
+            self.moveTo(0, 0)
+        self._add(CURVE_TO, c1x, c1y)
+        self._add(CURVE_DATA, c2x, c2y)
+        self._current = self._add(CURVE_DATA, ex, ey)
+
+    def quadTo(self, cx, cy, ex, ey):
+        # Qt хранит квадратичную кривую как кубическую с теми же концами
+        if self._current is None:
+            self.moveTo(0, 0)
+        px, py = self._current
+        cx, cy = self._column(cx), self._column(cy)
+        ex, ey = self._column(ex), self._column(ey)
+        self.cubicTo(px + 2 / 3 * (cx - px), py + 2 / 3 * (cy - py),
+                     ex + 2 / 3 * (cx - ex), ey + 2 / 3 * (cy - ey), ex, ey)
+
+    def arcTo(self, x, y, w, h, start_angle, sweep_length):
+        """Дуга эллипса, вписанного в (x, y, w, h); углы в градусах против
+        часовой стрелки (ось Y вниз), как в QPainterPath.arcTo. Углы — числа:
+        от них зависит число сегментов. Дуга режется по границам четвертей
+        эллипса (qt_curves_for_arc), крайние четверти — частично."""
+        rx, ry = self._column(w) / 2, self._column(h) / 2
+        cx, cy = self._column(x) + rx, self._column(y) + ry
+        sweep_length = max(-360.0, min(360.0, sweep_length))
+        # Четверти против часовой стрелки от 0°, каждая — от начала к концу
+        corners = [(1, 0), (0, -1), (-1, 0), (0, 1), (1, 0)]
+
+        def quarter(i):
+            (ux, uy), (vx, vy) = corners[i % 4], corners[i % 4 + 1]
+            return [(cx + rx * ux, cy + ry * uy),
+                    (cx + rx * (ux + _KAPPA * vx), cy + ry * (uy + _KAPPA * vy)),
+                    (cx + rx * (vx + _KAPPA * ux), cy + ry * (vy + _KAPPA * uy)),
+                    (cx + rx * vx, cy + ry * vy)]
+
+        start = _ellipse_point(cx, cy, rx, ry, start_angle)
+        end = _ellipse_point(cx, cy, rx, ry, start_angle + sweep_length)
+        first = math.floor(start_angle / 90)
+        last = math.floor((start_angle + sweep_length) / 90)
+        start_t = (start_angle - first * 90) / 90
+        end_t = (start_angle + sweep_length - last * 90) / 90
+        delta = 1 if sweep_length > 0 else -1
+        if delta < 0:
+            start_t, end_t = 1 - start_t, 1 - end_t
+        # Без пустых крайних четвертей
+        if _fuzzy_null(start_t - 1):
+            start_t, first = 0.0, first + delta
+        if _fuzzy_null(end_t):
+            end_t, last = 1.0, last - delta
+        start_t = _t_for_arc_angle(start_t * 90)
+        end_t = _t_for_arc_angle(end_t * 90)
+        stop = last + delta
+
+        self.lineTo(*start)
+        if first == stop or (first == last and abs(start_t - end_t) * 1e12
+                             <= min(abs(start_t), abs(end_t))):
+            return  # пустая дуга
+        curves = []
+        for i in range(first, stop, delta):
+            curve = quarter(i)
+            if delta < 0:
+                curve.reverse()
+            if i == first:
+                curve = _on_interval(curve, start_t, end_t if i == last else 1.0)
+            elif i == last:
+                curve = _on_interval(curve, 0.0, end_t)
+            curves.append(curve)
+        for n, (_, c1, c2, e) in enumerate(curves):
+            self.cubicTo(*c1, *c2, *(end if n == len(curves) - 1 else e))
+
+    def closeSubpath(self):
+        if self._start is not None and not self._is_current(*self._start):
+            self.lineTo(*self._start)
+
+    def finish(self):
+        types = np.array(self._types, dtype=np.uint8)
+        coords = np.empty((self.n, len(self._types), 2))
+        if self._types:
+            coords[:, :, 0] = np.stack(self._xs, axis=1)
+            coords[:, :, 1] = np.stack(self._ys, axis=1)
+        return PathBatch(types, coords)
+
+
+def batch_size(values):
+    """Длина N для набора параметров — скаляры растягиваются на все
+    варианты, массивы должны быть одной длины."""
+    sizes = {np.size(v) for v in values if np.ndim(v) > 0}
+    if len(sizes) > 1:
+        raise ValueError(f"Parameter arrays differ in length: {sorted(sizes)}")
+    return sizes.pop() if sizes else 1
+
+
+def stack_paths(paths):
+    """PathBatch из готовых QPainterPath одинаковой структуры."""
+    if not paths:
+        return PathBatch(np.empty(0, dtype=np.uint8), np.empty((0, 0, 2)))
+    first = paths[0]
+    types = np.array([first.elementAt(i).type.value for i in range(first.elementCount())],
+                     dtype=np.uint8)
+    coords = np.empty((len(paths), len(types), 2))
+    for n, path in enumerate(paths):
+        if path.elementCount() != len(types):
+            raise ValueError("Paths differ in structure and cannot be stacked")
+        for i in range(len(types)):
+            e = path.elementAt(i)
+            coords[n, i] = (e.x, e.y)
+    return PathBatch(types, coords)
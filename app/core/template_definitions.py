@@ -0,0 +1,263 @@
+# app/core/template_definitions.py
+"""Декларативные шаблоны выкроек — файлы определений *.pattern.
+
+Файл состоит из заголовка и программы построения контура:
+
+    # комментарий
+    name: Sleeve
+    category: Sleeves
+    param width: Width (cm), 25..45, 34
+    param height: Height (cm), 45..70, 58
+
+    program:
+    let hip = height * 0.3
+    move 0, 0
+    line width, 0
+    cubic c1x, c1y, c2x, c2y, x, y
+    quad cx, cy, x, y
+    arc x, y, w, h, start_angle, sweep
+    close
+
+Все длины — в сантиметрах, как параметры; в px сцены их переводит
+скомпилированная программа. Аргументы — арифметические выражения
+(+ - * / **, скобки, числа, параметры и объявленные выше let), углы дуги —
+константы в градусах, как в QPainterPath.arcTo.
+
+При запуске читается только заголовок (до строки "program:"). Программа
+разбирается и компилируется в функцию draw(path, **params) при первом
+построении выкройки и дальше берётся готовой; функция рисует и в
+QPainterPath, и в template_batch.BatchPath. Строки скомпилированного кода
+совпадают со строками файла — ошибка в выражении указывает на файл.
+"""
+import ast
+import os
+import threading
+
+from PyQt6.QtGui import QPainterPath
+
+from .pattern_templates import PatternTemplate, PX_PER_CM
+
+SUFFIX = ".pattern"
+PROGRAM_MARKER = "program:"
+
+# Команды программы: имя метода пути и число аргументов
+_COMMANDS = {
+    "move": ("moveTo", 2),
+    "line": ("lineTo", 2),
+    "quad": ("quadTo", 4),
+    "cubic": ("cubicTo", 6),
+    "arc": ("arcTo", 6),
+    "close": ("closeSubpath", 0),
+}
+# У дуги последние два аргумента — углы, их не переводим в px
+_ANGLE_ARGS = {"arc": 2}
+_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+_catalogues = {}
+_catalogues_lock = threading.Lock()
+
+
+class DefinitionError(ValueError):
+    """Ошибка в файле определения: путь и номер строки в тексте."""
+
+    def __init__(self, path, line, message):
+        super().__init__(f"{path}:{line}: {message}")
+        self.path = path
+        self.line = line
+
+
+def _strip(line):
+    return line.split("#", 1)[0].strip()
+
+
+def _identifier(name, path, number):
+    if not name.isidentifier() or name.startswith("_") or name == "path":
+        raise DefinitionError(path, number, f"invalid name: {name!r}")
+    return name
+
+
+def _number(value):
+    # Целые — как int: панель строит по параметрам целочисленные слайдеры
+    return int(value) if value.is_integer() else value
+
+
+def _parse_param(text, path, number):
+    """'width: Width (cm), 25..45, 34' → словарь get_parameters()."""
+    name, _, rest = text.partition(":")
+    try:
+        label, bounds, default = (s.strip() for s in rest.rsplit(",", 2))
+        low, high = (float(v) for v in bounds.split(".."))
+        default = float(default)
+    except ValueError:
+        raise DefinitionError(path, number,
+                              "expected 'param name: Label, min..max, default'") from None
+    if not low <= default <= high:
+        raise DefinitionError(path, number, f"default {default:g} is outside {low:g}..{high:g}")
+    return {"name": _identifier(name.strip(), path, number), "label": label or name.strip(),
+            "min": _number(low), "max": _number(high), "default": _number(default)}
+
+
+def read_header(path):
+    """DefinitionTemplate по заголовку файла — программа не читается."""
+    header = {}
+    parameters = []
+    program_line = None
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            text = _strip(line)
+            if not text:
+                continue
+            if text == PROGRAM_MARKER:
+                program_line = number
+                break
+            if text.startswith("param "):
+                parameters.append(_parse_param(text[6:], path, number))
+                continue
+            key, sep, value = text.partition(":")
+            if not sep:
+                raise DefinitionError(path, number, f"expected 'key: value', got {text!r}")
+            header[key.strip().lower()] = value.strip()
+    for key in ("name", "category"):
+        if not header.get(key):
+            raise DefinitionError(path, 1, f"missing '{key}:' in header")
+    if program_line is None:
+        raise DefinitionError(path, 1, f"missing '{PROGRAM_MARKER}' section")
+    names = [p["name"] for p in parameters]
+    if len(set(names)) != len(names):
+        raise DefinitionError(path, 1, "duplicate parameter names")
+    return DefinitionTemplate(header["name"], header["category"], parameters,
+                              path, program_line)
+
+
+def _expression(text, names, path, number, constant=False):
+    """Проверяет выражение и возвращает его исходный текст для кода."""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError:
+        raise DefinitionError(path, number, f"invalid expression: {text.strip()!r}") from None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if constant:
+                raise DefinitionError(path, number, f"angle must be a constant: {text.strip()!r}")
+            if node.id not in names:
+                raise DefinitionError(path, number, f"unknown name: {node.id!r}")
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise DefinitionError(path, number, f"not a number: {node.value!r}")
+        elif not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load)
+                            + _OPERATORS):
+            raise DefinitionError(path, number, f"unsupported expression: {text.strip()!r}")
+    return f"({ast.unparse(tree)})"
+
+
+def compile_program(template):
+    """Функция draw(path, **params) из программы файла определения."""
+    names = {p["name"] for p in template.parameters}
+    with open(template.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    # Код строится построчно на тех же номерах строк, что и в файле
+    source = [""] * len(lines)
+    args = ", ".join(p["name"] for p in template.parameters)
+    source[template.program_line - 1] = f"def draw(path, {args}):" if args else "def draw(path):"
+    for number in range(template.program_line + 1, len(lines) + 1):
+        text = _strip(lines[number - 1])
+        if not text:
+            continue
+        keyword, _, rest = text.partition(" ")
+        if keyword == "let":
+            name, sep, value = rest.partition("=")
+            if not sep:
+                raise DefinitionError(template.path, number, "expected 'let name = expression'")
+            name = _identifier(name.strip(), template.path, number)
+            source[number - 1] = f"    {name} = {_expression(value, names, template.path, number)}"
+            names.add(name)
+            continue
+        if keyword not in _COMMANDS:
+            raise DefinitionError(template.path, number, f"unknown command: {keyword!r}")
+        method, count = _COMMANDS[keyword]
+        values = rest.split(",") if rest.strip() else []
+        if len(values) != count:
+            raise DefinitionError(template.path, number,
+                                  f"'{keyword}' takes {count} arguments, got {len(values)}")
+        angles = _ANGLE_ARGS.get(keyword, 0)
+        code = []
+        for i, value in enumerate(values):
+            if i >= count - angles:
+                code.append(_expression(value, names, template.path, number, constant=True))
+            else:
+                code.append(f"_PX * {_expression(value, names, template.path, number)}")
+        source[number - 1] = f"    path.{method}({', '.join(code)})"
+    source.append("    return path")
+
+    namespace = {"_PX": PX_PER_CM, "__builtins__": {}}
+    exec(compile("\n".join(source), template.path, "exec"), namespace)
+    return namespace["draw"]
+
+
+class DefinitionTemplate(PatternTemplate):
+    """Шаблон из файла определения. Программа компилируется при первом
+    построении (draw/generate_path/generate_batch), до этого объект — только
+    заголовок: имя, категория и параметры."""
+
+    def __init__(self, name, category, parameters, path, program_line):
+        super().__init__(name, category)
+        self.parameters = parameters
+        self.path = path
+        self.program_line = program_line
+        self._program = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_compiled(self):
+        return self._program is not None
+
+    def program(self):
+        if self._program is None:
+            with self._lock:
+                if self._program is None:
+                    self._program = compile_program(self)
+        return self._program
+
+    def get_parameters(self):
+        return [dict(p) for p in self.parameters]
+
+    def generate_path(self, **params):
+        values = {p["name"]: p["default"] for p in self.parameters}
+        # Лишние параметры игнорируются, как **kwargs у шаблонов-классов
+        values.update((k, v) for k, v in params.items() if k in values)
+        return self.draw(QPainterPath(), **values)
+
+    def draw(self, path, **params):
+        return self.program()(path, **params)
+
+    def cache_key(self, params):
+        # Одно имя может быть у шаблонов из разных каталогов
+        key = super().cache_key(params)
+        return None if key is None else key + (self.path,)
+
+
+def load_catalogue(directory):
+    """([DefinitionTemplate], [(путь, ошибка)]) для каталога — файлы в
+    порядке имён. Результат кэшируется до изменения состава каталога;
+    неисправный файл пропускается и попадает в список ошибок."""
+    try:
+        stamp = os.stat(directory).st_mtime_ns
+    except OSError:
+        return [], []
+    with _catalogues_lock:
+        cached = _catalogues.get(directory)
+        if cached is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+    templates, errors = [], []
+    for entry in sorted(os.listdir(directory)):
+        if not entry.endswith(SUFFIX):
+            continue
+        path = os.path.join(directory, entry)
+        try:
+            templates.append(read_header(path))
+        except (OSError, ValueError) as e:
+            errors.append((path, str(e)))
+    with _catalogues_lock:
+        _catalogues[directory] = (stamp, templates, errors)
+    return templates, errors
@@ -0,0 +1,339 @@
+# app/core/vector_export.py
+"""Потоковый векторный экспорт проекта в SVG и PDF в реальных единицах.
+
+Записи проекта (ProjectManager.current_project) обходятся один раз в
+порядке наложения; каждая деталь, припуск, отметка строчки, долевая нить и
+подпись сразу пишется в файл. В памяти держится только текущий объект (и
+для PDF — смещения нескольких служебных объектов), поэтому время и память
+растут линейно с числом деталей, а экспорт можно прервать между объектами.
+
+SVG задаётся в единицах MeasurementSystem (width="150cm", viewBox в см);
+PDF — в пунктах, размер страницы равен размеру холста в натуральную
+величину. Текст в PDF пишется контурами: поставщику не нужны наши шрифты.
+"""
+import os
+import zlib
+from xml.sax.saxutils import escape, quoteattr
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QPainterPath, QPen, QBrush, QColor, QTransform
+
+from .measurements import MeasurementSystem
+from .project_file import ProjectFile, text_document
+from .serialization import decode_pen, decode_brush
+
+FORMATS = ("SVG", "PDF")
+# Категории объектов — классы в SVG и слои (Optional Content) в PDF
+CATEGORIES = ("pieces", "seam_allowances", "stitches", "lines", "labels")
+_CATEGORY_TITLES = {
+    "pieces": "Pieces",
+    "seam_allowances": "Seam allowances",
+    "stitches": "Stitches",
+    "lines": "Grainlines",
+    "labels": "Labels",
+}
+# Как часто (в объектах) сообщать о прогрессе и проверять отмену
+_CHECK_EVERY = 100
+# Acrobat не открывает страницы больше 200 дюймов — крупнее масштабируем
+# через /UserUnit
+_PDF_MAX_PAGE = 14400
+_PT_PER_MM = 72 / 25.4
+
+_CAPS = {Qt.PenCapStyle.FlatCap: ("butt", 0), Qt.PenCapStyle.SquareCap: ("square", 2),
+         Qt.PenCapStyle.RoundCap: ("round", 1)}
+_JOINS = {Qt.PenJoinStyle.MiterJoin: ("miter", 0), Qt.PenJoinStyle.SvgMiterJoin: ("miter", 0),
+          Qt.PenJoinStyle.RoundJoin: ("round", 1), Qt.PenJoinStyle.BevelJoin: ("bevel", 2)}
+
+
+def vector_format(file_path, format=None):
+    if format:
+        return format.upper()
+    return "PDF" if os.path.splitext(file_path)[1].lower() == ".pdf" else "SVG"
+
+
+def record_category(record):
+    """Категория записи: деталь, припуск, строчка, линия или подпись."""
+    kind = record.get("type")
+    if kind in ("text", "annotation"):
+        return "labels"
+    if kind == "piece":
+        return "pieces"
+    tags = record.get("tags", {})
+    if tags.get("0") == "seam_allowance":
+        return "seam_allowances"
+    if tags.get("1") == "seam_style":
+        return "stitches"
+    return "lines"
+
+
+def _num(value, digits=3):
+    text = f"{value:.{digits}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def _dashes(pen):
+    """Штрихи пера в единицах сцены или None для сплошной линии."""
+    if pen.style() in (Qt.PenStyle.SolidLine, Qt.PenStyle.NoPen):
+        return None
+    width = pen.widthF() or 1.0
+    return [d * width for d in pen.dashPattern()]
+
+
+def text_lines(record):
+    """Строки текстовой записи: (текст, x, y базовой линии) в локальных
+    координатах объекта — так же, как их раскладывает QGraphicsTextItem."""
+    document = text_document(record)
+    document.documentLayout()  # раскладка выполняется при первом обращении
+    font = document.defaultFont()
+    lines = []
+    block = document.begin()
+    while block.isValid():
+        layout = block.layout()
+        origin = layout.position()
+        for i in range(layout.lineCount()):
+            line = layout.lineAt(i)
+            text = block.text()[line.textStart():line.textStart() + line.textLength()]
+            lines.append((text, origin.x() + line.x(), origin.y() + line.y() + line.ascent()))
+        block = block.next()
+    return font, lines
+
+
+class SvgStream:
+    """SVG, который пишется по объекту; координаты — в единицах unit."""
+
+    def __init__(self, f, width, height, unit):
+        self.f = f
+        self.k = MeasurementSystem(unit).px_to_unit(1)
+        w, h = _num(width * self.k), _num(height * self.k)
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+                f'width="{w}{unit}" height="{h}{unit}" viewBox="0 0 {w} {h}">\n')
+
+    def _path_data(self, path):
+        k = self.k
+        parts = []
+        i, count = 0, path.elementCount()
+        while i < count:
+            e = path.elementAt(i)
+            if e.type == QPainterPath.ElementType.MoveToElement:
+                parts.append(f"M{_num(e.x * k)} {_num(e.y * k)}")
+                i += 1
+            elif e.type == QPainterPath.ElementType.LineToElement:
+                parts.append(f"L{_num(e.x * k)} {_num(e.y * k)}")
+                i += 1
+            else:  # CurveTo + два CurveToData
+                c2, end = path.elementAt(i + 1), path.elementAt(i + 2)
+                parts.append(f"C{_num(e.x * k)} {_num(e.y * k)} {_num(c2.x * k)} {_num(c2.y * k)} "
+                             f"{_num(end.x * k)} {_num(end.y * k)}")
+                i += 3
+        return "".join(parts)
+
+    def path(self, category, path, pen, brush):
+        attrs = [f'class="{category}"', f'd="{self._path_data(path)}"']
+        if brush.style() != Qt.BrushStyle.NoBrush and brush.color().alpha():
+            attrs.append(f'fill="{brush.color().name()}"')
+            if brush.color().alpha() < 255:
+                attrs.append(f'fill-opacity="{_num(brush.color().alphaF())}"')
+            if path.fillRule() == Qt.FillRule.OddEvenFill:
+                attrs.append('fill-rule="evenodd"')
+        else:
+            attrs.append('fill="none"')
+        if pen.style() != Qt.PenStyle.NoPen:
+            attrs.append(f'stroke="{pen.color().name()}"')
+            if pen.widthF():
+                attrs.append(f'stroke-width="{_num(pen.widthF() * self.k)}"')
+            else:  # косметическое перо — одна точка устройства
+                attrs.append('stroke-width="1" vector-effect="non-scaling-stroke"')
+            cap, _ = _CAPS.get(pen.capStyle(), ("square", 2))
+            join, _ = _JOINS.get(pen.joinStyle(), ("bevel", 2))
+            attrs.append(f'stroke-linecap="{cap}" stroke-linejoin="{join}"')
+            dashes = _dashes(pen)
+            if dashes:
+                attrs.append(f'stroke-dasharray="{" ".join(_num(d * self.k) for d in dashes)}"')
+        self.f.write(f'<path {" ".join(attrs)}/>\n')
+
+    def text(self, category, record, transform):
+        font, lines = text_lines(record)
+        t = transform * QTransform.fromScale(self.k, self.k)
+        matrix = " ".join(_num(v, 6) for v in (t.m11(), t.m12(), t.m21(), t.m22(), t.dx(), t.dy()))
+        size = font.pointSizeF() * 96 / 72 if font.pointSizeF() > 0 else font.pixelSize()
+        style = []
+        if font.bold():
+            style.append('font-weight="bold"')
+        if font.italic():
+            style.append('font-style="italic"')
+        attrs = (f'class="{category}" transform="matrix({matrix})" '
+                 f'font-family={quoteattr(font.family())} font-size="{_num(size)}" '
+                 f'fill="{QColor(record["color"]).name()}" {" ".join(style)}')
+        # По элементу на строку: позиции <tspan> понимают не все программы
+        for text, x, y in lines:
+            self.f.write(f'<text {attrs.rstrip()} x="{_num(x)}" y="{_num(y)}">{escape(text)}</text>\n')
+
+    def close(self):
+        self.f.write('</svg>\n')
+
+
+class PdfStream:
+    """Одностраничный PDF. Содержимое страницы сжимается и пишется по
+    объекту; словари страницы, слоёв и таблица xref — в конце файла."""
+
+    def __init__(self, f, width, height, unit=None):
+        self.f = f
+        self.offsets = {}
+        # Объекты: 1 — каталог, 2 — страницы, 3 — страница, 4 — содержимое,
+        # 5 — длина содержимого, 6.. — слои (OCG) по CATEGORIES
+        pt_per_px = MeasurementSystem("mm").px_to_unit(1) * _PT_PER_MM
+        w, h = width * pt_per_px, height * pt_per_px
+        self.user_unit = max(1.0, max(w, h) / _PDF_MAX_PAGE)
+        self.page = (w / self.user_unit, h / self.user_unit)
+        s = pt_per_px / self.user_unit
+
+        f.write(b"%PDF-1.6\n%\xe2\xe3\xcf\xd3\n")
+        self._begin(4)
+        f.write(b"<< /Length 5 0 R /Filter /FlateDecode >>\nstream\n")
+        self._content_start = f.tell()
+        self._compressor = zlib.compressobj(6)
+        # Ось Y вниз, единицы — пиксели сцены
+        self._emit(f"{_num(s, 6)} 0 0 {_num(-s, 6)} 0 {_num(self.page[1])} cm\n")
+
+    def _begin(self, number):
+        self.offsets[number] = self.f.tell()
+        self.f.write(f"{number} 0 obj\n".encode())
+
+    def _object(self, number, body):
+        self._begin(number)
+        self.f.write(body.encode("latin-1") + b"\nendobj\n")
+
+    def _emit(self, text):
+        self.f.write(self._compressor.compress(text.encode("latin-1")))
+
+    @staticmethod
+    def _path_ops(path):
+        ops = []
+        i, count = 0, path.elementCount()
+        while i < count:
+            e = path.elementAt(i)
+            if e.type == QPainterPath.ElementType.MoveToElement:
+                ops.append(f"{_num(e.x)} {_num(e.y)} m")
+                i += 1
+            elif e.type == QPainterPath.ElementType.LineToElement:
+                ops.append(f"{_num(e.x)} {_num(e.y)} l")
+                i += 1
+            else:
+                c2, end = path.elementAt(i + 1), path.elementAt(i + 2)
+                ops.append(f"{_num(e.x)} {_num(e.y)} {_num(c2.x)} {_num(c2.y)} "
+                           f"{_num(end.x)} {_num(end.y)} c")
+                i += 3
+        return "\n".join(ops)
+
+    @staticmethod
+    def _rgb(color):
+        return f"{_num(color.redF())} {_num(color.greenF())} {_num(color.blueF())}"
+
+    def path(self, category, path, pen, brush):
+        fill = brush.style() != Qt.BrushStyle.NoBrush and brush.color().alpha() > 0
+        stroke = pen.style() != Qt.PenStyle.NoPen
+        if not (fill or stroke) or path.isEmpty():
+            return
+        ops = [f"/OC /{category} BDC q"]
+        if fill:
+            ops.append(f"{self._rgb(brush.color())} rg")
+        if stroke:
+            _, cap = _CAPS.get(pen.capStyle(), ("square", 2))
+            _, join = _JOINS.get(pen.joinStyle(), ("bevel", 2))
+            ops.append(f"{self._rgb(pen.color())} RG {_num(pen.widthF())} w {cap} J {join} j")
+            dashes = _dashes(pen)
+            if dashes:
+                ops.append(f"[{' '.join(_num(d) for d in dashes)}] 0 d")
+        ops.append(self._path_ops(path))
+        even_odd = "*" if path.fillRule() == Qt.FillRule.OddEvenFill else ""
+        ops.append(("B" + even_odd if stroke else "f" + even_odd) if fill else "S")
+        ops.append("Q EMC\n")
+        self._emit("\n".join(ops))
+
+    def text(self, category, record, transform):
+        font, lines = text_lines(record)
+        outline = QPainterPath()
+        for text, x, y in lines:
+            outline.addText(QPointF(x, y), font, text)
+        outline.setFillRule(Qt.FillRule.WindingFill)
+        brush = QBrush(QColor(record["color"]))
+        self.path(category, transform.map(outline), QPen(Qt.PenStyle.NoPen), brush)
+
+    def close(self):
+        f = self.f
+        f.write(self._compressor.flush())
+        length = f.tell() - self._content_start
+        f.write(b"\nendstream\nendobj\n")
+        self._object(5, str(length))
+
+        layers = {c: 6 + i for i, c in enumerate(CATEGORIES)}
+        refs = " ".join(f"{n} 0 R" for n in layers.values())
+        for category, number in layers.items():
+            self._object(number, f"<< /Type /OCG /Name ({_CATEGORY_TITLES[category]}) >>")
+        self._object(1, f"<< /Type /Catalog /Pages 2 0 R /OCProperties "
+                        f"<< /OCGs [{refs}] /D << /Order [{refs}] /ON [{refs}] >> >> >>")
+        self._object(2, "<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
+        properties = " ".join(f"/{c} {n} 0 R" for c, n in layers.items())
+        user_unit = f" /UserUnit {_num(self.user_unit)}" if self.user_unit > 1 else ""
+        self._object(3, f"<< /Type /Page /Parent 2 0 R "
+                        f"/MediaBox [0 0 {_num(self.page[0])} {_num(self.page[1])}]{user_unit} "
+                        f"/Contents 4 0 R /Resources << /Properties << {properties} >> >> >>")
+
+        xref = f.tell()
+        count = max(self.offsets) + 1
+        f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for number in range(1, count):
+            f.write(f"{self.offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+_STREAMS = {"SVG": SvgStream, "PDF": PdfStream}
+
+
+def export_vector(project, reader, file_path, format=None, unit="mm",
+                  progress=None, cancelled=None):
+    """Экспортирует записи проекта в SVG/PDF. Запись идёт во временный файл
+    и подменяет file_path только при успехе; при отмене возвращает False."""
+    format = vector_format(file_path, format)
+    if format not in _STREAMS:
+        raise ValueError(f"Unsupported vector format: {format}")
+    report = progress or (lambda percent: None)
+    is_cancelled = cancelled or (lambda: False)
+    source = ProjectFile.from_data(project, reader)
+    total = max(1, len(source))
+
+    tmp_path = file_path + ".tmp"
+    try:
+        with (open(tmp_path, 'w', encoding='utf-8') if format == "SVG"
+                  else open(tmp_path, 'wb')) as f:
+            stream = _STREAMS[format](f, project.get("width", 0), project.get("height", 0), unit)
+            ok = True
+            for i, record in enumerate(source.records()):
+                if i % _CHECK_EVERY == 0:
+                    if is_cancelled():
+                        ok = False
+                        break
+                    report(int(100 * i / total))
+                category = record_category(record)
+                if record.get("type") in ("text", "annotation"):
+                    stream.text(category, record, source.scene_transform(record))
+                    continue
+                path = source.scene_path(record)
+                if path is None:
+                    continue
+                pen = decode_pen(record["pen"]) if "pen" in record else QPen(QColor(0, 0, 0))
+                brush = (decode_brush(record["brush"]) if "brush" in record
+                         else QBrush(Qt.BrushStyle.NoBrush))
+                stream.path(category, path, pen, brush)
+            if ok:
+                stream.close()
+                report(100)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if not ok:
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, file_path)
+    return True
@@ -1,8 +1,11 @@
 # app/tools/pattern_item.py
 from PyQt6.QtCore import Qt, QRectF, QPointF
-from PyQt6.QtGui import QPen, QBrush, QColor, QTransform, QPainterPath
-from PyQt6.QtWidgets import QGraphicsPathItem, QGraphicsItem
+from PyQt6.QtGui import QPen, QBrush, QColor, QTransform, QPainterPath, QPainterPathStroker
+from PyQt6.QtWidgets import QGraphicsPathItem, QGraphicsItem, QStyleOptionGraphicsItem
+from ..core import flattening
+from ..core.metrics import PathMetrics
 from .graphics_items import GridSnapMixin
+from .seam_item import SeamAllowanceItem
 
 HANDLE_SIZE = 10
 EDGE_HANDLE_SIZE = 8
@@ -11,6 +14,26 @@ MIN_SCALE = 0.1
 # ближе этого расстояния к прямой середине ребра, ребро "распрямляется"
 # обратно (control=None), а не остаётся кривой почти незаметной кривизны.
 EDGE_STRAIGHTEN_THRESHOLD = 4
+# Сколько ступеней масштаба держит кэш ломаных детали: при зуме туда-обратно
+# соседние ступени не перестраиваются
+FLATTEN_CACHE_BUCKETS = 3
+
+
+def build_polygon_path(vertices, edge_controls):
+    """Замкнутый контур по вершинам: ребро i идёт от vertices[i] к
+    vertices[i + 1] — прямой, если edge_controls[i] is None, иначе
+    квадратичной кривой Безье с этой контрольной точкой."""
+    n = len(vertices)
+    path = QPainterPath(vertices[0])
+    for i in range(n):
+        p1 = vertices[(i + 1) % n]
+        control = edge_controls[i]
+        if control is None:
+            path.lineTo(p1)
+        else:
+            path.quadTo(control, p1)
+    path.closeSubpath()
+    return path
 
 
 class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
@@ -29,10 +52,30 @@ class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
     выгибания прямого края рукава в пройму. Для деталей без vertices (пути
     шаблонов) эта возможность недоступна — там нет однозначного разбиения
     пути на прямые рёбра.
+
+    Деталь, поставленная из шаблона, хранит template и params (в см) и
+    перестраивает путь по шаблону при set_params() — без искажения кривых,
+    которое дал бы масштаб (см. core/parametric.py).
+
+    Отрисовка и hit-testing идут по ломаной, в которую путь раскладывается
+    один раз на ступень масштаба вида (core/flattening.py): кэш сбрасывается
+    только в setPath(), панорамирование и перерисовка кривые не пересчитывают.
+    shape() берёт ступень последней отрисовки.
     """
 
-    def __init__(self, path, vertices=None):
+    def __init__(self, path, vertices=None, template=None, params=None):
+        self._flat_cache = {}   # ступень масштаба -> [полигоны, путь, (перо, shape)]
+        self._hit_bucket = 0
+        self._shape_key = None
+        self._shape_base = None
+        self._shape = None
+        self._pen_rect = None   # контур пути с запасом на перо
+        self._geometry_version = 0
+        self._metrics_key = None
+        self._metrics = None
         super().__init__(path)
+        self.template = template
+        self.params = dict(params or {})
         self.setFlags(
             QGraphicsItem.GraphicsItemFlag.ItemIsSelectable |
             QGraphicsItem.GraphicsItemFlag.ItemIsMovable
@@ -78,17 +121,50 @@ class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
                 for name, p in self._handle_points().items()}
 
     def _rebuild_path(self):
-        n = len(self._vertices)
-        path = QPainterPath(self._vertices[0])
-        for i in range(n):
-            p1 = self._vertices[(i + 1) % n]
-            control = self._edge_controls[i]
-            if control is None:
-                path.lineTo(p1)
+        self.setPath(build_polygon_path(self._vertices, self._edge_controls))
+
+    def setPath(self, path):
+        self._geometry_version += 1
+        self._flat_cache.clear()
+        self._shape_key = None
+        self._pen_rect = None
+        super().setPath(path)
+        # Привязанные припуски пересчитывают только изменившиеся рёбра
+        for child in self.childItems():
+            if isinstance(child, SeamAllowanceItem):
+                child.follow()
+
+    def _flattened(self, bucket):
+        entry = self._flat_cache.get(bucket)
+        if entry is None:
+            if len(self._flat_cache) >= FLATTEN_CACHE_BUCKETS:
+                self._flat_cache.pop(next(iter(self._flat_cache)))
+            tolerance = flattening.bucket_tolerance(bucket)
+            polygons = flattening.flatten_polygons(self.path(), tolerance)
+            flat = flattening.polygons_path(polygons, self.path().fillRule())
+            entry = self._flat_cache[bucket] = [polygons, flat, None]
+        return entry
+
+    def _flat_shape(self):
+        # То же, что QGraphicsPathItem.shape(), но по ломаной: обводка пером
+        # плюс сам контур. Кэшируется вместе с ломаной, пока не сменится перо.
+        entry = self._flattened(self._hit_bucket)
+        pen = self.pen()
+        pen_key = (pen.style(), pen.widthF(), pen.capStyle(), pen.joinStyle())
+        if entry[2] is None or entry[2][0] != pen_key:
+            flat = entry[1]
+            if pen.style() == Qt.PenStyle.NoPen or pen.widthF() == 0:
+                shape = flat
             else:
-                path.quadTo(control, p1)
-        path.closeSubpath()
-        self.setPath(path)
+                stroker = QPainterPathStroker()
+                stroker.setWidth(pen.widthF())
+                stroker.setCapStyle(pen.capStyle())
+                stroker.setJoinStyle(pen.joinStyle())
+                stroker.setMiterLimit(pen.miterLimit())
+                shape = stroker.createStroke(flat)
+                shape.addPath(flat)
+            entry[2] = (pen_key, shape)
+        return entry[2][1]
 
     def _edge_midpoints(self):
         # Точка на середине ребра (t=0.5) — для прямого ребра это обычная
@@ -123,12 +199,55 @@ class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
         return {i: QRectF(p.x() - hw, p.y() - hh, hw * 2, hh * 2)
                 for i, p in self._edge_midpoints().items()}
 
+    @property
+    def is_parametric(self):
+        return self.template is not None
+
+    def set_params(self, params, immediate=False):
+        """Новые параметры шаблона. Путь и зависимые оверлеи перестраиваются
+        в ближайшем проходе parametric (immediate=True — сразу)."""
+        from ..core import parametric
+        self.params = dict(params)
+        if immediate:
+            parametric.regenerate([self])
+        else:
+            parametric.schedule(self)
+
+    def metrics(self):
+        """Площадь, периметр, длины рёбер и центр масс (core/metrics.py) в
+        px сцены с учётом transform(); центр масс — относительно pos().
+        Пересчитываются только после смены геометрии или трансформа, и
+        то лишь изменившиеся рёбра — при перетаскивании хендла ребра
+        интегрируется одно ребро. Рёбра детали по вершинам — между
+        соседними вершинами, у детали по шаблону — участки контура между
+        изломами (metrics.edge_groups())."""
+        t = self.transform()
+        key = (self._geometry_version, t.m11(), t.m12(), t.m21(), t.m22(), t.dx(), t.dy())
+        if key != self._metrics_key:
+            self._metrics = PathMetrics.from_path(self.path(), t, previous=self._metrics,
+                                                  join_smooth=not self._vertices)
+            self._metrics_key = key
+        return self._metrics
+
     def set_edge_control(self, index, control):
         self._edge_controls[index] = control
         self._rebuild_path()
 
+    def setPen(self, pen):
+        self._pen_rect = None
+        self._shape_key = None
+        super().setPen(pen)
+
     def boundingRect(self):
-        rect = super().boundingRect()
+        # Не через QGraphicsPathItem.boundingRect(): тот строит shape(), а
+        # значит и ломаную, для каждой новой геометрии — даже у деталей,
+        # которые ни разу не рисовались. Запас в ширину пера покрывает
+        # обводку вместе с острыми углами.
+        rect = self._pen_rect
+        if rect is None:
+            pen = self.pen()
+            pw = 0.0 if pen.style() == Qt.PenStyle.NoPen else pen.widthF()
+            rect = self._pen_rect = self.path().controlPointRect().adjusted(-pw, -pw, pw, pw)
         t = self.transform()
         sx = abs(t.m11()) or 1.0
         sy = abs(t.m22()) or 1.0
@@ -143,9 +262,15 @@ class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
         # самого контура. Без этого клик по квадратику "проваливается" мимо
         # объекта, вместо ресайза начинается rubber-band выделение, и деталь
         # выглядит так, будто пропала.
-        base = super().shape()
+        base = self._flat_shape()
         if not self.isSelected():
             return base
+        # Объединение с хендлами тоже кэшируется: оно зависит от базового
+        # контура (объект из кэша ломаных) и масштаба трансформа
+        t = self.transform()
+        key = (id(base), t.m11(), t.m22())
+        if key == self._shape_key and self._shape_base is base:
+            return self._shape
         combined = QPainterPath(base)
         for rect in self._handle_rects().values():
             handle_path = QPainterPath()
@@ -155,10 +280,19 @@ class PatternPieceItem(GridSnapMixin, QGraphicsPathItem):
             handle_path = QPainterPath()
             handle_path.addRect(rect)
             combined = combined.united(handle_path)
+        self._shape_key, self._shape_base, self._shape = key, base, combined
         return combined
 
     def paint(self, painter, option, widget=None):
-        super().paint(painter, option, widget)
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        self._hit_bucket = flattening.zoom_bucket(scale)
+        polygons, flat, _ = self._flattened(self._hit_bucket)
+        painter.setPen(self.pen())
+        painter.setBrush(self.brush())
+        if len(polygons) == 1 and polygons[0].isClosed():
+            painter.drawPolygon(polygons[0], self.path().fillRule())
+        else:
+            painter.drawPath(flat)
         if self.isSelected():
             outline_pen = QPen(QColor(30, 120, 255), 1, Qt.PenStyle.DashLine)
             outline_pen.setCosmetic(True)  # толщина рамки не зависит от масштаба фигуры
@@ -4,6 +4,9 @@ from PyQt6.QtGui import QPen, QColor, QBrush
 from .base_tool import Tool
 from .pattern_item import PatternPieceItem
 
+# Ключ item.setData() с подписью размера градированной детали ("Sleeve M")
+_SIZE_KEY = 4
+
 class PatternTool(Tool):
     """Инструмент для размещения и редактирования шаблонов выкроек"""
     def __init__(self):
@@ -52,14 +55,17 @@ class PatternTool(Tool):
         if not self.current_pattern:
             return
             
-        # Генерируем путь шаблона
-        path = self.current_pattern.generate_path(**self.current_params)
+        # Путь шаблона — повторное размещение с теми же параметрами берёт
+        # готовую геометрию из кэша
+        path = self.current_pattern.cached_path(**self.current_params)
         
         pen = QPen(QColor(0, 0, 0), 2)
         pen.setCosmetic(True)  # толщина контура не масштабируется вместе с деталью при ресайзе
         brush = QBrush(QColor(200, 220, 255, 100))
 
-        path_item = PatternPieceItem(path)
+        # Деталь помнит шаблон и параметры — их можно менять потом
+        path_item = PatternPieceItem(path, template=self.current_pattern,
+                                     params=self.current_params)
         path_item.setPen(pen)
         path_item.setBrush(brush)
         path_item.setPos(position)
@@ -79,6 +85,39 @@ class PatternTool(Tool):
         
         self.placed_patterns.append(pattern_data)
         
+    def place_nest(self, nest, position, canvas):
+        """Размещает градированный комплект (grading.GradedNest): детали всех
+        размеров совмещены в одной точке, каждая своим цветом. Весь комплект
+        добавляется одной командой — и отменяется одним шагом."""
+        items = []
+        for i, size in enumerate(nest.sizes):
+            color = QColor.fromHsv(int(300 * i / max(1, len(nest.sizes) - 1)), 200, 200)
+            pen = QPen(color, 3 if size == nest.table.base else 1)
+            pen.setCosmetic(True)
+
+            path_item = PatternPieceItem(nest.path(size), template=nest.template,
+                                         params=nest.size_params(size))
+            path_item.setPen(pen)
+            path_item.setBrush(QBrush(Qt.BrushStyle.NoBrush))
+            path_item.setPos(position)
+            path_item.setData(_SIZE_KEY, f"{nest.template.name} {size}")
+            path_item.setToolTip(f"{nest.template.name} {size}")
+            items.append(path_item)
+
+        from ..core.commands import AddItemsCommand
+        canvas.undo_stack.push(
+            AddItemsCommand(canvas.scene, items, f"Grade {nest.template.name}")
+        )
+
+        for size, path_item in zip(nest.sizes, items):
+            self.placed_patterns.append({
+                'template': nest.template,
+                'params': nest.size_params(size),
+                'position': position,
+                'path_item': path_item
+            })
+        return items
+
     def move_pattern(self, pattern_data, new_position, canvas):
         """Перемещает шаблон на новую позицию"""
         pattern_data['position'] = new_position
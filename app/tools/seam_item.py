@@ -0,0 +1,61 @@
+# app/tools/seam_item.py
+from PyQt6.QtGui import QPainterPath, QTransform
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsPathItem
+from ..core.offset import OffsetCache
+from ..core.seams import LINK_KEY, seam_contour
+
+
+class SeamAllowanceItem(QGraphicsPathItem):
+    """Линия припуска, привязанная к своей детали.
+
+    Припуск — дочерний объект детали в её локальных координатах, поэтому
+    перемещение, ресайз и отражение детали он повторяет сам, без пересчёта.
+    Когда меняется путь детали (выгнули ребро, перестроили по параметрам),
+    деталь вызывает follow(), и контур собирается заново через OffsetCache:
+    сдвигаются только изменившиеся рёбра.
+
+    Привязка (seams.LINK_KEY) та же, что у прочих оверлеев, — по ней
+    припуск находит свою деталь после загрузки проекта (attach()).
+    """
+
+    def __init__(self, path=None, link=None, source=None, offset=None, source_path=None):
+        """path — готовый контур по пути детали source_path, offset — кэш,
+        с которым он посчитан (seams.compute_seam_paths)."""
+        super().__init__(path if path is not None else QPainterPath())
+        self._offset = offset or OffsetCache()
+        # Путь детали, по которому построен контур
+        self._source_path = source_path
+        # Деталь помнится и отдельно от parentItem(): scene.removeItem()
+        # отвязывает дочерний объект, и при возврате (undo) его нужно
+        # привязать снова — см. commands
+        self.source = source
+        # Двигается только вместе с деталью
+        self.setFlags(
+            QGraphicsItem.GraphicsItemFlag.ItemIsSelectable |
+            QGraphicsItem.GraphicsItemFlag.ItemStacksBehindParent
+        )
+        if link is not None:
+            self.setData(LINK_KEY, link)
+
+    @property
+    def link(self):
+        return self.data(LINK_KEY)
+
+    def attach(self, source):
+        """Делает припуск дочерним объектом source в его координатах."""
+        self.source = source
+        self.setParentItem(source)
+        self.setPos(0, 0)
+        self.setTransform(QTransform())
+
+    def follow(self):
+        """Перестраивает контур по текущему пути детали, если тот изменился."""
+        source = self.parentItem()
+        link = self.link
+        if source is None or not isinstance(link, dict) or not hasattr(source, 'path'):
+            return
+        path = source.path()
+        if path == self._source_path:
+            return
+        self._source_path = QPainterPath(path)
+        self.setPath(seam_contour(path, link, self._offset))
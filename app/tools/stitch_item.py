@@ -0,0 +1,107 @@
+# app/tools/stitch_item.py
+import numpy as np
+from PyQt6.QtCore import Qt, QLineF, QRectF
+from PyQt6.QtGui import QPen, QColor, QPainterPath, QPainterPathStroker
+from PyQt6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+from ..core.seams import LINK_KEY, stitch_segments
+from .graphics_items import SnappablePathItem
+
+# Размер отметки на экране (px), ниже которого стежки сливаются в полосу —
+# тогда рисуется просто линия шва пером отметки
+DETAIL_MIN_PX = 3
+
+
+class StitchMarkItem(SnappablePathItem):
+    """Отметка строчки (зигзаг, оверлок) вдоль линии шва.
+
+    path() — сама линия шва, вид и размер стежков берутся из привязки
+    (seams.LINK_KEY: "kind", "size"). Стежки не хранятся путём: вдоль швов
+    раскладки это миллионы отрезков, и Qt перебирал бы их на каждой
+    перерисовке. paint() строит только стежки в перерисовываемой области, а
+    при мелком масштабе рисует одну линию шва. Полный контур со всеми
+    стежками нужен только экспорту — его строит seams.stitch_path().
+    """
+
+    def __init__(self, path=None, link=None):
+        super().__init__(path if path is not None else QPainterPath())
+        self.setFlags(self.flags())
+        if link is not None:
+            self.setData(LINK_KEY, link)
+        # ((kind, size), массивы stitch_segments()) — по текущему пути
+        self._segments = None
+        self._rect = None
+        self._shape = None
+
+    def setFlags(self, flags):
+        # option.exposedRect в paint() заполняется только с этим флагом
+        super().setFlags(flags | QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    @property
+    def link(self):
+        return self.data(LINK_KEY)
+
+    def _style(self):
+        link = self.link
+        if not isinstance(link, dict):
+            return "zigzag", 0.0
+        return link["kind"], float(link["size"])
+
+    def setPath(self, path):
+        # Сброс после super(): prepareGeometryChange() ещё берёт прежний
+        # boundingRect()
+        super().setPath(path)
+        self._segments = self._rect = self._shape = None
+
+    def setPen(self, pen):
+        super().setPen(pen)
+        self._rect = self._shape = None
+
+    def stitch_segments(self):
+        """Все стежки по текущему пути: массивы x0, y0, x1, y1."""
+        key = self._style()
+        if self._segments is None or self._segments[0] != key:
+            self._segments = (key, stitch_segments(key[0], self.path(), key[1]))
+        return self._segments[1]
+
+    def visible_stitches(self, rect):
+        """Стежки, задевающие rect (в локальных координатах), — QLineF."""
+        pad = self.pen().widthF()
+        rect = rect.adjusted(-pad, -pad, pad, pad)
+        x0, y0, x1, y1 = self.stitch_segments()
+        visible = ((np.minimum(x0, x1) <= rect.right()) & (np.maximum(x0, x1) >= rect.left()) &
+                   (np.minimum(y0, y1) <= rect.bottom()) & (np.maximum(y0, y1) >= rect.top()))
+        return [QLineF(*line) for line in zip(x0[visible].tolist(), y0[visible].tolist(),
+                                               x1[visible].tolist(), y1[visible].tolist())]
+
+    def boundingRect(self):
+        # Стежки отходят от линии шва не дальше размера отметки
+        if self._rect is None:
+            margin = self._style()[1] + self.pen().widthF()
+            self._rect = self.path().controlPointRect().adjusted(-margin, -margin,
+                                                                 margin, margin)
+        return self._rect
+
+    def shape(self):
+        if self._shape is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(2 * self._style()[1] + self.pen().widthF())
+            self._shape = stroker.createStroke(self.path())
+        return self._shape
+
+    def paint(self, painter, option, widget=None):
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        painter.setPen(self.pen())
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        if self._style()[1] * scale < DETAIL_MIN_PX:
+            painter.drawPath(self.path())
+        else:
+            # exposedRect у QGraphicsScene.render() — весь объект, поэтому
+            # ещё и пересечение с самим устройством рисования
+            device, _ = painter.worldTransform().inverted()
+            rect = option.exposedRect & device.mapRect(QRectF(painter.viewport()))
+            painter.drawLines(self.visible_stitches(rect))
+        if self.isSelected():
+            outline_pen = QPen(QColor(30, 120, 255), 1, Qt.PenStyle.DashLine)
+            outline_pen.setCosmetic(True)
+            painter.setPen(outline_pen)
+            painter.drawRect(self.boundingRect())
@@ -1,7 +1,12 @@
 import math
 from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QFrame, QGraphicsTextItem
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QUndoStack
-from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSignal
+from PyQt6.QtCore import Qt, QRectF, QPointF, QLineF, pyqtSignal
+from ..core.serialization import PlaceholderItem, replace_placeholder
+
+# Главная линия сетки — через столько мелких клеток
+GRID_MAJOR_EVERY = 5
+
 
 class Canvas(QGraphicsView):
     mouse_moved = pyqtSignal(QPointF)
@@ -18,6 +23,11 @@ class Canvas(QGraphicsView):
         self.setScene(self.scene)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.setFrameShape(QFrame.Shape.NoFrame)
+        # Фон с сеткой кэшируется в pixmap окна: при прокрутке рисуются только
+        # открывшиеся полосы, перерисовка объектов фон не трогает. Кэш
+        # сбрасывается сам при смене масштаба, а при смене темы, сетки или
+        # размера холста — в _background_changed()
+        self.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
 
         # Зум колёсиком мыши всегда центрируется под курсором
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
@@ -39,6 +49,10 @@ class Canvas(QGraphicsView):
 
         self.undo_stack = QUndoStack(self)
 
+        # Заглушки объектов, геометрия которых ещё не декодирована (ленивое
+        # открытие больших проектов) — см. add_placeholders()
+        self._placeholders = set()
+
         # Установим начальную тему
         self.set_theme(self.theme)
 
@@ -75,21 +89,25 @@ class Canvas(QGraphicsView):
             self.pen_color = QColor("white")
         
         # Обновляем отображение
-        self.viewport().update()
+        self._background_changed()
         
     def set_grid_visibility(self, visible):
         """Включает или выключает отображение сетки"""
         self.show_grid = visible
-        self.viewport().update()
+        self._background_changed()
         
     def set_grid_size(self, size):
         """Устанавливает размер клетки сетки"""
         self.grid_size = size
-        self.viewport().update()
+        self._background_changed()
 
     def set_scene_size(self, width, height):
         """Изменяет размер рабочей плоскости (холста)."""
         self.scene.setSceneRect(0, 0, width, height)
+        self._background_changed()
+
+    def _background_changed(self):
+        self.resetCachedContent()
         self.viewport().update()
         
     def _effective_grid_step(self):
@@ -116,6 +134,34 @@ class Canvas(QGraphicsView):
 
         return step
 
+    def _grid_lines(self, step, rect):
+        """Линии сетки с шагом step на участке rect (в пределах сцены):
+        (мелкие, главные) — списки QLineF, каждый рисуется одним drawLines().
+
+        Концы линий выровнены по главным клеткам: участки
+        одной линии, дорисованные при прокрутке, начинаются в одной точке, и
+        точки пунктира на стыках не сбиваются.
+        """
+        bounds = self.sceneRect()
+        rect = bounds.intersected(rect)
+        if rect.right() <= rect.left() or rect.bottom() <= rect.top():
+            return [], []
+        major_step = step * GRID_MAJOR_EVERY
+        top = max(bounds.top(), math.floor(rect.top() / major_step) * major_step)
+        bottom = min(bounds.bottom(), math.ceil(rect.bottom() / major_step) * major_step)
+        left = max(bounds.left(), math.floor(rect.left() / major_step) * major_step)
+        right = min(bounds.right(), math.ceil(rect.right() / major_step) * major_step)
+
+        minor, major = [], []
+        for i in range(math.ceil(rect.left() / step), math.floor(rect.right() / step) + 1):
+            x = i * step
+            # Под главной линией мелкую не рисуем — её всё равно не видно
+            (major if i % GRID_MAJOR_EVERY == 0 else minor).append(QLineF(x, top, x, bottom))
+        for i in range(math.ceil(rect.top() / step), math.floor(rect.bottom() / step) + 1):
+            y = i * step
+            (major if i % GRID_MAJOR_EVERY == 0 else minor).append(QLineF(left, y, right, y))
+        return minor, major
+
     def drawBackground(self, painter, rect):
         """Переопределяем метод отрисовки фона для добавления сетки"""
         # Сначала рисуем стандартный фон
@@ -127,45 +173,63 @@ class Canvas(QGraphicsView):
             if step <= 0:
                 return
 
-            # Пересекаем видимую область со сценой, чтобы не рисовать лишнее
-            scene_rect = self.sceneRect().intersected(rect)
-            left = scene_rect.left()
-            right = scene_rect.right()
-            top = scene_rect.top()
-            bottom = scene_rect.bottom()
-            if right <= left or bottom <= top:
-                return
+            minor, major = self._grid_lines(step, rect)
 
             # Мелкие (второстепенные) линии — ширина 0 = "косметическое" перо,
             # всегда ровно 1 пиксель на экране независимо от масштаба
-            pen_minor = QPen(self.grid_color, 0, Qt.PenStyle.DotLine)
-            painter.setPen(pen_minor)
-
-            x = math.floor(left / step) * step
-            while x <= right:
-                painter.drawLine(QPointF(x, top), QPointF(x, bottom))
-                x += step
-
-            y = math.floor(top / step) * step
-            while y <= bottom:
-                painter.drawLine(QPointF(left, y), QPointF(right, y))
-                y += step
-
-            # Более заметные (главные) линии каждые 5 мелких клеток
-            major_step = step * 5
-            pen_major = QPen(self.grid_color, 0, Qt.PenStyle.SolidLine)
-            painter.setPen(pen_major)
-
-            x = math.floor(left / major_step) * major_step
-            while x <= right:
-                painter.drawLine(QPointF(x, top), QPointF(x, bottom))
-                x += major_step
-
-            y = math.floor(top / major_step) * major_step
-            while y <= bottom:
-                painter.drawLine(QPointF(left, y), QPointF(right, y))
-                y += major_step
-    
+            painter.setPen(QPen(self.grid_color, 0, Qt.PenStyle.DotLine))
+            painter.drawLines(minor)
+
+            # Более заметные (главные) линии каждые GRID_MAJOR_EVERY мелких клеток
+            painter.setPen(QPen(self.grid_color, 0, Qt.PenStyle.SolidLine))
+            painter.drawLines(major)
+
+    def add_placeholders(self, items):
+        """Запоминает заглушки, добавленные на сцену при ленивой загрузке:
+        каждая будет заменена настоящим объектом, как только попадёт в
+        видимую область или под курсор."""
+        self._placeholders.update(i for i in items if isinstance(i, PlaceholderItem))
+        self.viewport().update()
+
+    def materialize_rect(self, rect):
+        """Декодирует все заглушки, пересекающие rect (координаты сцены)."""
+        if not self._placeholders:
+            return
+        for item in self.scene.items(rect):
+            if isinstance(item, PlaceholderItem):
+                replace_placeholder(item)
+
+    def forget_placeholder(self, item):
+        """Убирает заменённую заглушку из списка — replace_placeholder()
+        вызывает это сам, где бы заглушку ни заменили (например,
+        parametric.update_dependents())."""
+        self._placeholders.discard(item)
+
+    def materialize_all(self):
+        """Декодирует все оставшиеся заглушки. Вызывается перед командами
+        над всей сценой (Remove All в панелях припусков, строчек и номеров):
+        они удаляют настоящие объекты, а не заглушки. Сохранению и экспорту
+        это не нужно — заглушка отдаёт свою запись как есть."""
+        for item in list(self._placeholders):
+            if item.scene() is self.scene:
+                replace_placeholder(item)
+        self._placeholders.clear()
+
+    def clear_scene(self):
+        """Очищает сцену вместе с историей undo (старые команды ссылаются на
+        объекты, которые scene.clear() удалит) и списком заглушек."""
+        self.undo_stack.clear()
+        self._placeholders.clear()
+        self.scene.clear()
+
+    def paintEvent(self, event):
+        # До отрисовки подменяем заглушки, попавшие в видимую область, —
+        # так на экран попадают уже настоящие объекты. Пока заглушек нет,
+        # это одна проверка пустого множества.
+        if self._placeholders:
+            self.materialize_rect(self.mapToScene(self.viewport().rect()).boundingRect())
+        super().paintEvent(event)
+
     def set_tool(self, tool):
         self.current_tool = tool
         if getattr(tool, 'use_scene_events', False):
@@ -177,6 +241,9 @@ class Canvas(QGraphicsView):
         return getattr(self.current_tool, 'use_scene_events', False)
 
     def mousePressEvent(self, event):
+        if self._placeholders:
+            pos = self.mapToScene(event.pos())
+            self.materialize_rect(QRectF(pos.x() - 1, pos.y() - 1, 2, 2))
         if self.current_tool and not self._use_scene():
             self.current_tool.mouse_press(event, self)
         else:
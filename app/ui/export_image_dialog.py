@@ -0,0 +1,62 @@
+# app/ui/export_image_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QComboBox, QSpinBox,
+                             QLabel, QDialogButtonBox)
+
+from ..core import raster_export
+
+
+class ExportImageDialog(QDialog):
+    """Параметры растрового экспорта: формат, разрешение и лимит памяти."""
+
+    def __init__(self, width_px, height_px, parent=None):
+        super().__init__(parent)
+        self.width_px = width_px
+        self.height_px = height_px
+        self.setWindowTitle("Export Image")
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(raster_export.FORMATS)
+
+        self.dpi_spin = QSpinBox()
+        self.dpi_spin.setRange(10, 2400)
+        self.dpi_spin.setValue(300)
+        self.dpi_spin.setSuffix(" dpi")
+        self.dpi_spin.valueChanged.connect(self._update_size)
+
+        self.memory_spin = QSpinBox()
+        self.memory_spin.setRange(16, 16384)
+        self.memory_spin.setValue(raster_export.DEFAULT_MEMORY_LIMIT // (1024 * 1024))
+        self.memory_spin.setSuffix(" MB")
+
+        self.size_label = QLabel()
+
+        form.addRow("Format:", self.format_combo)
+        form.addRow("Resolution:", self.dpi_spin)
+        form.addRow("Memory limit:", self.memory_spin)
+        form.addRow("Image size:", self.size_label)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self._update_size()
+
+    def _update_size(self):
+        scale = self.dpi_spin.value() / raster_export.SCENE_DPI
+        self.size_label.setText(
+            f"{round(self.width_px * scale)} × {round(self.height_px * scale)} px"
+        )
+
+    def get_options(self):
+        """(format, dpi, memory_limit в байтах)"""
+        return (
+            self.format_combo.currentText(),
+            self.dpi_spin.value(),
+            self.memory_spin.value() * 1024 * 1024,
+        )
@@ -0,0 +1,77 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QComboBox, QDoubleSpinBox,
+                             QGroupBox, QLabel, QDialogButtonBox, QMessageBox)
+
+from ..core import grading
+
+# Прирост по умолчанию — доля базового значения параметра на шаг размера
+_DEFAULT_GRADE = 0.04
+
+
+class GradingDialog(QDialog):
+    """Градация шаблона: ряд размеров, базовый размер и прирост каждого
+    параметра на шаг размера."""
+
+    def __init__(self, template, base_params, parent=None):
+        super().__init__(parent)
+        self.template = template
+        self.base_params = dict(base_params)
+        self.setWindowTitle(f"Grade {template.name}")
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.first_combo = QComboBox()
+        self.first_combo.addItems(grading.SIZES)
+        self.last_combo = QComboBox()
+        self.last_combo.addItems(grading.SIZES)
+        self.last_combo.setCurrentIndex(len(grading.SIZES) - 1)
+        self.base_combo = QComboBox()
+        self.base_combo.addItems(grading.SIZES)
+        self.base_combo.setCurrentText(grading.BASE_SIZE)
+
+        form.addRow("From size:", self.first_combo)
+        form.addRow("To size:", self.last_combo)
+        form.addRow("Base size:", self.base_combo)
+        layout.addLayout(form)
+
+        rules_group = QGroupBox("Grade per size step")
+        rules_form = QFormLayout(rules_group)
+        self.increment_spins = {}
+        for param in template.get_parameters():
+            base = self.base_params.get(param["name"], param["default"])
+            spin = QDoubleSpinBox()
+            spin.setRange(-50, 50)
+            spin.setDecimals(1)
+            spin.setSingleStep(0.5)
+            spin.setSuffix(" cm")
+            spin.setValue(round(base * _DEFAULT_GRADE, 1))
+            rules_form.addRow(f"{param['label']} [{base}]:", spin)
+            self.increment_spins[param["name"]] = spin
+        layout.addWidget(rules_group)
+
+        layout.addWidget(QLabel("All sizes are placed nested at one point, base size in bold."))
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.nest = None
+
+    def table(self):
+        table = grading.SizeTable(grading.SIZES, self.base_combo.currentText())
+        return table.subset(self.first_combo.currentText(), self.last_combo.currentText())
+
+    def rules(self):
+        return {name: grading.GradeRule(spin.value())
+                for name, spin in self.increment_spins.items() if spin.value()}
+
+    def accept(self):
+        try:
+            self.nest = grading.grade(self.template, self.rules(), self.table(),
+                                      self.base_params)
+        except ValueError as e:
+            QMessageBox.warning(self, "Grade", str(e))
+            return
+        super().accept()
@@ -1,17 +1,23 @@
 from PyQt6.QtWidgets import (QMainWindow, QToolBar, QDockWidget, QWidget,
                              QVBoxLayout, QHBoxLayout, QGridLayout,
-                             QFileDialog, QMessageBox, QLabel, QComboBox)
+                             QFileDialog, QMessageBox, QLabel, QComboBox,
+                             QProgressBar, QPushButton)
 from PyQt6.QtGui import QAction, QTransform
 from PyQt6.QtCore import Qt
 from .canvas import Canvas
 from .rulers import HorizontalRuler, VerticalRuler, RULER_SIZE
 from .canvas_size_dialog import CanvasSizeDialog
+from .export_image_dialog import ExportImageDialog
 from .panels.pattern_panel import PatternPanel
 from .panels.seam_panel import SeamAllowancePanel
 from .panels.seam_style_panel import SeamStylePanel
 from .panels.annotations_panel import AnnotationsPanel
 from .panels.pattern_size_panel import PatternSizePanel
-from ..core.project_manager import ProjectManager
+from .panels.metrics_panel import MetricsPanel
+from .panels.seam_match_panel import SeamMatchPanel
+from ..core.project_manager import (ProjectManager, SaveTask, ExportImageTask,
+                                    ExportVectorTask)
+from ..core import journal
 from ..core.measurements import MeasurementSystem
 from ..tools.tool_manager import ToolManager
 
@@ -60,6 +66,11 @@ class MainWindow(QMainWindow):
         self.tool_manager = ToolManager(self.canvas)
         self.project_manager = ProjectManager()
         self.current_file_path = None
+        self._save_task = None
+        self._save_cut = None
+        self._export_task = None
+        # Журнал автосохранения — пишет каждую команду undo_stack рядом с .cld
+        self.journal = journal.ProjectJournal(self.canvas.scene, self.canvas.undo_stack)
 
         # UI
         self.create_menu()
@@ -99,6 +110,16 @@ class MainWindow(QMainWindow):
 
         file_menu.addSeparator()
 
+        export_image_action = QAction("Export Image...", self)
+        export_image_action.triggered.connect(self.export_image_dialog)
+        file_menu.addAction(export_image_action)
+
+        export_vector_action = QAction("Export SVG/PDF...", self)
+        export_vector_action.triggered.connect(self.export_vector_dialog)
+        file_menu.addAction(export_vector_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction("Exit", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
@@ -212,6 +233,7 @@ class MainWindow(QMainWindow):
         self.pattern_dock = QDockWidget("Pattern Templates", self)
         self.pattern_panel = PatternPanel()
         self.pattern_panel.pattern_selected.connect(self.on_pattern_selected)
+        self.pattern_panel.nest_requested.connect(self.on_nest_requested)
         self.pattern_dock.setWidget(self.pattern_panel)
         self.pattern_dock.setVisible(False)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.pattern_dock)
@@ -221,6 +243,18 @@ class MainWindow(QMainWindow):
         self.pattern_size_dock.setWidget(PatternSizePanel(self.canvas))
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.pattern_size_dock)
 
+        # Dok — площадь, периметр и длины рёбер выбранных деталей
+        self.metrics_dock = QDockWidget("Piece Metrics", self)
+        self.metrics_panel = MetricsPanel(self.canvas, self.measurements)
+        self.metrics_dock.setWidget(self.metrics_panel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.metrics_dock)
+
+        # Dok — сверка длин сшиваемых рёбер
+        self.seam_match_dock = QDockWidget("Seam Match", self)
+        self.seam_match_panel = SeamMatchPanel(self.canvas, self.measurements)
+        self.seam_match_dock.setWidget(self.seam_match_panel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.seam_match_dock)
+
         # Dok — припуски на швы
         self.seam_dock = QDockWidget("Seam Allowance", self)
         self.seam_dock.setWidget(SeamAllowancePanel(self.canvas))
@@ -262,6 +296,24 @@ class MainWindow(QMainWindow):
         self.zoom_label.setMinimumWidth(50)
         sb.addPermanentWidget(self.zoom_label)
 
+        # Прогресс фонового сохранения (виден только во время записи)
+        self.save_progress = QProgressBar()
+        self.save_progress.setRange(0, 100)
+        self.save_progress.setFixedWidth(120)
+        self.save_progress.setVisible(False)
+        sb.addPermanentWidget(self.save_progress)
+
+        # Прогресс и отмена экспорта
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_progress.setFixedWidth(120)
+        self.export_progress.setVisible(False)
+        sb.addPermanentWidget(self.export_progress)
+        self.export_cancel_button = QPushButton("Cancel")
+        self.export_cancel_button.setVisible(False)
+        self.export_cancel_button.clicked.connect(self._cancel_export)
+        sb.addPermanentWidget(self.export_cancel_button)
+
         sb.showMessage("Ready")
 
     def _on_zoom_changed(self, zoom_level):
@@ -278,10 +330,13 @@ class MainWindow(QMainWindow):
         self.measurements.unit = unit
         self.h_ruler.update()
         self.v_ruler.update()
+        self.metrics_panel.refresh()
+        self.seam_match_panel.refresh()
 
     def _flip_items(self, horizontal: bool):
         from ..core.commands import TransformCommand
-        items = self.canvas.scene.selectedItems()
+        # Привязанный припуск отражается вместе со своей деталью
+        items = [i for i in self.canvas.scene.selectedItems() if i.parentItem() is None]
         if not items:
             self.statusBar().showMessage("Select items first (use Select tool)")
             return
@@ -325,7 +380,9 @@ class MainWindow(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            self.canvas.scene.clear()
+            self._wait_for_save()
+            self.journal.close()
+            self.canvas.clear_scene()
             self.current_file_path = None
             self.setWindowTitle("Clothing Designer")
             self.statusBar().showMessage("New project created")
@@ -348,30 +405,185 @@ class MainWindow(QMainWindow):
                 self._do_save(file_path)
 
     def _do_save(self, file_path):
-        self.project_manager.current_project = {
-            "width": int(self.canvas.sceneRect().width()),
-            "height": int(self.canvas.sceneRect().height()),
-            "background": "#FFFFFF",
-            "layers": [],
-            "objects": []
-        }
-        if self.project_manager.save_project(file_path):
+        if self._save_task is not None:
+            if self._save_task.is_running():
+                self.statusBar().showMessage("Save already in progress")
+                return
+            self._wait_for_save()
+
+        # В GUI-потоке только снимаем снимок сцены (записи объектов + массивы
+        # геометрии) — кодирование, сжатие и запись идут в SaveTask, пока
+        # пользователь продолжает рисовать
+        manager = self._capture_snapshot()
+        if self.journal.project_path != file_path:
+            self.journal.open(file_path)
+        seq, cut = self.journal.mark_checkpoint()
+        manager.current_project["journal_seq"] = seq
+
+        task = SaveTask(manager, file_path, self)
+        task.progress.connect(self.save_progress.setValue)
+        task.finished.connect(lambda ok, error: self._on_save_finished(task))
+        self._save_task = task
+        self._save_cut = cut
+        self.save_progress.setValue(0)
+        self.save_progress.setVisible(True)
+        self.statusBar().showMessage(f"Saving: {file_path}…")
+        task.start()
+
+    def _on_save_finished(self, task):
+        if self._save_task is not task:
+            return  # уже обработано в _wait_for_save()
+        task.wait()
+        cut = self._save_cut
+        self._save_task = None
+        self._save_cut = None
+        self.save_progress.setVisible(False)
+        file_path = task.file_path
+        if task.ok:
+            # Полный снимок на диске — в журнале остаются только правки,
+            # сделанные, пока он записывался
+            self.journal.finish_checkpoint(cut)
             self.current_file_path = file_path
             self.setWindowTitle(f"Clothing Designer — {file_path.split('/')[-1]}")
             self.statusBar().showMessage(f"Saved: {file_path}")
         else:
-            QMessageBox.warning(self, "Save Error", "Could not save the project.")
+            self.journal.abort_checkpoint()
+            QMessageBox.warning(self, "Save Error", f"Could not save the project.\n{task.error}")
+
+    def _wait_for_save(self):
+        """Дожидается фонового сохранения и сразу обрабатывает его итог —
+        сигнал finished из рабочего потока придёт позже и будет пропущен."""
+        if self._save_task is not None:
+            self._save_task.wait()
+            self._on_save_finished(self._save_task)
+
+    def export_image_dialog(self):
+        if self._export_task is not None:
+            self.statusBar().showMessage("Export already in progress")
+            return
+        scene_rect = self.canvas.sceneRect()
+        dlg = ExportImageDialog(scene_rect.width(), scene_rect.height(), self)
+        if dlg.exec() != ExportImageDialog.DialogCode.Accepted:
+            return
+        format, dpi, memory_limit = dlg.get_options()
+        suffix = "tif" if format == "TIFF" else "png"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Image", "", f"{format} Images (*.{suffix})"
+        )
+        if not file_path:
+            return
+        self._start_export(ExportImageTask(
+            self._capture_snapshot(), file_path, format, dpi, memory_limit, self
+        ))
+
+    def export_vector_dialog(self):
+        if self._export_task is not None:
+            self.statusBar().showMessage("Export already in progress")
+            return
+        file_path, selected = QFileDialog.getSaveFileName(
+            self, "Export SVG/PDF", "", "SVG Files (*.svg);;PDF Files (*.pdf)"
+        )
+        if not file_path:
+            return
+        format = "PDF" if selected.startswith("PDF") or file_path.lower().endswith(".pdf") else "SVG"
+        # Размеры SVG — в текущих единицах интерфейса (см/мм/px)
+        self._start_export(ExportVectorTask(
+            self._capture_snapshot(), file_path, format, self.measurements.unit, self
+        ))
+
+    def _capture_snapshot(self):
+        """Снимок сцены для фоновой работы (сохранение, экспорт)."""
+        manager = ProjectManager()
+        manager.new_project(
+            int(self.canvas.sceneRect().width()),
+            int(self.canvas.sceneRect().height()),
+        )
+        manager.capture_scene(self.canvas.scene)
+        return manager
+
+    def _start_export(self, task):
+        task.progress.connect(self.export_progress.setValue)
+        task.finished.connect(lambda ok, error: self._on_export_finished(task))
+        self._export_task = task
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.export_cancel_button.setVisible(True)
+        self.statusBar().showMessage(f"Exporting: {task.file_path}…")
+        task.start()
+
+    def _cancel_export(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+
+    def _on_export_finished(self, task):
+        if self._export_task is not task:
+            return
+        task.wait()
+        self._export_task = None
+        self.export_progress.setVisible(False)
+        self.export_cancel_button.setVisible(False)
+        if task.ok:
+            self.statusBar().showMessage(f"Exported: {task.file_path}")
+        elif task.is_cancelled():
+            self.statusBar().showMessage("Export cancelled")
+        else:
+            QMessageBox.warning(self, "Export Error", f"Could not export.\n{task.error}")
+
+    def _stop_export(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+            self._export_task.wait()
+            self._on_export_finished(self._export_task)
 
     def load_project(self, file_path):
-        data = self.project_manager.load_project(file_path)
+        self._wait_for_save()
+        # Журнал текущего проекта: его изменения отбрасываются вместе со сценой
+        self.journal.close()
+        recover = False
+        if journal.has_recovery(file_path):
+            reply = QMessageBox.question(
+                self, "Recover Project",
+                "The previous session ended unexpectedly. "
+                "Recover unsaved changes?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            recover = reply == QMessageBox.StandardButton.Yes
+
+        base = journal.recovery_base(file_path) if recover else file_path
+        data = self.project_manager.load_project(base)
         if data:
-            self.canvas.scene.clear()
+            self.canvas.clear_scene()
+            if recover:
+                # Журнал ссылается на объекты по id и меняет их геометрию —
+                # при восстановлении декодируем всё сразу
+                self.project_manager.restore_scene(self.canvas.scene)
+                journal.replay_journal(file_path, self.canvas.scene, data)
+            else:
+                self.canvas.add_placeholders(
+                    self.project_manager.restore_scene(self.canvas.scene, lazy=True)
+                )
+            if "width" in data and "height" in data:
+                self.canvas.set_scene_size(data["width"], data["height"])
+            self.journal.open(file_path, data.get("journal_seq", 0))
+            if recover:
+                # Восстановленное состояние сразу становится новым снимком —
+                # иначе повторное падение до сохранения его бы потеряло
+                self.journal.compact(wait=True)
             self.current_file_path = file_path
             self.setWindowTitle(f"Clothing Designer — {file_path.split('/')[-1]}")
-            self.statusBar().showMessage(f"Opened: {file_path}")
+            self.statusBar().showMessage(
+                f"Recovered: {file_path}" if recover else f"Opened: {file_path}"
+            )
         else:
             QMessageBox.warning(self, "Open Error", f"Could not open: {file_path}")
 
+    def closeEvent(self, event):
+        # Штатный выход — журнал для восстановления больше не нужен
+        self._stop_export()
+        self._wait_for_save()
+        self.journal.close()
+        super().closeEvent(event)
+
     def on_tool_changed(self, tool):
         # Показываем/скрываем панели свойств
         tool_name = tool.__class__.__name__
@@ -392,4 +604,13 @@ class MainWindow(QMainWindow):
             pattern_tool.set_pattern(template, params)
             self.statusBar().showMessage(f"Pattern selected: {template.name}. Click on canvas to place it.")
             # Автоматически переключаемся на инструмент Pattern
-            self.tool_manager.set_tool(pattern_tool)
\ No newline at end of file
+            self.tool_manager.set_tool(pattern_tool)
+
+    def on_nest_requested(self, nest):
+        """Градированный комплект — в центр видимой области холста"""
+        pattern_tool = self.tool_manager.get_pattern_tool()
+        if pattern_tool:
+            center = self.canvas.mapToScene(self.canvas.viewport().rect().center())
+            pattern_tool.place_nest(nest, center, self.canvas)
+            self.statusBar().showMessage(
+                f"Graded {nest.template.name}: {', '.join(nest.sizes)}")
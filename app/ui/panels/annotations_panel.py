@@ -147,6 +147,7 @@ class AnnotationsPanel(QWidget):
 
     def _remove_numbers(self):
         from ...core.commands import RemoveItemsCommand
+        self.canvas.materialize_all()
         labels = [i for i in self.canvas.scene.items()
                   if i.data(_NUMBER_KEY) == _NUMBER_TAG]
         if labels:
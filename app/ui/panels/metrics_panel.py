@@ -0,0 +1,74 @@
+# app/ui/panels/metrics_panel.py
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QFormLayout, QLabel, QTreeWidget, QTreeWidgetItem
+from PyQt6.QtCore import QTimer
+from ...tools.pattern_item import PatternPieceItem
+
+
+class MetricsPanel(QWidget):
+    """Площадь, периметр и длины рёбер выбранных деталей выкройки.
+
+    Для нескольких деталей — суммы (расход ткани, общая длина швов), для
+    одной — ещё центр масс и длины рёбер по порядку обхода контура. Метрики
+    кэшируются в самих деталях (PatternPieceItem.metrics()), поэтому
+    обновление на сотнях выбранных деталей — это только сложение.
+    """
+
+    def __init__(self, canvas, measurements, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.measurements = measurements
+        self._init_ui()
+        canvas.undo_stack.indexChanged.connect(lambda _: self.refresh())
+        # selectedItems() нельзя звать прямо из selectionChanged — см.
+        # PatternSizePanel
+        canvas.scene.selectionChanged.connect(lambda: QTimer.singleShot(0, self.refresh))
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        title = QLabel("Piece Metrics")
+        title.setStyleSheet("font-weight: bold; font-size: 13px;")
+        layout.addWidget(title)
+
+        form = QFormLayout()
+        self.count_label = QLabel("0")
+        self.area_label = QLabel("—")
+        self.perimeter_label = QLabel("—")
+        self.centroid_label = QLabel("—")
+        form.addRow("Pieces:", self.count_label)
+        form.addRow("Area:", self.area_label)
+        form.addRow("Perimeter:", self.perimeter_label)
+        form.addRow("Centroid:", self.centroid_label)
+        layout.addLayout(form)
+
+        self.edges_tree = QTreeWidget()
+        self.edges_tree.setHeaderLabels(["Edge", "Length"])
+        self.edges_tree.setRootIsDecorated(False)
+        layout.addWidget(self.edges_tree)
+
+    def refresh(self):
+        items = [i for i in self.canvas.scene.selectedItems()
+                 if isinstance(i, PatternPieceItem)]
+        fmt = self.measurements
+        self.count_label.setText(str(len(items)))
+        self.edges_tree.clear()
+        if not items:
+            self.area_label.setText("—")
+            self.perimeter_label.setText("—")
+            self.centroid_label.setText("—")
+            return
+        metrics = [i.metrics() for i in items]
+        self.area_label.setText(fmt.format_area(sum(m.area for m in metrics)))
+        self.perimeter_label.setText(fmt.format(sum(m.perimeter for m in metrics)))
+        if len(items) != 1:
+            self.centroid_label.setText("—")
+            return
+        m = metrics[0]
+        centroid = items[0].pos() + m.centroid
+        self.centroid_label.setText(fmt.format_coord(centroid.x(), centroid.y()))
+        self.edges_tree.addTopLevelItems([
+            QTreeWidgetItem([str(index + 1), fmt.format(length)])
+            for index, length in enumerate(m.edges)
+        ])
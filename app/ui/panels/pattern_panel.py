@@ -4,10 +4,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QPen, QColor
 from ...core.pattern_templates import PatternLibrary
+from .pattern_preview import PatternPreview
 
 class PatternPanel(QWidget):
     """Панель для работы с шаблонами выкроек"""
     pattern_selected = pyqtSignal(object, dict)  # Сигнал при выборе шаблона
+    nest_requested = pyqtSignal(object)  # Градированный комплект (grading.GradedNest)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -40,6 +42,10 @@ class PatternPanel(QWidget):
         
         layout.addWidget(template_label)
         layout.addWidget(self.template_combo)
+
+        # Превью шаблона — перестраивается при движении слайдеров
+        self.preview = PatternPreview()
+        layout.addWidget(self.preview)
         
         # Область прокрутки для параметров
         scroll = QScrollArea()
@@ -58,6 +64,12 @@ class PatternPanel(QWidget):
         self.add_button.clicked.connect(self.on_add_clicked)
         self.add_button.setEnabled(False)
         layout.addWidget(self.add_button)
+
+        # Градация: все размеры шаблона одним комплектом
+        self.grade_button = QPushButton("Grade Sizes...")
+        self.grade_button.clicked.connect(self.on_grade_clicked)
+        self.grade_button.setEnabled(False)
+        layout.addWidget(self.grade_button)
         
         # Кнопки управления размещенными шаблонами
         buttons_layout = QHBoxLayout()
@@ -93,8 +105,10 @@ class PatternPanel(QWidget):
         if self.current_template:
             self.load_parameters()
             self.add_button.setEnabled(True)
+            self.grade_button.setEnabled(True)
         else:
             self.add_button.setEnabled(False)
+            self.grade_button.setEnabled(False)
             
     def load_parameters(self):
         """Загружает параметры текущего шаблона"""
@@ -130,6 +144,7 @@ class PatternPanel(QWidget):
                 def update_value(value):
                     label.setText(str(value))
                     self.current_params[param_name] = value
+                    self.preview.show_template(self.current_template, self.current_params)
                 return update_value
                 
             slider.valueChanged.connect(make_update_func(param["name"], value_label))
@@ -149,12 +164,22 @@ class PatternPanel(QWidget):
             self.params_layout.addWidget(group)
             
         self.params_layout.addStretch()
+        self.preview.show_template(self.current_template, self.current_params)
         
     def on_add_clicked(self):
         """Обработчик нажатия кнопки добавления"""
         if self.current_template:
             self.pattern_selected.emit(self.current_template, self.current_params)
     
+    def on_grade_clicked(self):
+        """Градация текущего шаблона; параметры панели — базовый размер"""
+        if not self.current_template:
+            return
+        from ..grading_dialog import GradingDialog
+        dialog = GradingDialog(self.current_template, self.current_params, self)
+        if dialog.exec():
+            self.nest_requested.emit(dialog.nest)
+
     def on_delete_clicked(self):
         """Обработчик удаления выбранного шаблона"""
         # Получаем pattern_tool из родительского окна
@@ -0,0 +1,119 @@
+# app/ui/panels/pattern_preview.py
+import threading
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QTransform
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+
+from ...core.measurements import MeasurementSystem
+
+PX_PER_CM = MeasurementSystem.PX_PER_CM
+_MARGIN = 12
+
+
+class PreviewWorker(QObject):
+    """Построение превью шаблона в фоновом потоке.
+
+    Запросы кладутся в почтовый ящик на одно место: новый запрос заменяет
+    ещё не взятый в работу, так что при быстром движении слайдера
+    промежуточные значения выбрасываются, а поток всегда строит последнее.
+    Результат приходит сигналом ready в поток, где создан worker.
+    """
+    ready = pyqtSignal(object, object, object)  # шаблон, параметры, QPainterPath
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dropped = 0    # запросов, вытесненных более новыми
+        self._request = None
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self, template, params):
+        with self._condition:
+            if self._request is not None:
+                self.dropped += 1
+            self._request = (template, dict(params))
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._request is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                (template, params), self._request = self._request, None
+            try:
+                path = template.cached_path(**params)
+            except (ValueError, ArithmeticError):
+                continue  # некорректное сочетание параметров — превью не меняется
+            try:
+                self.ready.emit(template, params, path)
+            except RuntimeError:
+                return  # панель уже удалена
+
+
+class PatternPreview(QWidget):
+    """Превью шаблона с текущими параметрами: контур, вписанный в виджет,
+    и габариты в сантиметрах. Геометрию строит PreviewWorker."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self.template = None
+        self.params = {}
+        self.path = None
+        self.worker = PreviewWorker(self)
+        self.worker.ready.connect(self._on_ready)
+
+    def show_template(self, template, params):
+        self.template = template
+        self.params = dict(params)
+        if template is None:
+            self.path = None
+            self.update()
+            return
+        self.worker.request(template, params)
+
+    def _on_ready(self, template, params, path):
+        # Результат по уже устаревшим параметрам не показываем — следом
+        # придёт актуальный
+        if template is not self.template or params != self.params:
+            return
+        self.path = path
+        self.update()  # перерисовка — не чаще обновления экрана
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(250, 250, 250))
+        if self.path is None or self.path.isEmpty():
+            return
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.path.boundingRect()
+        area = self.rect().adjusted(_MARGIN, _MARGIN, -_MARGIN, -_MARGIN - 14)
+        scale = min(area.width() / max(rect.width(), 1e-6),
+                    area.height() / max(rect.height(), 1e-6))
+        t = QTransform()
+        t.translate(area.center().x(), area.center().y())
+        t.scale(scale, scale)
+        t.translate(-rect.center().x(), -rect.center().y())
+        painter.setTransform(t)
+        pen = QPen(QColor(0, 0, 0), 1.5)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(QBrush(QColor(200, 220, 255, 100)))
+        painter.drawPath(self.path)
+
+        painter.resetTransform()
+        painter.setPen(QColor(100, 100, 100))
+        painter.drawText(self.rect().adjusted(0, 0, 0, -4),
+                         Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
+                         f"{rect.width() / PX_PER_CM:.1f} × {rect.height() / PX_PER_CM:.1f} cm")
@@ -1,22 +1,40 @@
 # app/ui/panels/pattern_size_panel.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QDoubleSpinBox, QPushButton)
+from PyQt6 import sip
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QGroupBox,
+                             QLabel, QDoubleSpinBox, QPushButton, QSlider)
 from PyQt6.QtGui import QTransform
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import Qt, QTimer
 from ...core.measurements import MeasurementSystem
 from ...tools.pattern_item import PatternPieceItem
 
 PX_PER_CM = MeasurementSystem.PX_PER_CM
+# Слайдеры параметров — в десятых долях сантиметра
+_SLIDER_SCALE = 10
+# Пауза после последней правки параметра, после которой правка становится
+# шагом отмены (перетаскивание слайдера — один шаг по отпусканию)
+_COMMIT_DELAY_MS = 500
 
 
 class PatternSizePanel(QWidget):
-    """Точный ввод ширины/высоты выбранной детали выкройки в сантиметрах."""
+    """Точный ввод ширины/высоты выбранной детали выкройки в сантиметрах.
+
+    У детали из шаблона здесь же редактируются параметры шаблона: деталь
+    перестраивается по ним (а не масштабируется) во время правки, а в стек
+    отмены попадает одна команда на всю серию правок.
+    """
 
     def __init__(self, canvas, parent=None):
         super().__init__(parent)
         self.canvas = canvas
         self.current_item = None
+        self._param_spins = {}
+        self._committed_params = None
+        self._commit_timer = QTimer(self)
+        self._commit_timer.setSingleShot(True)
+        self._commit_timer.setInterval(_COMMIT_DELAY_MS)
+        self._commit_timer.timeout.connect(self._commit_params)
         self._init_ui()
+        canvas.undo_stack.indexChanged.connect(self._on_undo_index_changed)
         # Calling scene.selectedItems() synchronously from inside a
         # selectionChanged handler crashes PyQt6 (reproducible even with a
         # plain QGraphicsPathItem, no custom code involved) — deferring one
@@ -56,6 +74,12 @@ class PatternSizePanel(QWidget):
         self.apply_button.clicked.connect(self._apply)
         layout.addWidget(self.apply_button)
 
+        # Параметры шаблона — только для деталей из шаблона
+        self.params_group = QGroupBox("Template Parameters")
+        self.params_form = QFormLayout(self.params_group)
+        self.params_group.setVisible(False)
+        layout.addWidget(self.params_group)
+
         hint = QLabel("Tip: select one pattern piece\nwith the Select tool first.")
         hint.setStyleSheet("color: #888; font-size: 10px;")
         hint.setWordWrap(True)
@@ -64,19 +88,119 @@ class PatternSizePanel(QWidget):
         layout.addStretch()
         self.setEnabled(False)
 
+    def _live_item(self):
+        """current_item или None, если деталь удалена вместе со сценой
+        (New/Open: scene.clear() удаляет и объект C++)."""
+        if self.current_item is not None and sip.isdeleted(self.current_item):
+            self.current_item = None
+            self._committed_params = None
+        return self.current_item
+
     def _on_selection_changed(self):
+        self._commit_params()
         items = [i for i in self.canvas.scene.selectedItems()
                  if isinstance(i, PatternPieceItem)]
         if len(items) == 1:
             self.current_item = items[0]
+            self._build_param_editors()
             self._refresh_from_item()
             self.setEnabled(True)
         else:
             self.current_item = None
+            self._build_param_editors()
             self.setEnabled(False)
 
+    def _build_param_editors(self):
+        while self.params_form.rowCount():
+            self.params_form.removeRow(0)
+        self._param_spins = {}
+        item = self.current_item
+        if item is None or not item.is_parametric:
+            self.params_group.setVisible(False)
+            self._committed_params = None
+            return
+        self._committed_params = dict(item.params)
+        for param in item.template.get_parameters():
+            spin = QDoubleSpinBox()
+            spin.setRange(param["min"], param["max"])
+            spin.setDecimals(1)
+            spin.setSingleStep(0.5)
+            spin.setSuffix(" cm")
+            slider = QSlider(Qt.Orientation.Horizontal)
+            slider.setRange(round(param["min"] * _SLIDER_SCALE),
+                            round(param["max"] * _SLIDER_SCALE))
+
+            def on_slider(value, spin=spin):
+                spin.setValue(value / _SLIDER_SCALE)
+
+            def on_spin(value, slider=slider):
+                slider.blockSignals(True)
+                slider.setValue(round(value * _SLIDER_SCALE))
+                slider.blockSignals(False)
+                self._preview_params()
+
+            slider.valueChanged.connect(on_slider)
+            slider.sliderReleased.connect(self._commit_params)
+            spin.valueChanged.connect(on_spin)
+
+            row = QVBoxLayout()
+            row.addWidget(spin)
+            row.addWidget(slider)
+            self.params_form.addRow(param["label"], row)
+            self._param_spins[param["name"]] = (spin, slider)
+        self.params_group.setVisible(True)
+        self._refresh_params()
+
+    def _refresh_params(self):
+        item = self.current_item
+        values = {p["name"]: p["default"] for p in item.template.get_parameters()}
+        values.update(item.params)
+        for name, (spin, slider) in self._param_spins.items():
+            spin.blockSignals(True)
+            slider.blockSignals(True)
+            spin.setValue(values[name])
+            slider.setValue(round(values[name] * _SLIDER_SCALE))
+            spin.blockSignals(False)
+            slider.blockSignals(False)
+
+    def _editor_params(self):
+        return {name: spin.value() for name, (spin, _) in self._param_spins.items()}
+
+    def _preview_params(self):
+        # Живое перестроение: parametric сливает частые правки в одно
+        # перестроение, команда для отмены — по паузе или отпусканию слайдера
+        self.current_item.set_params(self._editor_params())
+        self._commit_timer.start()
+
+    def _commit_params(self):
+        self._commit_timer.stop()
+        item = self._live_item()
+        if (item is None or not item.is_parametric or item.scene() is None
+                or self._committed_params is None):
+            return
+        new_params = self._editor_params()
+        if new_params == self._committed_params:
+            return
+        old_params, self._committed_params = self._committed_params, new_params
+        from ...core.commands import ChangeParamsCommand
+        self.canvas.undo_stack.push(
+            ChangeParamsCommand(item, old_params, new_params, f"Change {item.template.name}")
+        )
+        self._refresh_from_item()
+
+    def _on_undo_index_changed(self, index):
+        # Отмена/повтор меняют параметры в обход редакторов панели
+        item = self._live_item()
+        if item is None or not item.is_parametric or self._commit_timer.isActive():
+            return
+        self._committed_params = dict(item.params)
+        self._refresh_params()
+
     def _refresh_from_item(self):
         item = self.current_item
+        # Размер — по перестроенному пути, а не ждущему в очереди
+        from ...core import parametric
+        parametric.flush()
         rect = item.path().boundingRect()
         t = item.transform()
         width_px = rect.width() * abs(t.m11())
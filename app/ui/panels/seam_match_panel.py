@@ -0,0 +1,139 @@
+# app/ui/panels/seam_match_panel.py
+from PyQt6 import sip
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                             QPushButton, QSpinBox)
+from ...core.metrics import seam_match
+from ...tools.pattern_item import PatternPieceItem
+
+
+class SeamMatchPanel(QWidget):
+    """Сверка длин двух сшиваемых рёбер (пройма и окат рукава и т.п.).
+
+    Ребро берётся у выбранной детали кнопкой Pick и номером ребра. Показания
+    обновляются по scene.changed — то есть и во время перетаскивания хендлов
+    ребра или угла, а не только после команды: метрики детали пересчитывают
+    только изменившиеся рёбра (PatternPieceItem.metrics()), так что
+    обновление успевает за мышью.
+    """
+
+    def __init__(self, canvas, measurements, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.measurements = measurements
+        self.pieces = [None, None]
+        self._init_ui()
+        canvas.scene.changed.connect(lambda _: self.refresh())
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        title = QLabel("Seam Match")
+        title.setStyleSheet("font-weight: bold; font-size: 13px;")
+        layout.addWidget(title)
+
+        self.piece_labels = []
+        self.edge_spins = []
+        for side in range(2):
+            row = QHBoxLayout()
+            row.addWidget(QLabel("AB"[side] + ":"))
+            label = QLabel("—")
+            row.addWidget(label, 1)
+            spin = QSpinBox()
+            spin.setPrefix("Edge ")
+            spin.setRange(1, 1)
+            spin.valueChanged.connect(lambda _: self.refresh())
+            row.addWidget(spin)
+            button = QPushButton("Pick")
+            button.setToolTip("Взять выбранную деталь")
+            button.clicked.connect(lambda _, side=side: self.pick(side))
+            row.addWidget(button)
+            layout.addLayout(row)
+            self.piece_labels.append(label)
+            self.edge_spins.append(spin)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Notches:"))
+        self.notches_spin = QSpinBox()
+        self.notches_spin.setRange(0, 9)
+        self.notches_spin.setValue(2)
+        self.notches_spin.valueChanged.connect(lambda _: self.refresh())
+        row.addWidget(self.notches_spin)
+        layout.addLayout(row)
+
+        form = QFormLayout()
+        self.length_labels = [QLabel("—"), QLabel("—")]
+        self.difference_label = QLabel("—")
+        self.ease_label = QLabel("—")
+        self.notches_label = QLabel("—")
+        self.notches_label.setWordWrap(True)
+        form.addRow("Length A:", self.length_labels[0])
+        form.addRow("Length B:", self.length_labels[1])
+        form.addRow("B − A:", self.difference_label)
+        form.addRow("Ease:", self.ease_label)
+        form.addRow("Notches A / B:", self.notches_label)
+        layout.addLayout(form)
+
+        hint = QLabel("Tip: select a piece, press Pick,\nthen choose the edge number.")
+        hint.setStyleSheet("color: #888; font-size: 10px;")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+        layout.addStretch()
+
+    def pick(self, side, piece=None, edge=None):
+        """Ребро стороны side (0 — A, 1 — B): piece или единственная выбранная деталь."""
+        if piece is None:
+            items = [i for i in self.canvas.scene.selectedItems()
+                     if isinstance(i, PatternPieceItem)]
+            if len(items) != 1:
+                return
+            piece = items[0]
+        self.pieces[side] = piece
+        spin = self.edge_spins[side]
+        spin.blockSignals(True)
+        spin.setRange(1, max(len(piece.metrics().edges), 1))
+        if edge is not None:
+            spin.setValue(edge + 1)
+        spin.blockSignals(False)
+        self.refresh()
+
+    def _edge_length(self, side):
+        piece = self.pieces[side]
+        if piece is None:
+            return None
+        # Деталь удалили — командой или вместе со сценой (New/Open:
+        # scene.clear() удаляет и сам объект C++)
+        if sip.isdeleted(piece) or piece.scene() is not self.canvas.scene:
+            self.pieces[side] = None
+            self.piece_labels[side].setText("—")
+            return None
+        edges = piece.metrics().edges
+        spin = self.edge_spins[side]
+        if spin.maximum() != max(len(edges), 1):
+            # Деталь перестроена по параметрам — рёбер могло стать больше/меньше
+            spin.blockSignals(True)
+            spin.setMaximum(max(len(edges), 1))
+            spin.blockSignals(False)
+        index = spin.value() - 1
+        return edges[index] if index < len(edges) else None
+
+    def refresh(self):
+        fmt = self.measurements
+        lengths = [self._edge_length(side) for side in range(2)]
+        for side, length in enumerate(lengths):
+            piece = self.pieces[side]
+            if piece is not None:
+                name = piece.template.name if piece.is_parametric else "Piece"
+                self.piece_labels[side].setText(name)
+            self.length_labels[side].setText("—" if length is None else fmt.format(length))
+        if None in lengths:
+            self.difference_label.setText("—")
+            self.ease_label.setText("—")
+            self.notches_label.setText("—")
+            return
+        match = seam_match(lengths[0], lengths[1], self.notches_spin.value())
+        self.difference_label.setText(fmt.format(match["difference"]))
+        self.ease_label.setText(f"{match['ease']:+.1f}%")
+        self.notches_label.setText(", ".join(
+            f"{fmt.format(a)} / {fmt.format(b)}" for a, b in match["notches"]) or "—")
@@ -1,8 +1,16 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QDoubleSpinBox, QPushButton)
-from PyQt6.QtGui import QPainterPathStroker, QPen, QColor
-from PyQt6.QtCore import Qt
-from ...tools.graphics_items import SnappablePathItem
+import threading
+
+from PyQt6 import sip
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDoubleSpinBox,
+                             QPushButton, QComboBox, QLineEdit, QProgressBar)
+from PyQt6.QtGui import QPainterPath, QPen, QColor
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from ...core.metrics import edge_groups, path_subpaths
+from ...core.offset import JOINS
+from ...core.seams import compute_seam_paths
+from ...core.serialization import item_id
+from ...tools.pattern_item import PatternPieceItem
+from ...tools.seam_item import SeamAllowanceItem
 
 # Тег для идентификации элементов припуска
 _SEAM_TAG = "seam_allowance"
@@ -11,20 +19,88 @@ _SEAM_KEY  = 0          # ключ для item.setData()
 PX_PER_MM = 96 / 25.4  # 3.7795 px/мм при 96 dpi
 
 
-def _compute_seam_path(original_path, allowance_px):
-    """Возвращает расширенный контур (cutting line) для заданного пути."""
-    stroker = QPainterPathStroker()
-    stroker.setWidth(allowance_px * 2)          # расширение в обе стороны
-    stroker.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
-    stroker.setCapStyle(Qt.PenCapStyle.SquareCap)
-    stroke = stroker.createStroke(original_path)
-    return original_path.united(stroke)         # внешний контур = оригинал + кольцо
+def parse_edge_widths(text):
+    """"3=30, 5=20" -> {2: 30.0, 4: 20.0}: номера рёбер с 1 (как в панели
+    метрик) -> ширина, мм. ValueError при ошибке в записи."""
+    widths = {}
+    for part in text.replace(";", ",").split(","):
+        if not part.strip():
+            continue
+        edge, _, value = part.partition("=")
+        index, width = int(edge) - 1, float(value)
+        if index < 0 or width < 0:
+            raise ValueError(part)
+        widths[index] = width
+    return widths
+
+
+def segment_widths(item, edge_widths, default):
+    """Ширины припуска по сегментам пути item (так их нумерует offset) из
+    ширин по рёбрам edge_widths в нумерации панели метрик: ребро из
+    нескольких сегментов (дуга шаблона) получает свою ширину целиком."""
+    if isinstance(item, PatternPieceItem):
+        groups = item.metrics().groups
+    else:
+        groups = edge_groups(path_subpaths(item.path()))
+    widths = [default] * sum(len(group) for group in groups)
+    for edge, group in enumerate(groups):
+        for index in group:
+            widths[index] = edge_widths.get(edge, default)
+    return widths
+
+
+class SeamBatch(QObject):
+    """Контуры припусков для набора деталей в рабочем потоке
+    (seams.compute_seam_paths). Как и задачи ProjectManager, сигналы
+    доставляются в поток, где создан объект; results заполняется до
+    отправки finished (None — отменено)."""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    def __init__(self, pieces, links, parent=None):
+        super().__init__(parent)
+        self.pieces = pieces
+        self.links = links
+        # Копии путей: рабочие потоки не трогают объекты сцены
+        self.paths = [QPainterPath(piece.path()) for piece in pieces]
+        self.results = None
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def _run(self):
+        self.results = compute_seam_paths(list(zip(self.paths, self.links)),
+                                          progress=self.progress.emit,
+                                          cancelled=self.is_cancelled)
+        self.finished.emit()
 
 
 class SeamAllowancePanel(QWidget):
+    """Припуски на швы для выбранных деталей.
+
+    Контуры всех выбранных деталей считаются в пуле потоков (SeamBatch) с
+    индикатором и отменой, а готовые припуски добавляются на сцену одной
+    командой AddItemsCommand — один шаг отмены на весь набор, сколько бы
+    деталей ни было выбрано.
+    """
+
     def __init__(self, canvas, parent=None):
         super().__init__(parent)
         self.canvas = canvas
+        self._batch = None
         self._init_ui()
 
     def _init_ui(self):
@@ -48,11 +124,40 @@ class SeamAllowancePanel(QWidget):
         row.addWidget(self.spin)
         layout.addLayout(row)
 
+        # Свои ширины отдельных рёбер (подгибка низа и т.п.)
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Edges:"))
+        self.edges_edit = QLineEdit()
+        self.edges_edit.setPlaceholderText("e.g. 3=30, 5=20 (mm)")
+        self.edges_edit.setToolTip("Номер ребра (см. Piece Metrics) = ширина, мм")
+        row.addWidget(self.edges_edit)
+        layout.addLayout(row)
+
+        # Стиль углов
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Corners:"))
+        self.join_combo = QComboBox()
+        for join in JOINS:
+            self.join_combo.addItem(join.capitalize(), join)
+        row.addWidget(self.join_combo)
+        layout.addLayout(row)
+
         # Кнопка добавить
-        btn_add = QPushButton("Add to Selected")
-        btn_add.setToolTip("Выберите детали выкройки (Select), затем нажмите")
-        btn_add.clicked.connect(self._apply)
-        layout.addWidget(btn_add)
+        self.add_button = QPushButton("Add to Selected")
+        self.add_button.setToolTip("Выберите детали выкройки (Select), затем нажмите")
+        self.add_button.clicked.connect(self._apply)
+        layout.addWidget(self.add_button)
+
+        # Ход расчёта для большого набора деталей
+        row = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        row.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel)
+        row.addWidget(self.cancel_button)
+        layout.addLayout(row)
 
         # Кнопка удалить все припуски
         btn_remove = QPushButton("Remove All Seam Lines")
@@ -67,35 +172,93 @@ class SeamAllowancePanel(QWidget):
         layout.addStretch()
 
     def _apply(self):
-        from ...core.commands import AddItemCommand
-
+        if self._batch is not None:
+            return
         items = [i for i in self.canvas.scene.selectedItems()
                  if hasattr(i, 'path') and i.data(_SEAM_KEY) != _SEAM_TAG]
         if not items:
             return
 
         allowance_px = self.spin.value() * PX_PER_MM
+        join = self.join_combo.currentData()
+        try:
+            edge_widths = parse_edge_widths(self.edges_edit.text())
+        except ValueError:
+            self.edges_edit.selectAll()
+            self.edges_edit.setFocus()
+            return
 
+        links = []
         for item in items:
-            seam_path = _compute_seam_path(item.path(), allowance_px)
+            link = {"source": item_id(item), "kind": "seam", "width": allowance_px,
+                    "join": join}
+            if edge_widths:
+                link["widths"] = [width * PX_PER_MM for width in
+                                  segment_widths(item, edge_widths, self.spin.value())]
+            links.append(link)
+
+        batch = SeamBatch(items, links, self)
+        batch.progress.connect(self._on_progress)
+        batch.finished.connect(lambda: self._on_finished(batch))
+        self._batch = batch
+        self.add_button.setEnabled(False)
+        self.progress_bar.setRange(0, len(items))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        batch.start()
+
+    def cancel(self):
+        if self._batch is not None:
+            self._batch.cancel()
+
+    def wait(self):
+        """Дожидается расчёта и добавляет припуски сразу. Сигнал finished
+        из рабочего потока уже мог встать в очередь — отключаем его, чтобы
+        он не пришёл позже, когда панели может уже не быть."""
+        if self._batch is not None:
+            self._batch.wait()
+            self._batch.finished.disconnect()
+            self._on_finished(self._batch)
+
+    def _on_progress(self, done, total):
+        self.progress_bar.setValue(done)
 
-            pen = QPen(QColor(210, 50, 50), 1.5, Qt.PenStyle.DashLine)
-            seam_item = SnappablePathItem(seam_path)
+    def _on_finished(self, batch):
+        from ...core.commands import AddItemsCommand
+
+        if self._batch is not batch:
+            return
+        batch.wait()
+        self._batch = None
+        self.add_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+        if batch.results is None:
+            return
+
+        seam_items = []
+        pen = QPen(QColor(210, 50, 50), 1.5, Qt.PenStyle.DashLine)
+        for item, link, path, (contour, offset) in zip(batch.pieces, batch.links,
+                                                       batch.paths, batch.results):
+            if sip.isdeleted(item) or item.scene() is not self.canvas.scene:
+                continue  # деталь удалили (или закрыли проект), пока шёл расчёт
+            # Привязка к детали: припуск — её дочерний объект и следует за её
+            # перемещением, трансформом и изменением рёбер (SeamAllowanceItem).
+            # Если деталь успели изменить, AddItemsCommand досчитает рёбра.
+            seam_item = SeamAllowanceItem(contour, link, item, offset, path)
             seam_item.setPen(pen)
-            seam_item.setPos(item.pos())
-            seam_item.setTransform(item.transform())
             seam_item.setData(_SEAM_KEY, _SEAM_TAG)   # помечаем как припуск
-            seam_item.setFlags(
-                seam_item.GraphicsItemFlag.ItemIsSelectable |
-                seam_item.GraphicsItemFlag.ItemIsMovable
-            )
-
-            self.canvas.undo_stack.push(
-                AddItemCommand(self.canvas.scene, seam_item, "Add seam allowance")
-            )
+            seam_items.append(seam_item)
+        if seam_items:
+            self.canvas.undo_stack.push(AddItemsCommand(
+                self.canvas.scene, seam_items,
+                "Add seam allowance" if len(seam_items) == 1 else "Add seam allowances"
+            ))
 
     def _remove_all(self):
         from ...core.commands import RemoveItemsCommand
+        self.canvas.materialize_all()
         seam_items = [i for i in self.canvas.scene.items()
                       if i.data(_SEAM_KEY) == _SEAM_TAG]
         if seam_items:
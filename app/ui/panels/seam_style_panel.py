@@ -1,63 +1,15 @@
-import math
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox, QDoubleSpinBox, QPushButton)
-from PyQt6.QtGui import QPen, QColor, QPainterPath
-from PyQt6.QtCore import Qt, QPointF
-from ...tools.graphics_items import SnappablePathItem
+from PyQt6.QtGui import QPen, QColor
+from PyQt6.QtCore import Qt
+from ...core.serialization import item_id
+from ...tools.stitch_item import StitchMarkItem
 
 # Тег для маркировки оверлеев стиля шва
 _STYLE_TAG = "seam_style"
 _STYLE_KEY = 1
 
 
-def _make_zigzag_path(source_path, amplitude, step):
-    """Зигзаг вдоль исходного пути: семплируем точки, чередуем смещение по нормали."""
-    total = source_path.length()
-    if total < 1:
-        return QPainterPath(source_path)
-
-    result = QPainterPath()
-    step_t = max(step / total, 0.001)
-    flip = 1
-    first = True
-    t = 0.0
-    while t <= 1.0001:
-        tc = min(t, 1.0)
-        pt = source_path.pointAtPercent(tc)
-        angle = math.radians(source_path.angleAtPercent(tc) + 90)
-        dest = QPointF(pt.x() + math.cos(angle) * amplitude * flip,
-                       pt.y() - math.sin(angle) * amplitude * flip)
-        if first:
-            result.moveTo(dest)
-            first = False
-        else:
-            result.lineTo(dest)
-        flip = -flip
-        t += step_t
-    return result
-
-
-def _make_overlock_path(source_path, size, step):
-    """Оверлок: короткие штрихи перпендикулярно линии шва (классическая нотация)."""
-    total = source_path.length()
-    if total < 1:
-        return QPainterPath(source_path)
-
-    result = QPainterPath()
-    step_t = max(step / total, 0.001)
-    t = 0.0
-    while t <= 1.0001:
-        tc = min(t, 1.0)
-        pt = source_path.pointAtPercent(tc)
-        angle = math.radians(source_path.angleAtPercent(tc) + 60)
-        end = QPointF(pt.x() + math.cos(angle) * size,
-                      pt.y() - math.sin(angle) * size)
-        result.moveTo(pt)
-        result.lineTo(end)
-        t += step_t
-    return result
-
-
 class SeamStylePanel(QWidget):
     STYLES = ["Straight", "Zigzag", "Overlock"]
 
@@ -130,16 +82,18 @@ class SeamStylePanel(QWidget):
                 continue
 
             if style == "Zigzag":
-                overlay_path = _make_zigzag_path(item.path(), amplitude=size, step=size * 1.5)
                 color = QColor(60, 120, 220)
             else:  # Overlock
-                overlay_path = _make_overlock_path(item.path(), size=size, step=size * 1.5)
                 color = QColor(220, 130, 30)
 
-            overlay = SnappablePathItem(overlay_path)
+            # Стежки отметка строит сама при отрисовке — хранит только линию
+            overlay = StitchMarkItem(item.path(), {"source": item_id(item),
+                                                   "kind": style.lower(), "size": size})
             overlay.setPen(QPen(color, 1.5))
-            overlay.setPos(item.pos())
-            overlay.setTransform(item.transform())
+            # Привязанный припуск лежит в координатах своей детали
+            frame = item.parentItem() or item
+            overlay.setPos(frame.pos())
+            overlay.setTransform(frame.transform())
             overlay.setData(_STYLE_KEY, _STYLE_TAG)
             overlay.setFlags(
                 overlay.GraphicsItemFlag.ItemIsSelectable |
@@ -151,6 +105,7 @@ class SeamStylePanel(QWidget):
 
     def _remove_all(self):
         from ...core.commands import RemoveItemsCommand
+        self.canvas.materialize_all()
         overlays = [i for i in self.canvas.scene.items()
                     if i.data(_STYLE_KEY) == _STYLE_TAG]
         if overlays:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Пакетная генерация выкроек по таблице мерок — без окон и без дисплея
+
+    python3 batch.py measurements.csv --templates Sleeve "Skirt Panel" --out out/
+    python3 batch.py measurements.csv --templates Bodice Sleeves --format svg pdf --workers 8
+
+Каждая строка CSV — заказчик (колонка customer), остальные колонки — мерки
+в сантиметрах (см. app/core/batch.py).
+"""
+import argparse
+import os
+import sys
+
+# Рабочим процессам не нужен дисплей — только шрифты для подписей
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.core import batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clothing Designer batch generator")
+    parser.add_argument("csv", help="таблица мерок (CSV, первая строка — заголовки)")
+    parser.add_argument("--templates", nargs="+", required=True,
+                        help="имена шаблонов или категорий PatternLibrary")
+    parser.add_argument("--out", default="out", help="каталог для файлов")
+    parser.add_argument("--format", nargs="+", default=["svg"], choices=batch.FORMATS)
+    parser.add_argument("--unit", default="cm", choices=["cm", "mm", "px"],
+                        help="единицы SVG")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов")
+    parser.add_argument("--id-column", default=batch.ID_COLUMN, help="колонка с именем заказчика")
+    args = parser.parse_args()
+
+    try:
+        results = batch.run_batch(args.csv, args.templates, args.out, args.format,
+                                  unit=args.unit, workers=args.workers, id_column=args.id_column)
+        failed = total = 0
+        for result in results:
+            total += 1
+            if result["error"]:
+                failed += 1
+                print(f"✗ {result['customer']} (row {result['row']}): {result['error']}",
+                      file=sys.stderr)
+            else:
+                print(f"✓ {result['customer']}: {', '.join(result['files'])}")
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    print(f"{total - failed}/{total} customers generated")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Замеры производительности без окон и без дисплея
+
+    python3 -m benchmarks                       # сравнить с benchmarks/baseline.json
+    python3 -m benchmarks --only seams.allowance piece.shape
+    python3 -m benchmarks --update-baseline     # записать текущие замеры как базовые
+
+Результаты пишутся в JSON (--out); код выхода 1 — есть регрессии
+относительно базовой линии (см. benchmarks/suite.py).
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clothing Designer benchmarks")
+    parser.add_argument("--out", default="bench_results.json", help="файл результатов (JSON)")
+    parser.add_argument("--baseline", default=suite.BASELINE_PATH, help="базовая линия (JSON)")
+    parser.add_argument("--tolerance", type=float, default=suite.DEFAULT_TOLERANCE,
+                        help="допустимый рост времени, доля (0.5 = +50%%)")
+    parser.add_argument("--only", nargs="+", choices=sorted(suite.BENCHMARKS),
+                        help="запустить только эти замеры")
+    parser.add_argument("--repeat", type=int, default=None, help="повторов на замер")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="записать результаты как базовую линию")
+    args = parser.parse_args()
+
+    def progress(name, result):
+        print(f"{name:32} {result['median'] * 1000:10.3f} ms  (min {result['min'] * 1000:.3f})")
+
+    results = suite.run_benchmarks(args.only, args.repeat, progress)
+    try:
+        suite.write_json(results, args.out)
+        if args.update_baseline:
+            suite.write_json(results, args.baseline)
+            print(f"Baseline written to {args.baseline}")
+            return 0
+        baseline = suite.read_json(args.baseline)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    regressions = suite.compare(results, baseline, args.tolerance)
+    for name, before, after in regressions:
+        print(f"✗ {name}: {before * 1000:.3f} ms → {after * 1000:.3f} ms "
+              f"(+{(after / before - 1) * 100:.0f}%)", file=sys.stderr)
+    print(f"{len(results['results'])} benchmarks, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+# benchmarks/suite.py
+"""Набор замеров производительности: шаблоны, геометрия швов, сцена.
+
+Каждый замер — функция-фабрика: подготавливает данные (вне замера) и
+возвращает функцию без аргументов, время которой меряется. Функция
+запускается repeat раз, в результат идут медиана и минимум в секундах.
+
+Результат — JSON {"meta": {...}, "results": {имя: {"median", "min",
+"q1", "q3", "repeat"}}}. Базовая линия — такой же файл, снятый одним
+запуском (--update-baseline), а не собранный из разных. compare() считает
+регрессией метрику, минимальное время которой выросло больше чем на
+tolerance (доля) плюс NOISE_IQRS межквартильных размахов базовой линии и
+больше чем на MIN_DELTA секунд. Сравнивается минимум, а не медиана:
+помехи от других процессов только добавляют время; размах добавляет
+запас тем замерам, которые и на одном коде шумят сильнее остальных
+(сцена, отрисовка), совсем короткие ограничивает MIN_DELTA. Базовая линия
+зависит от машины: после смены железа её перезаписывают.
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCENE_SIZES = (100, 1000, 10000)
+DEFAULT_TOLERANCE = 0.5
+MIN_DELTA = 0.0005
+# Сколько межквартильных размахов базовой линии прибавляется к допуску
+NOISE_IQRS = 2
+_SEAM_WIDTH = 10 * 96 / 25.4    # 10 мм в px сцены
+_STITCH_SIZE = 6
+
+_app = None
+BENCHMARKS = {}
+
+
+def _ensure_app():
+    """QApplication на платформе offscreen — сцене и элементам нужен Qt."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication(["clothing-designer-bench"])
+
+
+def benchmark(name, repeat=20):
+    def register(factory):
+        BENCHMARKS[name] = (factory, repeat)
+        return factory
+    return register
+
+
+def _library():
+    from app.core.pattern_templates import PatternLibrary
+    return PatternLibrary()
+
+
+def _curved_paths():
+    """Пути деталей с кривыми — рукав, воротник, лиф."""
+    library = _library()
+    return [library.get_template(name).generate_path()
+            for name in ("Sleeve", "Collar", "Bodice Front")]
+
+
+@benchmark("templates.generate_path")
+def _generate_path():
+    templates = _library().get_all_templates()
+    for template in templates:
+        template.generate_path()  # программа шаблона скомпилирована до замера
+
+    def run():
+        for template in templates:
+            template.generate_path()
+    return run
+
+
+@benchmark("templates.generate_batch.1000", repeat=10)
+def _generate_batch():
+    import numpy as np
+    templates = _library().get_all_templates()
+    params = [{p["name"]: np.linspace(p["min"], p["max"], 1000)
+               for p in t.get_parameters()} for t in templates]
+
+    def run():
+        for template, values in zip(templates, params):
+            template.generate_batch(**values)
+    return run
+
+
+@benchmark("seams.allowance", repeat=10)
+def _seam_allowance():
+    from app.core.offset import offset_path
+    paths = _curved_paths()
+
+    def run():
+        # Мимо GEOMETRY_CACHE: меряется сам сдвиг контура
+        for path in paths:
+            offset_path(path, _SEAM_WIDTH)
+    return run
+
+
+@benchmark("seams.zigzag", repeat=10)
+def _zigzag():
+    from app.core.seams import make_zigzag_path
+    paths = _curved_paths()
+
+    def run():
+        # Мимо GEOMETRY_CACHE: меряется сама расстановка стежков
+        for path in paths:
+            make_zigzag_path(path, _STITCH_SIZE, _STITCH_SIZE * 1.5)
+    return run
+
+
+@benchmark("seams.overlock", repeat=10)
+def _overlock():
+    from app.core.seams import make_overlock_path
+    paths = _curved_paths()
+
+    def run():
+        for path in paths:
+            make_overlock_path(path, _STITCH_SIZE, _STITCH_SIZE * 1.5)
+    return run
+
+
+@benchmark("piece.shape")
+def _piece_shape():
+    from PyQt6.QtWidgets import QGraphicsScene
+    from app.tools.pattern_item import PatternPieceItem
+    scene = QGraphicsScene()
+    items = []
+    for path in _curved_paths():
+        item = PatternPieceItem(path)
+        scene.addItem(item)
+        item.setSelected(True)  # с хендлами — самый дорогой случай
+        items.append(item)
+
+    def run():
+        for item in items:
+            item.shape()
+    run.keep = scene  # сцена живёт, пока идёт замер
+    return run
+
+
+@benchmark("piece.paint", repeat=10)
+def _piece_paint():
+    from PyQt6.QtCore import QRectF
+    from PyQt6.QtGui import QImage, QPainter
+    from PyQt6.QtWidgets import QGraphicsScene
+    from app.tools.pattern_item import PatternPieceItem
+    scene = QGraphicsScene()
+    paths = _curved_paths()
+    for i in range(60):
+        item = PatternPieceItem(paths[i % len(paths)])
+        item.setPos((i % 10) * 900, (i // 10) * 900)
+        scene.addItem(item)
+    image = QImage(800, 600, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def run():
+        # Панорамирование: тот же масштаб, сдвигающаяся область сцены
+        painter = QPainter(image)
+        for step in range(10):
+            painter.fillRect(image.rect(), 0xffffffff)
+            scene.render(painter, QRectF(image.rect()),
+                         QRectF(step * 400, step * 200, 4800, 3600))
+        painter.end()
+    run.keep = scene
+    return run
+
+
+@benchmark("canvas.grid", repeat=10)
+def _canvas_grid():
+    from app.ui.canvas import Canvas
+    canvas = Canvas(100000, 100000)
+    canvas.resize(1600, 1000)
+    canvas.scale(0.1, 0.1)
+    canvas.show()
+    bar = canvas.horizontalScrollBar()
+
+    def run():
+        # Панорамирование пустого большого холста на мелком масштабе: на
+        # кадр — только фон с сеткой
+        for step in range(20):
+            bar.setValue(step * 40)
+            canvas.viewport().grab()
+    run.keep = canvas
+    return run
+
+
+def _scene_case(count, remove):
+    from PyQt6.QtGui import QUndoStack
+    from PyQt6.QtWidgets import QGraphicsScene
+    from app.core.commands import AddItemsCommand, RemoveItemsCommand
+    from app.tools.pattern_item import PatternPieceItem
+
+    path = _library().get_template("Sleeve").generate_path()
+    items = []
+    for i in range(count):
+        item = PatternPieceItem(path)
+        item.setPos((i % 100) * 1500, (i // 100) * 2500)
+        items.append(item)
+    scene = QGraphicsScene()
+    stack = QUndoStack()
+
+    def insert():
+        start = time.perf_counter()
+        stack.push(AddItemsCommand(scene, items))
+        elapsed = time.perf_counter() - start
+        stack.undo()    # сцена снова пуста к следующему повтору
+        stack.clear()
+        return elapsed
+
+    def delete():
+        stack.push(AddItemsCommand(scene, items))
+        start = time.perf_counter()
+        stack.push(RemoveItemsCommand(scene, items))
+        elapsed = time.perf_counter() - start
+        stack.clear()
+        return elapsed
+
+    run = delete if remove else insert
+    run.keep = (scene, stack, items)
+    return run
+
+
+for _count in SCENE_SIZES:
+    _repeat = 5 if _count >= 10000 else 10
+    benchmark(f"scene.insert.{_count}", _repeat)(lambda c=_count: _scene_case(c, False))
+    benchmark(f"scene.remove.{_count}", _repeat)(lambda c=_count: _scene_case(c, True))
+
+
+def _measure(run):
+    # Сборщик мусора не вмешивается в замер (как в timeit)
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        measured = run()
+        return measured if measured is not None else time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def run_benchmarks(names=None, repeat=None, progress=None):
+    """{"meta", "results"} для замеров names (по умолчанию — все).
+
+    Функция замера может сама вернуть время (если часть работы — подготовка
+    или уборка, как у замеров сцены), иначе меряется весь вызов. Повторы
+    идут кругами по всем замерам, а не подряд: медленный отрезок работы
+    машины (частота, соседние процессы) задевает по повтору каждого замера,
+    а не все повторы одного.
+    """
+    _ensure_app()
+    selected = [(name, factory, repeat or default_repeat)
+                for name, (factory, default_repeat) in BENCHMARKS.items()
+                if names is None or name in names]
+    runs, times = {}, {}
+    for name, factory, _ in selected:
+        runs[name] = factory()
+        runs[name]()  # прогрев: кэши, ленивые импорты
+        times[name] = []
+    for round_index in range(max((count for _, _, count in selected), default=0)):
+        for name, _, count in selected:
+            if round_index < count:
+                times[name].append(_measure(runs[name]))
+
+    results = {}
+    for name, _, _ in selected:
+        samples = times[name]
+        q1, _, q3 = (statistics.quantiles(samples, n=4) if len(samples) > 1
+                     else samples * 3)
+        results[name] = {"median": statistics.median(samples), "min": min(samples),
+                         "q1": q1, "q3": q3, "repeat": len(samples)}
+        if progress:
+            progress(name, results[name])
+    from PyQt6.QtCore import QT_VERSION_STR
+    meta = {"python": platform.python_version(), "qt": QT_VERSION_STR,
+            "machine": platform.machine(), "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return {"meta": meta, "results": results}
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta=MIN_DELTA):
+    """Регрессии: [(имя, было, стало)] — минимальное время выросло больше
+    допуска плюс NOISE_IQRS межквартильных размахов базовой линии (разброс
+    самого замера) и больше min_delta. Метрики, которых нет в одном из
+    файлов, не сравниваются."""
+    regressions = []
+    for name, current in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        before, after = base["min"], current["min"]
+        noise = base.get("q3", before) - base.get("q1", before)
+        if after > before * (1 + tolerance) + NOISE_IQRS * noise and after - before > min_delta:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def write_json(data, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Статистика и миниатюра проекта .cld без запуска редактора
+
+    python3 scripts/project_info.py project.cld
+    python3 scripts/project_info.py project.cld --thumbnail preview.png --size 512
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.project_file import ProjectFile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clothing Designer project info")
+    parser.add_argument("project", help="путь к файлу .cld")
+    parser.add_argument("--thumbnail", help="сохранить миниатюру (PNG)")
+    parser.add_argument("--size", type=int, default=256, help="размер миниатюры, px")
+    args = parser.parse_args()
+
+    project = ProjectFile(args.project)
+    print(json.dumps(project.statistics(), indent=2, ensure_ascii=False))
+
+    if args.thumbnail:
+        image = project.render_thumbnail(args.size)
+        if not image.save(args.thumbnail):
+            print(f"✗ Could not write {args.thumbnail}", file=sys.stderr)
+            return 1
+        print(f"✓ Thumbnail: {args.thumbnail}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
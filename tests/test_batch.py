@@ -0,0 +1,46 @@
+"""Пакетная генерация по таблице мерок (batch.py) — без виджетов."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+from app.core import batch
+from app.core.pattern_templates import PatternLibrary
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_row_params_prefer_template_column():
+    library = PatternLibrary()
+    sleeve = library.get_template("sleeve")
+    row = {"width": "40", "sleeve.width": "31,5", "height": ""}
+    assert batch.row_params(sleeve, row) == {"width": 31.5}
+    assert batch.row_params(library.get_template("Pocket"), row) == {"width": 40.0}
+    assert [t.name for t in batch.resolve_templates(["Skirts"])] == \
+        ["Skirt Panel", "Skirt Strip (Darts)"]
+
+
+def test_cli_writes_files_per_customer(tmp_path):
+    table = tmp_path / "measurements.csv"
+    table.write_text("customer,width,length\nAnna K,36,60\nBoris,abc,\n", encoding="utf-8")
+    out = tmp_path / "out"
+    # Отдельный процесс без QApplication — как на сервере без дисплея
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    proc = subprocess.run(
+        [sys.executable, str(ROOT / "batch.py"), str(table), "--templates", "Sleeve", "Bodice",
+         "--out", str(out), "--format", "svg", "pdf", "--workers", "2"],
+        capture_output=True, text=True, env=env, cwd=str(tmp_path),
+    )
+    assert proc.returncode == 1, proc.stderr   # вторая строка с ошибкой
+    assert "Boris (row 2)" in proc.stderr
+    assert sorted(os.listdir(out)) == ["Anna_K.pdf", "Anna_K.svg"]
+    root = ET.parse(out / "Anna_K.svg").getroot()
+    assert root.get("width").endswith("cm")
+    assert len(root.findall("{http://www.w3.org/2000/svg}path")) == 2
+
+
+def test_customers_with_same_file_name_get_distinct_files():
+    rows = [{"Customer": "Anna K"}, {"Customer": "Anna/K"}, {"Customer": ""},
+            {"Customer": "anna k"}, {"Customer": "Anna_K_2"}]
+    assert batch.unique_stems(rows) == ["Anna_K", "Anna_K_2", "row3", "anna_k_4", "Anna_K_2_5"]
@@ -0,0 +1,29 @@
+"""Набор замеров: запуск без дисплея и сравнение с базовой линией."""
+from benchmarks import suite
+
+
+def _results(**times):
+    return {"results": {name: {"median": t, "min": t, "repeat": 1}
+                        for name, t in times.items()}}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = _results(a=0.010, b=0.010, tiny=0.0001, gone=0.01)
+    current = _results(a=0.012, b=0.020, tiny=0.0003, new=1.0)
+    assert suite.compare(current, baseline, tolerance=0.5) == [("b", 0.010, 0.020)]
+    # Замер, который и на базовой линии шумит, получает запас по размаху
+    baseline["results"]["b"].update(q1=0.010, q3=0.013)
+    assert suite.compare(current, baseline, tolerance=0.5) == []
+
+
+def test_suite_runs_headless(qapp, tmp_path):
+    names = ["templates.generate_path", "seams.zigzag", "piece.shape", "scene.insert.100"]
+    results = suite.run_benchmarks(names, repeat=2)
+    assert sorted(results["results"]) == sorted(names)
+    assert all(r["min"] > 0 for r in results["results"].values())
+
+    path = str(tmp_path / "bench.json")
+    suite.write_json(results, path)
+    assert suite.compare(suite.read_json(path), results) == []
+    # Базовая линия покрывает весь набор
+    assert set(suite.read_json(suite.BASELINE_PATH)["results"]) == set(suite.BENCHMARKS)
@@ -0,0 +1,28 @@
+"""Фон холста: сетка пакетами линий и кэш фона окна."""
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QColor
+
+from app.ui.canvas import Canvas
+
+
+def test_grid_lines_cover_rect_and_stay_inside_scene(qapp):
+    canvas = Canvas(1000, 800)
+    minor, major = canvas._grid_lines(20, QRectF(-50, 90, 430, 300))
+    verticals = sorted(line.x1() for line in minor + major if line.x1() == line.x2())
+    assert verticals == [20.0 * i for i in range(0, 20)]
+    assert sorted(line.x1() for line in major if line.x1() == line.x2()) == [0, 100, 200, 300]
+    # Концы — по главным клеткам, но не за краем сцены
+    assert {(line.y1(), line.y2()) for line in minor if line.x1() == line.x2()} == {(0, 400)}
+    assert {(line.x1(), line.x2()) for line in major if line.y1() == line.y2()} == {(0, 400)}
+
+
+def test_theme_change_repaints_cached_background(qapp):
+    canvas = Canvas(2000, 2000)
+    canvas.resize(300, 200)
+    canvas.show()
+    light = canvas.viewport().grab().toImage()
+    canvas.set_theme("dark")
+    dark = canvas.viewport().grab().toImage()
+    assert QColor(light.pixel(3, 3)) == QColor(240, 240, 240)
+    assert QColor(dark.pixel(3, 3)) == QColor(50, 50, 50)
+    canvas.close()
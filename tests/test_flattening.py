@@ -0,0 +1,65 @@
+"""Ломаные по ступеням масштаба: точность и кэш в PatternPieceItem."""
+import math
+
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import flattening
+from app.core.pattern_templates import PatternLibrary
+from app.tools.pattern_item import PatternPieceItem
+
+
+def _distance_to_polygon(point, polygon):
+    best = math.inf
+    for i in range(polygon.size() - 1):
+        a, b = polygon.at(i), polygon.at(i + 1)
+        dx, dy = b.x() - a.x(), b.y() - a.y()
+        length2 = dx * dx + dy * dy or 1e-12
+        t = max(0.0, min(1.0, ((point.x() - a.x()) * dx + (point.y() - a.y()) * dy) / length2))
+        best = min(best, math.hypot(point.x() - a.x() - t * dx, point.y() - a.y() - t * dy))
+    return best
+
+
+def test_flattening_stays_within_tolerance(qapp):
+    path = PatternLibrary().get_template("Sleeve").generate_path()
+    sizes = []
+    for bucket in (-4, 0, 4):
+        tolerance = flattening.bucket_tolerance(bucket)
+        polygon = flattening.flatten_polygons(path, tolerance)[0]
+        sizes.append(polygon.size())
+        worst = max(_distance_to_polygon(path.pointAtPercent(k / 200), polygon)
+                    for k in range(201))
+        assert worst <= tolerance * 1.01
+    assert sizes[0] < sizes[1] < sizes[2]  # крупнее масштаб — мельче отрезки
+    assert flattening.bucket_scale(flattening.zoom_bucket(0.3)) >= 0.3
+
+
+def test_piece_rebuilds_flattening_only_on_new_bucket_or_geometry(qapp, monkeypatch):
+    calls = []
+    flatten = flattening.flatten_polygons
+    monkeypatch.setattr(flattening, "flatten_polygons",
+                        lambda path, tolerance: calls.append(tolerance) or flatten(path, tolerance))
+    template = PatternLibrary().get_template("Collar")
+    scene = QGraphicsScene()
+    piece = PatternPieceItem(template.generate_path())
+    scene.addItem(piece)
+    image = QImage(400, 300, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def render(source):
+        painter = QPainter(image)
+        scene.render(painter, QRectF(image.rect()), source)
+        painter.end()
+
+    bounds = piece.boundingRect()
+    for dx in range(5):  # панорамирование — масштаб тот же
+        render(bounds.translated(dx * 10, 0))
+    assert len(calls) == 1
+    render(QRectF(bounds.topLeft(), bounds.size() / 8))  # приближение
+    assert len(calls) == 2
+    piece.contains(piece.path().pointAtPercent(0.3))
+    assert len(calls) == 2  # hit-testing по ломаной последней ступени
+
+    piece.setPath(template.generate_path(width=30))
+    render(bounds)
+    assert len(calls) == 3
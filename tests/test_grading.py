@@ -0,0 +1,59 @@
+"""Градация: ряд размеров одним проходом и вставка комплекта одной командой."""
+import numpy as np
+import pytest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QUndoStack
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import grading, journal
+from app.core.pattern_templates import PatternLibrary, PX_PER_CM
+from app.core.template_batch import stack_paths
+from app.tools.pattern_item import PatternPieceItem
+from app.tools.pattern_tool import PatternTool
+
+
+def test_rules_offset_from_base_size():
+    table = grading.SizeTable()
+    rule = grading.GradeRule(2, steps={"XXL": 5})
+    offsets = [rule.offset(table, s) for s in table]
+    assert offsets == [-4, -2, 0, 2, 4, 9, 11, 13]
+    with pytest.raises(ValueError):
+        grading.SizeTable(base="XXXS")
+
+
+def test_nest_matches_each_size_built_separately():
+    sleeve = PatternLibrary().get_template("Sleeve")
+    table = grading.SizeTable().subset("S", "XL")
+    nest = grading.grade(sleeve, {"width": grading.GradeRule(2),
+                                  "height": grading.GradeRule(1)}, table, {"width": 36})
+    assert nest.sizes == ("S", "M", "L", "XL")
+    assert not nest.deltas[table.index("M")].any()
+    assert nest.size_params("XL")["width"] == 40
+    for size in nest.sizes:
+        expected = stack_paths([sleeve.generate_path(**nest.size_params(size))]).coords[0]
+        assert np.allclose(stack_paths([nest.path(size)]).coords[0], expected, atol=1e-6)
+    # Правый край оката XL — ровно 40 см
+    assert nest.path("XL").boundingRect().right() == pytest.approx(40 * PX_PER_CM)
+
+    with pytest.raises(ValueError):
+        grading.grade(sleeve, {"width": grading.GradeRule(-20)}, table)
+
+
+def test_nest_is_one_undo_step(qapp):
+    class Canvas:
+        scene = QGraphicsScene()
+        undo_stack = QUndoStack()
+
+    canvas = Canvas()
+    nest = grading.grade(PatternLibrary().get_template("Collar"),
+                         {"width": grading.GradeRule(1.5)})
+    items = PatternTool().place_nest(nest, QPointF(100, 100), canvas)
+
+    pieces = [i for i in canvas.scene.items() if isinstance(i, PatternPieceItem)]
+    assert len(pieces) == len(grading.SIZES) == len(items)
+    assert canvas.undo_stack.count() == 1
+    records = journal.command_records(canvas.undo_stack.command(0))
+    assert [r["op"] for r in records] == ["add"] * len(items)
+
+    canvas.undo_stack.undo()
+    assert not canvas.scene.items()
@@ -0,0 +1,168 @@
+"""Журнал автосохранения: запись команд undo_stack и восстановление."""
+import os
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPen, QColor, QTransform, QUndoStack
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import journal
+from app.core.commands import (AddItemCommand, RemoveItemsCommand, TransformCommand,
+                               EdgeCurveCommand, ChangePenCommand)
+from app.core.project_manager import ProjectManager
+from app.tools.pattern_item import PatternPieceItem
+from app.tools.graphics_items import SnappablePathItem
+
+
+def _triangle():
+    item = PatternPieceItem(None, vertices=[QPointF(0, 0), QPointF(100, 0), QPointF(50, 80)])
+    item.setPen(QPen(QColor(0, 0, 0), 2))
+    return item
+
+
+def _recover(project_path):
+    manager = ProjectManager()
+    data = manager.load_project(journal.recovery_base(project_path))
+    scene = QGraphicsScene()
+    manager.restore_scene(scene)
+    journal.replay_journal(project_path, scene, data)
+    return scene
+
+
+def _start(tmp_path, threshold=journal.COMPACT_THRESHOLD):
+    scene = QGraphicsScene(0, 0, 1000, 1000)
+    stack = QUndoStack()
+    base = _triangle()
+    scene.addItem(base)
+    project_path = str(tmp_path / "project.cld")
+    manager = ProjectManager()
+    manager.new_project(1000, 1000)
+    manager.capture_scene(scene)
+    manager.save_project(project_path)
+    project_journal = journal.ProjectJournal(scene, stack, threshold=threshold)
+    project_journal.open(project_path)
+    return scene, stack, base, project_path, project_journal
+
+
+def test_replay_after_crash(qapp, tmp_path):
+    scene, stack, base, project_path, _ = _start(tmp_path)
+
+    stack.push(TransformCommand(base, base.transform(), QTransform().scale(2, 1)))
+    stack.push(EdgeCurveCommand(base, 0, None, QPointF(50, -30)))
+    stack.push(ChangePenCommand(base, base.pen(), QPen(QColor(255, 0, 0), 3)))
+    added = SnappablePathItem(base.path())
+    stack.push(AddItemCommand(scene, added))
+    removed = _triangle()
+    stack.push(AddItemCommand(scene, removed))
+    stack.push(RemoveItemsCommand(scene, [removed]))
+    stack.undo()
+    stack.undo()  # удалённый вернулся, а потом снова отменено его добавление
+
+    # «Падение»: журнал не закрыт, файлы остаются на диске
+    assert journal.has_recovery(project_path)
+    recovered = _recover(project_path)
+
+    pieces = [i for i in recovered.items() if isinstance(i, PatternPieceItem)]
+    assert len(pieces) == 1
+    piece = pieces[0]
+    assert piece.transform() == QTransform().scale(2, 1)
+    assert piece._edge_controls[0] == QPointF(50, -30)
+    assert piece.pen().color() == QColor(255, 0, 0)
+    assert len([i for i in recovered.items() if type(i) is SnappablePathItem]) == 1
+
+
+def test_journal_grows_with_edit_not_project(qapp, tmp_path):
+    scene, stack, base, project_path, _ = _start(tmp_path)
+    for i in range(500):
+        scene.addItem(_triangle())
+    before = os.path.getsize(journal.journal_path(project_path))
+    stack.push(TransformCommand(base, base.transform(), QTransform().scale(2, 1)))
+    assert os.path.getsize(journal.journal_path(project_path)) - before < 512
+
+
+def test_compaction_keeps_later_records(qapp, tmp_path):
+    scene, stack, base, project_path, project_journal = _start(tmp_path, threshold=2048)
+    for i in range(20):
+        stack.push(AddItemCommand(scene, _triangle()))
+    project_journal.wait()
+    assert os.path.exists(journal.recovery_path(project_path))
+    project_journal.compact(wait=True)
+    assert os.path.getsize(journal.journal_path(project_path)) == 0
+    stack.push(TransformCommand(base, base.transform(), QTransform().scale(3, 3)))
+
+    recovered = _recover(project_path)
+    pieces = [i for i in recovered.items() if isinstance(i, PatternPieceItem)]
+    assert len(pieces) == 21
+    assert any(p.transform() == QTransform().scale(3, 3) for p in pieces)
+
+
+def test_failed_compaction_keeps_journal(qapp, tmp_path, monkeypatch):
+    scene, stack, base, project_path, project_journal = _start(tmp_path)
+    for i in range(3):
+        stack.push(AddItemCommand(scene, _triangle()))
+    size = os.path.getsize(journal.journal_path(project_path))
+
+    def fail(self, file_path, progress=None):
+        raise OSError("disk full")
+    monkeypatch.setattr(ProjectManager, "save_project", fail)
+    project_journal.compact(wait=True)
+    monkeypatch.undo()
+
+    assert os.path.getsize(journal.journal_path(project_path)) == size
+    recovered = _recover(project_path)
+    assert len([i for i in recovered.items() if isinstance(i, PatternPieceItem)]) == 4
+
+
+def test_clean_close_removes_journal(qapp, tmp_path):
+    scene, stack, base, project_path, project_journal = _start(tmp_path)
+    stack.push(TransformCommand(base, base.transform(), QTransform().scale(2, 1)))
+    project_journal.close()
+    assert not journal.has_recovery(project_path)
+
+
+def test_background_save_keeps_edits_made_during_save(qapp, tmp_path):
+    scene, stack, base, project_path, project_journal = _start(tmp_path)
+    stack.push(AddItemCommand(scene, _triangle()))
+
+    manager = ProjectManager()
+    manager.new_project(1000, 1000)
+    manager.capture_scene(scene)
+    seq, cut = project_journal.mark_checkpoint()
+    manager.current_project["journal_seq"] = seq
+    # Правка между снимком сцены и окончанием записи на диск
+    stack.push(TransformCommand(base, base.transform(), QTransform().scale(3, 3)))
+    manager.save_project(project_path)
+    project_journal.finish_checkpoint(cut)
+
+    recovered = _recover(project_path)
+    pieces = [i for i in recovered.items() if isinstance(i, PatternPieceItem)]
+    assert len(pieces) == 2
+    assert any(p.transform() == QTransform().scale(3, 3) for p in pieces)
+
+
+def test_edits_after_reopening_saved_project_are_recovered(qapp, tmp_path):
+    scene, stack, base, project_path, project_journal = _start(tmp_path)
+    for i in range(5):
+        stack.push(AddItemCommand(scene, _triangle()))
+    manager = ProjectManager()
+    manager.new_project(1000, 1000)
+    manager.capture_scene(scene)
+    seq, cut = project_journal.mark_checkpoint()
+    manager.current_project["journal_seq"] = seq
+    manager.save_project(project_path)
+    project_journal.finish_checkpoint(cut)
+    project_journal.close()
+
+    # Снова открыли сохранённый файл, три правки — и падение
+    reopened = ProjectManager()
+    data = reopened.load_project(project_path)
+    assert data["journal_seq"] == 5
+    scene = QGraphicsScene(0, 0, 1000, 1000)
+    reopened.restore_scene(scene)
+    stack = QUndoStack()
+    project_journal = journal.ProjectJournal(scene, stack)
+    project_journal.open(project_path, data.get("journal_seq", 0))
+    for i in range(3):
+        stack.push(AddItemCommand(scene, _triangle()))
+
+    recovered = _recover(project_path)
+    assert len([i for i in recovered.items() if isinstance(i, PatternPieceItem)]) == 9
@@ -0,0 +1,70 @@
+"""Метрики деталей: аналитические площадь/периметр, кэш и панель."""
+import math
+
+import pytest
+from PyQt6.QtCore import QPointF, QRectF
+from PyQt6.QtGui import QPainterPath, QTransform
+
+from app.core.measurements import MeasurementSystem
+from app.core.metrics import PathMetrics, path_segments
+from app.tools.pattern_item import PatternPieceItem
+from app.ui.canvas import Canvas
+from app.ui.panels.metrics_panel import MetricsPanel
+
+PX_PER_CM = MeasurementSystem.PX_PER_CM
+
+
+def test_metrics_match_closed_forms(qapp):
+    rect = QPainterPath()
+    rect.addRect(QRectF(10, 20, 100, 50))
+    m = PathMetrics.from_path(rect, QTransform.fromScale(2, 1))
+    assert m.area == pytest.approx(10000)
+    assert m.perimeter == pytest.approx(500)
+    assert m.edges == pytest.approx([200, 50, 200, 50])
+    assert (m.centroid.x(), m.centroid.y()) == pytest.approx((120, 45))
+
+    circle = QPainterPath()
+    circle.addEllipse(QPointF(50, 60), 40, 40)  # четыре кубические кривые
+    m = PathMetrics.from_path(circle)
+    # Отличие от окружности — погрешность самой аппроксимации Безье (~1e-4)
+    assert m.area == pytest.approx(math.pi * 1600, rel=1e-3)
+    assert m.perimeter == pytest.approx(2 * math.pi * 40, rel=1e-3)
+    assert (m.centroid.x(), m.centroid.y()) == pytest.approx((50, 60))
+    assert m.to_units(MeasurementSystem("mm"))["perimeter"] == pytest.approx(
+        m.perimeter / MeasurementSystem.PX_PER_MM)
+
+
+def test_piece_metrics_cached_per_geometry_and_transform(qapp):
+    vertices = [QPointF(0, 0), QPointF(100, 0), QPointF(100, 100), QPointF(0, 100)]
+    piece = PatternPieceItem(QPainterPath(), vertices=vertices)
+    first = piece.metrics()
+    assert piece.metrics() is first
+    assert first.area == pytest.approx(10000)
+
+    piece.setTransform(QTransform.fromScale(1, 2))
+    assert piece.metrics().area == pytest.approx(20000)
+
+    piece.set_edge_control(0, QPointF(50, -40))
+    curved = piece.metrics()
+    assert curved.area > 20000
+    # Замена одного ребра даёт те же метрики, что и полный пересчёт
+    segment = path_segments(piece.path(), piece.transform())[0]
+    assert first.with_edge(0, segment).edges[0] == pytest.approx(curved.edges[0])
+    assert first.with_edge(0, segment).edges[1:] == pytest.approx(first.edges[1:])
+
+
+def test_panel_sums_selected_pieces(qapp):
+    canvas = Canvas(2000, 2000)
+    panel = MetricsPanel(canvas, MeasurementSystem("cm"))
+    for i in range(200):
+        path = QPainterPath()
+        path.addRect(0, 0, 10 * PX_PER_CM, 5 * PX_PER_CM)
+        piece = PatternPieceItem(path)
+        piece.setPos(i * 10, 0)
+        canvas.scene.addItem(piece)
+        piece.setSelected(True)
+    panel.refresh()
+    assert panel.count_label.text() == "200"
+    assert panel.area_label.text() == "10000.0 cm²"
+    assert panel.perimeter_label.text() == "6000.0 cm"
+    assert panel.edges_tree.topLevelItemCount() == 0
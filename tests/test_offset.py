@@ -0,0 +1,93 @@
+"""Эквидистанта припуска: стили углов, ширины по рёбрам, сложные контуры."""
+import math
+
+import pytest
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QPainterPath, QPainterPathStroker, QPolygonF
+
+from app.core.offset import BEVEL, JOINS, MITRE, SQUARE, offset_path
+from app.core.pattern_templates import PatternLibrary
+
+
+def _polygon(points):
+    path = QPainterPath()
+    path.addPolygon(QPolygonF([QPointF(x, y) for x, y in points]))
+    path.closeSubpath()
+    return path
+
+
+def _points(path):
+    return {(round(path.elementAt(i).x, 6), round(path.elementAt(i).y, 6))
+            for i in range(path.elementCount())}
+
+
+def test_corner_styles_and_edge_widths(qapp):
+    square = QPainterPath()
+    square.addRect(QRectF(0, 0, 100, 100))
+    assert offset_path(square, 10, MITRE).boundingRect() == QRectF(-10, -10, 120, 120)
+    assert len(_points(offset_path(square, 10, MITRE))) == 4
+    assert len(_points(offset_path(square, 10, BEVEL))) == 8
+    # У острого угла квадратный угол отстоит от вершины на ширину припуска
+    triangle = _polygon([(0, 0), (100, 0), (0, 30)])
+    tip = offset_path(triangle, 10, SQUARE).boundingRect().right()
+    assert 110 <= tip < offset_path(triangle, 10, MITRE, mitre_limit=100).boundingRect().right()
+
+    # Рёбра addRect: верх, право, низ, лево; низ — подгибка 40
+    hem = offset_path(square, [10, 10, 40, 10], MITRE)
+    assert hem.boundingRect() == QRectF(-10, -10, 120, 150)
+
+
+def _round_offset(path, width):
+    stroker = QPainterPathStroker()
+    stroker.setWidth(2 * width)
+    stroker.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+    return path.united(stroker.createStroke(path))
+
+
+@pytest.mark.parametrize("name", ["Sleeve", "Collar", "comb"])
+def test_offset_covers_exact_allowance(qapp, name):
+    if name == "comb":
+        # Зубцы уже припуска: вогнутые углы с петлями на сыром контуре
+        points = []
+        for k in range(10):
+            points += [(k * 30, 0), (k * 30 + 10, 0), (k * 30 + 10, 100), (k * 30 + 30, 100)]
+        path = _polygon(points + [(300, 200), (0, 200)])
+    else:
+        path = PatternLibrary().get_template(name).generate_path()
+    width = 25
+    result = offset_path(path, width, MITRE, mitre_limit=100)
+    exact = _round_offset(path, width - 0.5)
+    rect = exact.boundingRect()
+    for i in range(60):
+        for j in range(60):
+            point = QPointF(rect.left() + rect.width() * i / 60, rect.top() + rect.height() * j / 60)
+            if exact.contains(point):
+                assert result.contains(point)
+    # Контур чистый: одна ломаная без петель, на порядок меньше узлов, чем у обводки
+    assert result.elementCount() < _round_offset(path, width).elementCount()
+
+
+def _area(polygon):
+    return sum(p.x() * q.y() - q.x() * p.y() for p, q in zip(polygon, list(polygon)[1:])) / 2
+
+
+@pytest.mark.parametrize("join", JOINS)
+def test_templates_give_one_outer_contour(qapp, join):
+    for template in PatternLibrary().get_all_templates():
+        path = template.generate_path()
+        polygons = offset_path(path, 37.8, join).toSubpathPolygons()
+        assert len(polygons) == 1, template.name
+        # Обход в ту же сторону, что у детали, и площадь больше её
+        assert _area(polygons[0]) > _area(path.toFillPolygon()) > 0, template.name
+
+
+def test_many_vertices_in_bounded_time(qapp):
+    import time
+    n = 5000
+    path = _polygon([(1000 + (800 + 3 * math.sin(k * 0.05)) * math.cos(2 * math.pi * k / n),
+                      1000 + (800 + 3 * math.sin(k * 0.05)) * math.sin(2 * math.pi * k / n))
+                     for k in range(n)])
+    start = time.perf_counter()
+    result = offset_path(path, 38)
+    assert time.perf_counter() - start < 2.0
+    assert result.boundingRect().width() == pytest.approx(2 * (803 + 38), abs=2)
@@ -0,0 +1,128 @@
+"""Параметрические детали: перестроение по параметрам вместе с оверлеями."""
+import pytest
+from PyQt6.QtGui import QUndoStack
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import journal, parametric, serialization
+from app.core.commands import ChangeParamsCommand
+from app.core.pattern_templates import PatternLibrary, PX_PER_CM
+from app.core.project_manager import ProjectManager
+from app.core.seams import LINK_KEY, compute_seam_path, stitch_path
+from app.tools.graphics_items import SnappablePathItem
+from app.tools.pattern_item import PatternPieceItem
+
+
+def _overlay(scene, source, link, path):
+    item = SnappablePathItem(path)
+    item.setData(LINK_KEY, dict(link, source=serialization.item_id(source)))
+    scene.addItem(item)
+    return item
+
+
+def _sleeve_scene():
+    scene = QGraphicsScene()
+    template = PatternLibrary().get_template("Sleeve")
+    piece = PatternPieceItem(template.cached_path(width=34), template=template,
+                             params={"width": 34})
+    scene.addItem(piece)
+    seam = _overlay(scene, piece, {"kind": "seam", "width": 38},
+                    compute_seam_path(piece.path(), 38))
+    stitch = _overlay(scene, seam, {"kind": "zigzag", "size": 6},
+                      stitch_path("Zigzag", seam.path(), 6))
+    return scene, piece, seam, stitch
+
+
+def test_edits_coalesce_and_update_dependents(qapp, monkeypatch):
+    scene, piece, seam, stitch = _sleeve_scene()
+    calls = []
+    regenerate = parametric.regenerate
+    monkeypatch.setattr(parametric, "regenerate",
+                        lambda items: calls.append(len(items)) or regenerate(items))
+
+    for width in range(35, 45):
+        piece.set_params({"width": width})
+    assert piece.path().boundingRect().width() == pytest.approx(34 * PX_PER_CM)
+    parametric.flush()
+
+    assert calls == [1]  # десять правок — одно перестроение
+    assert piece.path().boundingRect().width() == pytest.approx(44 * PX_PER_CM)
+    assert seam.path() == compute_seam_path(piece.path(), 38)
+    assert stitch.path() == stitch_path("Zigzag", seam.path(), 6)
+
+
+def test_params_survive_save_and_journal(qapp, tmp_path):
+    scene, piece, seam, _ = _sleeve_scene()
+    project_path = str(tmp_path / "project.cld")
+    manager = ProjectManager()
+    manager.new_project(2000, 2000)
+    manager.capture_scene(scene)
+    manager.save_project(project_path)
+    stack = QUndoStack()
+    project_journal = journal.ProjectJournal(scene, stack)
+    project_journal.open(project_path)
+
+    stack.push(ChangeParamsCommand(piece, piece.params, {"width": 40, "height": 50}))
+    parametric.flush()
+
+    loaded = ProjectManager()
+    data = loaded.load_project(journal.recovery_base(project_path))
+    restored = QGraphicsScene()
+    loaded.restore_scene(restored)
+    journal.replay_journal(project_path, restored, data)
+
+    pieces = [i for i in restored.items() if isinstance(i, PatternPieceItem)]
+    assert pieces[0].template.name == "Sleeve"
+    assert pieces[0].params == {"width": 40, "height": 50}
+    assert pieces[0].path() == piece.path()
+    seams = [i for i in restored.items()
+             if isinstance(i.data(LINK_KEY), dict) and i.data(LINK_KEY)["kind"] == "seam"]
+    assert seams[0].path() == seam.path()
+    project_journal.close()
+
+
+def test_size_panel_survives_scene_clear(qapp):
+    from app.ui.canvas import Canvas
+    from app.ui.panels.pattern_size_panel import PatternSizePanel
+
+    canvas = Canvas(4000, 4000)
+    panel = PatternSizePanel(canvas)
+    template = PatternLibrary().get_template("Sleeve")
+    piece = PatternPieceItem(template.cached_path(width=34), template=template,
+                             params={"width": 34})
+    canvas.scene.addItem(piece)
+    piece.setSelected(True)
+    qapp.processEvents()
+    assert panel.current_item is piece
+
+    # New/Open: scene.clear() удаляет выбранную деталь вместе с объектом C++
+    canvas.clear_scene()
+    qapp.processEvents()
+    assert panel.current_item is None
+    assert not panel.isEnabled()
+
+
+def test_replaced_placeholders_leave_canvas_registry(qapp, tmp_path):
+    from app.ui.canvas import Canvas
+
+    scene, piece, _, _ = _sleeve_scene()
+    project_path = str(tmp_path / "project.cld")
+    manager = ProjectManager()
+    manager.new_project(2000, 2000)
+    manager.capture_scene(scene)
+    manager.save_project(project_path)
+
+    loaded = ProjectManager()
+    loaded.load_project(project_path)
+    canvas = Canvas(2000, 2000)
+    placeholders = loaded.restore_scene(canvas.scene, lazy=True)
+    canvas.add_placeholders(placeholders)
+    stitch = next(i for i in placeholders if (i.data(LINK_KEY) or {}).get("kind") == "zigzag")
+    restored = serialization.replace_placeholder(
+        next(i for i in placeholders if i.data(LINK_KEY) is None))
+    # Строчку, привязанную к припуску, перестраивает и подменяет parametric
+    parametric.regenerate([restored])
+    assert stitch.scene() is None
+    assert stitch not in canvas._placeholders
+    assert all(i.scene() is canvas.scene for i in canvas._placeholders)
+    canvas.materialize_all()
+    assert not canvas._placeholders
@@ -0,0 +1,70 @@
+"""LRU-кэши геометрии: generate_path() и контуры припусков и строчек."""
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.pattern_templates import PathCache, PatternLibrary
+
+LIBRARY = PatternLibrary()
+
+
+def test_defaults_and_rounding_share_entry():
+    cache = PathCache(maxsize=4)
+    sleeve = LIBRARY.get_template("Sleeve")
+    first = cache.get(sleeve, {})
+    second = cache.get(sleeve, {"width": 34.0000000001, "height": 58})
+    assert first == second
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # Другой шаблон с теми же параметрами — другая запись
+    cache.get(LIBRARY.get_template("Pocket"), {"width": 34})
+    assert cache.stats()["misses"] == 2
+
+
+def test_returned_path_is_a_copy():
+    cache = PathCache()
+    sleeve = LIBRARY.get_template("Sleeve")
+    path = cache.get(sleeve, {})
+    original = path.elementCount()
+    path.lineTo(0, 0)
+    assert cache.get(sleeve, {}).elementCount() == original
+
+
+def test_lru_eviction_and_threads():
+    cache = PathCache(maxsize=3)
+    sleeve = LIBRARY.get_template("Sleeve")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda w: cache.get(sleeve, {"width": 25 + w % 5}), range(200)))
+    stats = cache.stats()
+    assert stats["size"] == 3
+    assert stats["hits"] + stats["misses"] == 200
+    cache.get(sleeve, {"width": 29})    # самая свежая запись на месте
+    assert cache.stats()["hits"] == stats["hits"] + 1
+
+
+def test_seam_geometry_shared_by_content(qapp):
+    from PyQt6.QtGui import QPainterPath
+    from app.core.seams import GEOMETRY_CACHE, compute_seam_path, stitch_path
+
+    GEOMETRY_CACHE.clear()
+    sleeve = LIBRARY.get_template("Sleeve")
+    first = compute_seam_path(sleeve.generate_path(), 38)
+    # Та же геометрия в другом объекте (пара детали) — попадание
+    again = compute_seam_path(QPainterPath(sleeve.generate_path()), 38)
+    assert again == first
+    assert GEOMETRY_CACHE.stats()["hits"] == 1
+    compute_seam_path(sleeve.generate_path(), 20)
+    stitch_path("Zigzag", first, 6)
+    stitch_path("Overlock", first, 6)
+    assert GEOMETRY_CACHE.stats()["misses"] == 4
+
+
+def test_seam_geometry_memory_limit(qapp):
+    from app.core.seams import GeometryCache, compute_seam_path
+
+    cache = GeometryCache(max_bytes=20_000)
+    path = LIBRARY.get_template("Sleeve").generate_path()
+    for width in range(10, 40):
+        cache.get(path, ("seam", float(width)), lambda p: compute_seam_path(p, width))
+    stats = cache.stats()
+    assert 0 < stats["bytes"] <= 20_000
+    assert stats["size"] < 30
+    cache.get(path, ("seam", 39.0), lambda p: None)   # самая свежая запись на месте
+    assert cache.stats()["hits"] == 1
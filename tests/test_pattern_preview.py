@@ -0,0 +1,62 @@
+"""Превью шаблона в PatternPanel: построение в фоне, только последнее значение."""
+import threading
+import time
+
+from PyQt6.QtGui import QPainterPath
+from PyQt6.QtWidgets import QSlider
+
+from app.core.pattern_templates import PatternTemplate
+from app.ui.panels.pattern_panel import PatternPanel
+from app.ui.panels.pattern_preview import PatternPreview
+
+
+def _wait(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+class _SlowSquare(PatternTemplate):
+    """Квадрат, который строится 20 мс и запоминает, в каком потоке."""
+
+    def __init__(self):
+        super().__init__("Slow Square", "Test")
+        self.built = []
+
+    def generate_path(self, side=10, **kwargs):
+        time.sleep(0.02)
+        self.built.append((side, threading.current_thread()))
+        path = QPainterPath()
+        path.addRect(0, 0, side, side)
+        return path
+
+    def get_parameters(self):
+        return [{"name": "side", "label": "Side", "min": 1, "max": 100, "default": 10}]
+
+
+def test_preview_builds_off_gui_thread_and_keeps_latest(qapp):
+    preview = PatternPreview()
+    template = _SlowSquare()
+    for side in range(1, 51):
+        preview.show_template(template, {"side": side})
+
+    assert _wait(qapp, lambda: preview.path is not None
+                 and preview.path.boundingRect().width() == 50)
+    assert preview.worker.dropped > 0
+    assert len(template.built) < 50
+    assert all(thread is not threading.main_thread() for _, thread in template.built)
+    preview.worker.stop()
+
+
+def test_panel_slider_updates_preview(qapp):
+    panel = PatternPanel()
+    assert _wait(qapp, lambda: panel.preview.path is not None)
+    slider = panel.params_widget.findChildren(QSlider)[0]
+    for value in range(slider.minimum(), slider.maximum() + 1):
+        slider.setValue(value)
+
+    expected = panel.current_template.cached_path(**panel.current_params).boundingRect()
+    assert _wait(qapp, lambda: panel.preview.path.boundingRect() == expected)
+    panel.preview.worker.stop()
@@ -0,0 +1,209 @@
+"""Сохранение и загрузка объектов сцены через ProjectManager."""
+import json
+import time
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPen, QColor, QBrush, QTransform
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core.pattern_templates import PatternLibrary
+from app.core.project_manager import ProjectManager
+from app.tools.pattern_item import PatternPieceItem
+from app.tools.graphics_items import SnappablePathItem, SnappableTextItem
+
+
+def _make_scene(piece_count=3):
+    scene = QGraphicsScene(0, 0, 4000, 3000)
+    templates = PatternLibrary().get_all_templates()
+    for i in range(piece_count):
+        template = templates[i % len(templates)]
+        item = PatternPieceItem(template.generate_path())
+        item.setPen(QPen(QColor(0, 0, 0), 2))
+        item.setBrush(QBrush(QColor(200, 220, 255, 100)))
+        item.setPos(i * 10, i * 5)
+        scene.addItem(item)
+
+    polygon = PatternPieceItem(None, vertices=[QPointF(0, 0), QPointF(100, 0), QPointF(50, 80)])
+    polygon.set_edge_control(1, QPointF(90, 60))
+    polygon.setTransform(QTransform().scale(-1.5, 2))
+    scene.addItem(polygon)
+
+    seam = SnappablePathItem(polygon.path())
+    seam.setData(0, "seam_allowance")
+    scene.addItem(seam)
+
+    label = SnappableTextItem("7")
+    label.setData(2, "part_number")
+    label.setPos(30, 40)
+    scene.addItem(label)
+    return scene
+
+
+def test_scene_round_trip(qapp, tmp_path):
+    scene = _make_scene()
+    manager = ProjectManager()
+    manager.new_project(4000, 3000)
+    manager.capture_scene(scene)
+    file_path = tmp_path / "project.cld"
+    assert manager.save_project(str(file_path))
+
+    loaded = ProjectManager()
+    assert loaded.load_project(str(file_path))
+    restored = QGraphicsScene()
+    items = loaded.restore_scene(restored)
+
+    assert len(items) == len(scene.items())
+    pieces = [i for i in items if isinstance(i, PatternPieceItem)]
+    assert len(pieces) == 4
+    polygon = next(i for i in pieces if i._vertices)
+    assert polygon._edge_controls == [None, QPointF(90, 60), None]
+    assert polygon.transform() == QTransform().scale(-1.5, 2)
+    original_polygon = next(i for i in scene.items()
+                            if isinstance(i, PatternPieceItem) and i._vertices)
+    assert polygon.path() == original_polygon.path()
+
+    originals = [i for i in scene.items() if isinstance(i, PatternPieceItem) and not i._vertices]
+    for original in originals:
+        match = next(i for i in pieces if i.pos() == original.pos())
+        assert match.path() == original.path()
+        assert match.pen().color() == original.pen().color()
+
+    seam = next(i for i in items if type(i) is SnappablePathItem)
+    assert seam.data(0) == "seam_allowance"
+    label = next(i for i in items if isinstance(i, SnappableTextItem))
+    assert label.toPlainText() == "7" and label.data(2) == "part_number"
+
+
+def test_large_marker_is_fast_and_compact(qapp, tmp_path):
+    scene = _make_scene(piece_count=2000)
+    manager = ProjectManager()
+    manager.new_project(4000, 3000)
+    file_path = tmp_path / "marker.cld"
+
+    start = time.perf_counter()
+    manager.capture_scene(scene)
+    manager.save_project(str(file_path))
+    loaded = ProjectManager()
+    loaded.load_project(str(file_path))
+    items = loaded.restore_scene(QGraphicsScene())
+    elapsed = time.perf_counter() - start
+
+    assert len(items) == 2003
+    assert elapsed < 1.0
+    # Геометрия — одна бинарная секция, а не JSON-объект на точку
+    data = json.loads(file_path.read_text())
+    assert "x" not in json.dumps(data["objects"][0])
+    assert file_path.stat().st_size < 2_000_000
+
+
+def test_lazy_restore_decodes_only_visible(qapp, tmp_path):
+    from PyQt6.QtCore import QRectF
+    from app.core.serialization import PlaceholderItem
+    from app.ui.canvas import Canvas
+
+    scene = _make_scene(piece_count=200)
+    for i, item in enumerate(scene.items()):
+        item.setPos((i % 20) * 2000, (i // 20) * 2000)
+    manager = ProjectManager()
+    manager.new_project(40000, 40000)
+    manager.capture_scene(scene)
+    file_path = tmp_path / "marker.cld"
+    manager.save_project(str(file_path))
+
+    loaded = ProjectManager()
+    loaded.load_project(str(file_path))
+    canvas = Canvas(40000, 40000)
+    items = loaded.restore_scene(canvas.scene, lazy=True)
+    canvas.add_placeholders(items)
+    assert all(isinstance(i, PlaceholderItem) for i in items)
+
+    canvas.materialize_rect(QRectF(0, 0, 2500, 1500))
+    real = [i for i in canvas.scene.items() if not isinstance(i, PlaceholderItem)]
+    assert 0 < len(real) < 10
+
+    # Незадекодированные объекты сохраняются без потерь
+    resaved = ProjectManager()
+    resaved.new_project(40000, 40000)
+    resaved.capture_scene(canvas.scene)
+    canvas.materialize_all()
+    assert not any(isinstance(i, PlaceholderItem) for i in canvas.scene.items())
+    again = QGraphicsScene()
+    restored = resaved.restore_scene(again)
+    assert len(restored) == len(scene.items())
+    originals = {i.data(3): i for i in scene.items()}
+    for item in restored:
+        original = originals[item.data(3)]
+        assert item.pos() == original.pos()
+        if hasattr(item, 'path'):
+            assert item.path() == original.path()
+
+
+
+def test_remove_all_seams_reaches_lazy_pieces(qapp, tmp_path):
+    from app.core.serialization import PlaceholderItem
+    from app.ui.canvas import Canvas
+    from app.ui.panels.seam_panel import SeamAllowancePanel
+
+    scene = _make_scene()
+    manager = ProjectManager()
+    manager.new_project(4000, 3000)
+    manager.capture_scene(scene)
+    file_path = tmp_path / "marker.cld"
+    manager.save_project(str(file_path))
+
+    loaded = ProjectManager()
+    loaded.load_project(str(file_path))
+    canvas = Canvas(4000, 3000)
+    canvas.add_placeholders(loaded.restore_scene(canvas.scene, lazy=True))
+    panel = SeamAllowancePanel(canvas)
+    panel._remove_all()
+
+    items = canvas.scene.items()
+    assert not any(isinstance(i, PlaceholderItem) for i in items)
+    assert not [i for i in items if i.data(0) == "seam_allowance"]
+    canvas.undo_stack.undo()
+    assert len([i for i in canvas.scene.items() if i.data(0) == "seam_allowance"]) == 1
+
+def test_sidecar_geometry_is_memory_mapped(qapp, tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    from pathlib import Path
+    from app.core import serialization
+
+    monkeypatch.setattr(serialization, "SIDECAR_MIN_ELEMENTS", 100)
+    scene = _make_scene(piece_count=50)
+    manager = ProjectManager()
+    manager.new_project(4000, 3000)
+    manager.capture_scene(scene)
+    file_path = tmp_path / "big.cld"
+    manager.save_project(str(file_path))
+    manager.capture_scene(scene)
+    manager.save_project(str(file_path))
+
+    # Старый файл-спутник удалён, в JSON — только ссылка на новый
+    sidecars = list(tmp_path.glob("big.cld.*.geom"))
+    assert len(sidecars) == 1
+    data = json.loads(file_path.read_text())
+    assert data["geometry"]["file"] == sidecars[0].name
+
+    loaded = ProjectManager()
+    loaded.load_project(str(file_path))
+    assert isinstance(loaded.geometry_reader.coords, memoryview)
+    items = loaded.restore_scene(QGraphicsScene())
+    assert len(items) == len(scene.items())
+
+    # Утилиты читают проект без QApplication
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[2]);"
+        "from app.core.project_file import ProjectFile;"
+        "from PyQt6.QtGui import QGuiApplication;"
+        "p = ProjectFile(sys.argv[1]);"
+        "assert QGuiApplication.instance() is None;"
+        "s = p.statistics(); print(s['objects'], s['by_type']['piece']);"
+        "assert not p.render_thumbnail(64).isNull()"
+    )
+    root = str(Path(__file__).resolve().parent.parent)
+    result = subprocess.run([sys.executable, "-c", script, str(file_path), root],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == [str(len(scene.items())), "51"]
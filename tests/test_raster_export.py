@@ -0,0 +1,69 @@
+"""Растровый экспорт плитками: содержимое, формат и лимит памяти."""
+import os
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QImage, QPen, QBrush, QColor
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import raster_export
+from app.core.project_manager import ProjectManager
+from app.tools.pattern_item import PatternPieceItem
+
+
+def _manager():
+    scene = QGraphicsScene(0, 0, 1200, 900)
+    for i in range(12):
+        item = PatternPieceItem(None, vertices=[QPointF(0, 0), QPointF(200, 0), QPointF(100, 150)])
+        item.setPen(QPen(QColor(255, 0, 0), 2))
+        item.setBrush(QBrush(QColor(0, 0, 255)))
+        item.setPos(i % 4 * 300, i // 4 * 300)
+        scene.addItem(item)
+    manager = ProjectManager()
+    manager.new_project(1200, 900)
+    manager.capture_scene(scene)
+    return manager
+
+
+def test_png_and_tiff_match(qapp, tmp_path):
+    manager = _manager()
+    png, tiff = str(tmp_path / "out.png"), str(tmp_path / "out.tif")
+    # Маленький лимит: много узких полос, несколько плиток в каждой
+    assert manager.export_image(png, dpi=200, memory_limit=2 * 1024 * 1024, workers=3)
+    assert manager.export_image(tiff, dpi=200, workers=3)
+
+    image = QImage(png)
+    scale = 200 / raster_export.SCENE_DPI
+    assert image.width() == round(1200 * scale) and image.height() == round(900 * scale)
+    assert round(image.dotsPerMeterX() * 0.0254) == 200
+    # Центр детали залит, промежуток между деталями — фон
+    assert QColor(image.pixel(round(100 * scale), round(75 * scale))) == QColor(0, 0, 255)
+    assert QColor(image.pixel(round(250 * scale), round(250 * scale))) == QColor(255, 255, 255)
+    fmt = QImage.Format.Format_RGB32
+    assert QImage(tiff).convertToFormat(fmt) == image.convertToFormat(fmt)
+
+
+def test_memory_limit_bounds_bands(qapp):
+    manager = _manager()
+    limit = 4 * 1024 * 1024
+    exporter = raster_export.RasterExporter(manager.current_project, manager._reader(),
+                                            dpi=600, memory_limit=limit)
+    exporter.prepare()
+    band_bytes = exporter.width * exporter.tile_height * raster_export._BYTES_PER_PIXEL
+    assert exporter.tile_height < raster_export.TILE_SIZE
+    assert exporter.geometry_bytes > 0
+    assert band_bytes * exporter.bands_in_flight + exporter.geometry_bytes <= limit
+
+    # Очень широкое изображение: полоса сжимается до нескольких строк, а
+    # не остаётся не ниже прежнего минимума в 8 строк
+    limit = 7000 * 5 * raster_export._BYTES_PER_PIXEL
+    wide = raster_export.RasterExporter(dict(manager.current_project, width=7000),
+                                        manager._reader(), dpi=96, memory_limit=limit)
+    assert wide.tile_height == 5
+    assert wide.width * wide.tile_height * raster_export._BYTES_PER_PIXEL <= limit
+
+
+def test_cancel_leaves_no_file(qapp, tmp_path):
+    manager = _manager()
+    path = str(tmp_path / "out.png")
+    assert not manager.export_image(path, dpi=300, cancelled=lambda: True)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,140 @@
+"""Припуск, привязанный к детали: следует за ней и пересчитывает только
+изменившиеся рёбра."""
+import pytest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainterPath, QTransform, QUndoStack
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core import serialization
+from app.core.commands import AddItemCommand, EdgeCurveCommand, RemoveItemsCommand
+from app.core.project_manager import ProjectManager
+from app.core.seams import compute_seam_path
+from app.tools.pattern_item import PatternPieceItem
+from app.tools.seam_item import SeamAllowanceItem
+from app.ui.canvas import Canvas
+from app.ui.panels.seam_panel import PX_PER_MM, SeamAllowancePanel
+
+
+def _piece_with_seam():
+    scene = QGraphicsScene()
+    stack = QUndoStack()
+    vertices = [QPointF(0, 0), QPointF(200, 0), QPointF(200, 300), QPointF(0, 300)]
+    piece = PatternPieceItem(QPainterPath(), vertices=vertices)
+    scene.addItem(piece)
+    link = {"source": serialization.item_id(piece), "kind": "seam", "width": 20.0,
+            "join": "mitre"}
+    seam = SeamAllowanceItem(link=link, source=piece)
+    stack.push(AddItemCommand(scene, seam))
+    return scene, stack, piece, seam
+
+
+def test_seam_follows_piece_and_recomputes_changed_edges(qapp):
+    scene, stack, piece, seam = _piece_with_seam()
+    assert seam.path() == compute_seam_path(piece.path(), 20.0)
+
+    piece.setPos(50, 70)
+    piece.setTransform(QTransform.fromScale(-1, 2))
+    assert seam.sceneTransform() == piece.sceneTransform()
+
+    stack.push(EdgeCurveCommand(piece, 1, None, QPointF(300, 150)))
+    # Выгнутое ребро и угол следующего за ним, остальное — из кэша
+    assert seam._offset.computed == 2
+    assert seam.path() == compute_seam_path(piece.path(), 20.0)
+    assert seam.path().boundingRect().right() > 250
+
+    stack.undo()
+    assert seam.path() == compute_seam_path(piece.path(), 20.0)
+
+
+def test_seam_returns_with_undo(qapp):
+    scene, stack, piece, seam = _piece_with_seam()
+    stack.push(RemoveItemsCommand(scene, [seam, piece]))
+    assert seam.scene() is None and piece.scene() is None
+    stack.undo()
+    assert seam.parentItem() is piece and seam.scene() is scene
+
+    stack.undo()   # припуск снят, затем ребро выгнуто без него
+    piece.set_edge_control(0, QPointF(100, -80))
+    stack.redo()
+    assert seam.parentItem() is piece
+    assert seam.path() == compute_seam_path(piece.path(), 20.0)
+
+
+def test_seam_reattached_after_load(qapp):
+    scene, stack, piece, seam = _piece_with_seam()
+    piece.setPos(40, 10)
+    piece.setTransform(QTransform.fromScale(2, 1))
+    manager = ProjectManager()
+    manager.new_project(2000, 2000)
+    data = manager.capture_scene(scene)
+    records = [r for r in data["objects"] if r["type"] == "path"]
+    assert records[0]["pos"] == [40, 10]
+
+    for lazy in (False, True):
+        restored = QGraphicsScene()
+        items = manager.restore_scene(restored, lazy=lazy)
+        pieces = [i for i in items if not serialization.is_seam(i)]
+        seams = [i for i in items if serialization.is_seam(i)]
+        assert seams[0].parentItem() is pieces[0]
+        if lazy:
+            new_piece = serialization.replace_placeholder(pieces[0])
+            new_seam = serialization.replace_placeholder(new_piece.childItems()[0])
+            assert isinstance(new_seam, SeamAllowanceItem)
+            assert new_seam.parentItem() is new_piece
+            seams = [new_seam]
+        assert seams[0].sceneBoundingRect() == seam.sceneBoundingRect()
+
+
+def test_panel_adds_marker_seams_in_one_step(qapp):
+    canvas = Canvas(4000, 4000)
+    panel = SeamAllowancePanel(canvas)
+    pieces = []
+    for i in range(200):
+        vertices = [QPointF(0, 0), QPointF(100, 0), QPointF(60, 90)]
+        piece = PatternPieceItem(QPainterPath(), vertices=vertices)
+        piece.setPos(i % 20 * 150, i // 20 * 150)
+        canvas.scene.addItem(piece)
+        piece.setSelected(True)
+        pieces.append(piece)
+
+    panel._apply()
+    panel.cancel()
+    panel.wait()
+    assert canvas.undo_stack.count() == 0
+    assert not any(p.childItems() for p in pieces)
+
+    panel._apply()
+    panel.wait()
+    assert canvas.undo_stack.count() == 1
+    assert all(len(p.childItems()) == 1 for p in pieces)
+    seam = pieces[7].childItems()[0]
+    assert seam.path() == compute_seam_path(pieces[7].path(), panel.spin.value() * 96 / 25.4)
+    canvas.undo_stack.undo()
+    assert not any(p.childItems() for p in pieces)
+
+
+def test_edge_widths_follow_metrics_numbering(qapp):
+    from PyQt6.QtCore import QRectF
+    from app.core.metrics import PathMetrics, path_segments
+
+    # Низ — дуга в 180°: два сегмента пути, одно ребро в панели метрик
+    path = QPainterPath(QPointF(0, 0))
+    path.lineTo(200, 0)
+    path.lineTo(200, 100)
+    path.arcTo(QRectF(0, 0, 200, 200), 0, -180)
+    path.closeSubpath()
+    piece = PatternPieceItem(path)
+    edges = PathMetrics.from_path(path).edges
+    assert len(path_segments(path)) == 5 and len(edges) == 4
+    assert piece.metrics().edges == edges
+
+    canvas = Canvas(4000, 4000)
+    panel = SeamAllowancePanel(canvas)
+    canvas.scene.addItem(piece)
+    piece.setSelected(True)
+    panel.edges_edit.setText("3=30")
+    panel._apply()
+    panel.wait()
+    widths = piece.childItems()[0].link["widths"]
+    default, bottom = panel.spin.value() * PX_PER_MM, 30 * PX_PER_MM
+    assert widths == pytest.approx([default, default, bottom, bottom, default])
@@ -0,0 +1,98 @@
+"""Сверка длин сшиваемых рёбер: расчёт и живое обновление при перетаскивании."""
+import math
+
+import pytest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainterPath, QTransform
+
+from app.core import metrics
+from app.core.measurements import MeasurementSystem
+from app.tools.pattern_item import PatternPieceItem
+from app.ui.canvas import Canvas
+from app.ui.panels.seam_match_panel import SeamMatchPanel
+
+PX_PER_CM = MeasurementSystem.PX_PER_CM
+
+
+def _square(side_cm):
+    side = side_cm * PX_PER_CM
+    return PatternPieceItem(QPainterPath(), vertices=[
+        QPointF(0, 0), QPointF(side, 0), QPointF(side, side), QPointF(0, side)])
+
+
+def test_seam_match_ease_and_notches():
+    match = metrics.seam_match(40.0, 42.0, notches=3)
+    assert match["difference"] == pytest.approx(2.0)
+    assert match["ease"] == pytest.approx(5.0)
+    assert match["notches"] == pytest.approx([(10, 10.5), (20, 21), (30, 31.5)])
+
+
+def test_panel_follows_edge_drag_incrementally(qapp, monkeypatch):
+    canvas = Canvas(2000, 2000)
+    panel = SeamMatchPanel(canvas, MeasurementSystem("cm"))
+    armhole, sleeve = _square(20), _square(20)
+    canvas.scene.addItem(armhole)
+    canvas.scene.addItem(sleeve)
+    panel.pick(0, armhole, edge=0)
+    panel.pick(1, sleeve, edge=0)
+    assert panel.ease_label.text() == "+0.0%"
+
+    integrated = []
+    terms = metrics.segment_terms
+    monkeypatch.setattr(metrics, "segment_terms",
+                        lambda segment: integrated.append(segment) or terms(segment))
+    # Как при перетаскивании хендла ребра (_preview_edge_curve)
+    sleeve.set_edge_control(0, QPointF(10 * PX_PER_CM, -6 * PX_PER_CM))
+    qapp.processEvents()
+    assert len(integrated) == 1  # пересчитано только выгнутое ребро
+    curved = sleeve.metrics().edges[0]
+    assert panel.length_labels[1].text() == f"{curved / PX_PER_CM:.1f} cm"
+    assert panel.ease_label.text() == f"{(curved / (20 * PX_PER_CM) - 1) * 100:+.1f}%"
+
+    # Ресайз угла — трансформ детали A
+    armhole.setTransform(QTransform.fromScale(1.1, 1))
+    qapp.processEvents()
+    assert panel.length_labels[0].text() == "22.0 cm"
+
+
+def test_edges_follow_pattern_not_path_segments(qapp):
+    from PyQt6.QtCore import QRectF
+    from app.core.pattern_templates import PatternLibrary
+
+    # Полукруг: дуга в 180° — две кубические кривые, но одно ребро
+    path = QPainterPath(QPointF(0, 50))
+    path.arcTo(QRectF(0, 0, 100, 100), 180, -180)
+    path.closeSubpath()
+    piece = PatternPieceItem(path)
+    assert len(metrics.path_segments(path)) == 3
+    # Кубические кривые Qt приближают дугу с точностью лучше 0.1%
+    assert piece.metrics().edges == pytest.approx([50 * math.pi, 100], rel=1e-3)
+
+    circle = QPainterPath()
+    circle.addEllipse(QRectF(0, 0, 100, 100))
+    assert len(PatternPieceItem(circle).metrics().edges) == 1
+
+    # Скругления кармана — свои рёбра между прямыми сторонами
+    pocket = PatternLibrary().get_template("Pocket")
+    assert len(PatternPieceItem(pocket.generate_path()).metrics().edges) == 8
+
+    canvas = Canvas(2000, 2000)
+    panel = SeamMatchPanel(canvas, MeasurementSystem("cm"))
+    canvas.scene.addItem(piece)
+    panel.pick(0, piece, edge=0)
+    assert panel.edge_spins[0].maximum() == 2
+
+
+def test_panel_survives_scene_clear(qapp):
+    canvas = Canvas(2000, 2000)
+    panel = SeamMatchPanel(canvas, MeasurementSystem("cm"))
+    piece = _square(20)
+    canvas.scene.addItem(piece)
+    panel.pick(0, piece, edge=0)
+    assert panel.length_labels[0].text() == "20.0 cm"
+
+    # New/Open: scene.clear() удаляет деталь вместе с объектом C++
+    canvas.clear_scene()
+    qapp.processEvents()
+    assert panel.pieces == [None, None]
+    assert panel.length_labels[0].text() == "—"
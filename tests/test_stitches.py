@@ -0,0 +1,97 @@
+"""Отметки строчек: расстановка стежков по длине дуги и отрисовка только
+видимых стежков."""
+import math
+import time
+
+import pytest
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core.measurements import MeasurementSystem
+from app.core.project_file import ProjectFile
+from app.core.project_manager import ProjectManager
+from app.core.seams import make_overlock_path, make_zigzag_path, sample_path
+from app.tools.stitch_item import StitchMarkItem
+
+
+def _points(path):
+    return [(path.elementAt(i).x, path.elementAt(i).y) for i in range(path.elementCount())]
+
+
+def test_stitch_directions_on_straight_seam(qapp):
+    line = QPainterPath()
+    line.moveTo(0, 0)
+    line.lineTo(100, 0)
+    # Нормаль (dy, -dx) — как у прежнего angleAtPercent() + 90°: вверх экрана
+    zigzag = _points(make_zigzag_path(line, 5, 10))
+    assert len(zigzag) == 11
+    assert zigzag[:3] == pytest.approx([(0, -5), (10, 5), (20, -5)])
+    overlock = _points(make_overlock_path(line, 4, 50))
+    assert overlock[:2] == pytest.approx([(0, 0), (2, -4 * math.sqrt(3) / 2)])
+
+
+def test_long_curved_hem_sampled_evenly_and_fast(qapp):
+    hem = QPainterPath()
+    hem.moveTo(0, 0)
+    for k in range(20):
+        hem.cubicTo(k * 950 + 300, 200, k * 950 + 600, -200, (k + 1) * 950, 0)
+    step = 2 * MeasurementSystem.PX_PER_MM
+    start = time.perf_counter()
+    x, y, dx, dy = sample_path(hem, step)
+    make_zigzag_path(hem, 3, step)
+    assert time.perf_counter() - start < 0.5
+    assert len(x) * step == pytest.approx(hem.length(), rel=1e-3)
+    # Соседние стежки на одном расстоянии и на кривых (хорда ≤ шага)
+    chords = [math.hypot(x[i + 1] - x[i], y[i + 1] - y[i]) for i in range(len(x) - 1)]
+    assert min(chords) > 0.98 * step and max(chords) <= step + 1e-6
+    assert dx ** 2 + dy ** 2 == pytest.approx(1)
+
+
+def _hem_mark(kind="zigzag"):
+    hem = QPainterPath()
+    hem.moveTo(0, 0)
+    hem.lineTo(20000, 0)
+    mark = StitchMarkItem(hem, {"source": "hem", "kind": kind, "size": 6.0})
+    mark.setPen(QPen(QColor(60, 120, 220), 1.5))
+    return mark
+
+
+def test_mark_draws_only_visible_stitches_and_collapses_when_zoomed_out(qapp, monkeypatch):
+    mark = _hem_mark()
+    drawn = []
+    visible = StitchMarkItem.visible_stitches
+    monkeypatch.setattr(StitchMarkItem, "visible_stitches",
+                        lambda self, rect: drawn.append(visible(self, rect)) or drawn[-1])
+    scene = QGraphicsScene()
+    scene.addItem(mark)
+    image = QImage(200, 100, QImage.Format.Format_RGB32)
+
+    for target, source in ((QRectF(0, 0, 200, 100), QRectF(1000, -50, 200, 100)),
+                           (QRectF(0, 0, 200, 100), QRectF(0, -5000, 20000, 10000))):
+        painter = QPainter(image)
+        scene.render(painter, target, source)
+        painter.end()
+    # Крупно — около 22 стежков из 2222, мелко — только линия шва
+    assert len(drawn) == 1
+    assert 20 <= len(drawn[0]) <= 25
+    assert len(mark.stitch_segments()[0]) > 2000
+
+
+def test_mark_saves_seam_line_and_exports_full_stitches(qapp):
+    mark = _hem_mark("overlock")
+    mark.setData(1, "seam_style")
+    scene = QGraphicsScene()
+    scene.addItem(mark)
+    manager = ProjectManager()
+    manager.new_project(2000, 2000)
+    data = manager.capture_scene(scene)
+    record = data["objects"][0]
+    assert record["procedural"]
+
+    restored_scene = QGraphicsScene()
+    restored = manager.restore_scene(restored_scene)[0]
+    assert isinstance(restored, StitchMarkItem)
+    assert restored.path() == mark.path()
+    exported = ProjectFile.from_data(data, manager._reader()).local_path(record)
+    assert exported == make_overlock_path(mark.path(), 6.0, 9.0)
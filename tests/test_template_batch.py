@@ -0,0 +1,73 @@
+"""Пакетное построение шаблонов (generate_batch) против generate_path()."""
+import numpy as np
+import pytest
+from PyQt6.QtGui import QPainterPath
+
+from app.core.pattern_templates import PatternLibrary, PatternTemplate, PX_PER_CM
+from app.core.template_batch import stack_paths
+
+
+def test_batch_matches_generate_path():
+    rng = np.random.default_rng(1)
+    for template in PatternLibrary().get_all_templates():
+        params = {p["name"]: rng.uniform(p["min"], p["max"], 20)
+                  for p in template.get_parameters()}
+        batch = template.generate_batch(**params)
+        expected = stack_paths([
+            template.generate_path(**{k: v[i] for k, v in params.items()}) for i in range(20)
+        ])
+        assert np.array_equal(batch.types, expected.types), template.name
+        assert np.allclose(batch.coords, expected.coords, atol=1e-6), template.name
+        assert np.allclose(stack_paths([batch.path(3)]).coords[0], expected.coords[3], atol=1e-6)
+
+
+def test_scalars_broadcast_and_inputs_untouched():
+    sleeve = PatternLibrary().get_template("Sleeve")
+    widths = np.array([30.0, 34.0, 40.0])
+    batch = sleeve.generate_batch(width=widths, height=60)
+    assert widths.tolist() == [30.0, 34.0, 40.0]
+    assert len(batch) == 3
+    # Правый край оката — ровно ширина рукава
+    assert np.allclose(batch.vertices[:, 1, 0], widths * PX_PER_CM)
+    with pytest.raises(ValueError):
+        sleeve.generate_batch(width=widths, height=np.array([50.0, 60.0]))
+
+
+def test_template_without_draw_falls_back():
+    class Square(PatternTemplate):
+        def __init__(self):
+            super().__init__("Square", "Test")
+
+        def generate_path(self, side=10, **kwargs):
+            path = QPainterPath()
+            path.addRect(0, 0, side, side)
+            return path
+
+        def get_parameters(self):
+            return [{"name": "side", "label": "Side", "min": 1, "max": 20, "default": 10}]
+
+    batch = Square().generate_batch(side=np.array([1.0, 2.0]))
+    assert batch.coords.shape == (2, 5, 2)
+    assert batch.coords[1, 2].tolist() == [2.0, 2.0]
+
+
+@pytest.mark.parametrize("start, sweep", [(45, 90), (45, -200), (-30, 75), (30, -360)])
+def test_arc_splits_like_qt(start, sweep):
+    from PyQt6.QtCore import QRectF
+    from app.core.template_batch import BatchPath
+
+    widths = np.array([80.0, 100.0, 140.0])
+    batch = BatchPath(3)
+    batch.moveTo(0, 0)
+    batch.arcTo(10, 20, widths, 60, start, sweep)
+    batch = batch.finish()
+    expected = []
+    for width in widths:
+        path = QPainterPath()
+        path.moveTo(0, 0)
+        path.arcTo(QRectF(10, 20, width, 60), start, sweep)
+        expected.append(path)
+    expected = stack_paths(expected)
+    # Дуга режется по четвертям эллипса, а не на равные части
+    assert np.array_equal(batch.types, expected.types)
+    assert np.allclose(batch.coords, expected.coords, atol=1e-9)
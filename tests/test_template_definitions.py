@@ -0,0 +1,63 @@
+"""Файлы определений шаблонов: заголовки при запуске, программа — по требованию."""
+import pytest
+
+from app.core.pattern_templates import PatternLibrary, PX_PER_CM, BUILTIN_TEMPLATES_DIR
+from app.core.template_definitions import DefinitionError, load_catalogue
+
+TRIANGLE = """\
+# Треугольник для тестов
+name: {name}
+category: Test Shapes
+param base: Base (cm), 5..50, 20
+param height: Height (cm), 5..50, 10
+
+program:
+let half = base / 2
+move 0, height
+line half, 0
+line base, height
+{last}
+"""
+
+
+def _write(directory, file_name, name="Triangle", last="close"):
+    path = directory / file_name
+    path.write_text(TRIANGLE.format(name=name, last=last), encoding="utf-8")
+    return path
+
+
+def test_builtin_catalogue():
+    library = PatternLibrary()
+    assert library.get_categories() == ["Sleeves", "Collars", "Pockets", "Skirts",
+                                        "Trousers", "Bodice"]
+    assert not library.errors
+    path = library.get_template("Pocket").generate_path(width=18)
+    assert path.boundingRect().width() == pytest.approx(18 * PX_PER_CM)
+
+
+def test_house_catalogue_adds_and_overrides(tmp_path):
+    _write(tmp_path, "a_triangle.pattern")
+    _write(tmp_path, "b_sleeve.pattern", name="Sleeve")
+    library = PatternLibrary([BUILTIN_TEMPLATES_DIR, str(tmp_path)])
+    triangle = library.get_template("Triangle")
+    # Шаблон с именем встроенного заменяет его (вместе с категорией)
+    assert library.get_template("Sleeve").path.startswith(str(tmp_path))
+    assert [t.name for t in library.get_templates_by_category("Test Shapes")] == [
+        "Sleeve", "Triangle"]
+    assert "Sleeves" not in library.get_categories()
+
+    assert not triangle.is_compiled  # при запуске прочитан только заголовок
+    rect = triangle.generate_path(base=30).boundingRect()
+    assert triangle.is_compiled
+    assert (rect.width(), rect.height()) == pytest.approx((30 * PX_PER_CM, 10 * PX_PER_CM))
+
+
+def test_errors_point_to_file_and_line(tmp_path):
+    _write(tmp_path, "broken.pattern", last="line base, depth")
+    (tmp_path / "no_program.pattern").write_text("name: X\ncategory: Y\n", encoding="utf-8")
+    templates, errors = load_catalogue(str(tmp_path))
+    assert [e[0].endswith("no_program.pattern") for e in errors] == [True]
+    # Заголовок исправен — ошибка программы видна при первом построении
+    with pytest.raises(DefinitionError) as info:
+        templates[0].generate_path()
+    assert info.value.line == 12 and "depth" in str(info.value)
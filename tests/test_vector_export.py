@@ -0,0 +1,70 @@
+"""Потоковый экспорт в SVG/PDF: единицы, категории объектов, структура PDF."""
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtGui import QPen, QColor
+from PyQt6.QtWidgets import QGraphicsScene
+
+from app.core.measurements import MeasurementSystem
+from app.core.project_manager import ProjectManager
+from app.tools.graphics_items import SnappablePathItem, SnappableTextItem
+from app.tools.pattern_item import PatternPieceItem
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _manager():
+    scene = QGraphicsScene(0, 0, MeasurementSystem.PX_PER_CM * 150, MeasurementSystem.PX_PER_CM * 100)
+    piece = PatternPieceItem(None, vertices=[QPointF(0, 0), QPointF(MeasurementSystem.PX_PER_CM * 10, 0),
+                                             QPointF(0, MeasurementSystem.PX_PER_CM * 20)])
+    piece.setPen(QPen(QColor(0, 0, 0), 2))
+    scene.addItem(piece)
+    seam = SnappablePathItem(piece.path())
+    seam.setPen(QPen(QColor(210, 50, 50), 1.5, Qt.PenStyle.DashLine))
+    seam.setData(0, "seam_allowance")
+    scene.addItem(seam)
+    label = SnappableTextItem("Перед 1")
+    label.setPos(30, 30)
+    scene.addItem(label)
+    manager = ProjectManager()
+    manager.new_project(scene.width(), scene.height())
+    manager.capture_scene(scene)
+    return manager
+
+
+def test_svg_in_real_units(qapp, tmp_path):
+    path = str(tmp_path / "out.svg")
+    assert _manager().export_vector(path, unit="cm")
+    root = ET.parse(path).getroot()
+    assert root.get("width") == "150cm" and root.get("height") == "100cm"
+    assert root.get("viewBox") == "0 0 150 100"
+    paths = root.findall(f"{SVG}path")
+    assert [p.get("class") for p in paths] == ["pieces", "seam_allowances"]
+    assert paths[0].get("d").startswith("M0 0L10 0L0 20")
+    assert paths[1].get("stroke-dasharray")
+    assert root.find(f"{SVG}text").text == "Перед 1"
+
+
+def test_pdf_structure(qapp, tmp_path):
+    path = str(tmp_path / "out.pdf")
+    assert _manager().export_vector(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.startswith(b"%PDF-") and data.rstrip().endswith(b"%%EOF")
+    # Страница — холст в натуральную величину: 150 см в пунктах
+    box = re.search(rb"/MediaBox \[0 0 ([\d.]+) ([\d.]+)\]", data)
+    assert abs(float(box.group(1)) - 150 / 2.54 * 72) < 0.01
+    # Каждая запись xref указывает на начало своего объекта
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    entries = data[xref:].split(b"\n")[3:]
+    for number, entry in enumerate(entries[:6], start=1):
+        offset = int(entry[:10])
+        assert data[offset:].startswith(b"%d 0 obj" % number)
+
+
+def test_cancel_leaves_no_file(qapp, tmp_path):
+    path = str(tmp_path / "out.svg")
+    assert not _manager().export_vector(path, cancelled=lambda: True)
+    assert os.listdir(tmp_path) == []